@@ -0,0 +1,198 @@
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import typer
+
+# Add project root to sys.path to allow imports from src
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from src.utils.config import load_config
+from src.utils.logger import configure_logger, get_logger
+from src.utils.gpu_setup import add_nvidia_dll_path
+from src.utils.resource_resolver import get_resource_path
+from src.core.audio_processor import AudioProcessor
+from src.core.stt_engine import STTEngine
+from src.core.stt_tuning import CLIP_SECONDS, autotune
+from src.core.llm_engine import LLMEngine
+from src.core.llm_cache import CorrectionCache
+from src.core.vad import SpeechMapCache
+from src.core.two_pass import DEFAULT_REFINE_THRESHOLD
+from src.core.subtitle_export import FORMATS
+from src.core.postprocess import SegmentPostProcessor
+from src.core.pipeline import BatchPipeline, FileJob, FolderWatcher, collect_video_files
+
+logger = get_logger(__name__)
+
+app = typer.Typer(add_completion=False, help="AutoSub-AI 헤드리스 일괄 처리: 파일 또는 폴더의 영상에서 자막을 생성합니다.")
+
+
+@app.command()
+def process(
+    inputs: List[Path] = typer.Argument(..., help="영상 파일 또는 폴더 (원본 위치에서 바로 읽으며 복사하지 않음)"),
+    output_dir: Optional[Path] = typer.Option(None, "--output-dir", "-o", help="자막 출력 경로 (기본: config output.dir)"),
+    formats: Optional[List[str]] = typer.Option(None, "--format", "-f", help="자막 형식: srt / vtt / ass / json, 여러 번 지정 가능 (기본: config output.formats)"),
+    recursive: bool = typer.Option(False, "--recursive", "-r", help="하위 폴더까지 검색"),
+    watch: bool = typer.Option(False, "--watch", "-w", help="처리 후 입력 폴더를 감시하며 새 영상을 계속 처리 (Ctrl+C로 종료)"),
+    interval: float = typer.Option(10.0, help="폴더 감시 주기 (초)"),
+    model_size: Optional[str] = typer.Option(None, "--model", "-m", help="Whisper 모델 크기 (기본: config stt.model)"),
+    device: Optional[str] = typer.Option(None, "--device", help="auto / cuda / cpu (기본: config stt.device)"),
+    compute_type: Optional[str] = typer.Option(None, "--compute-type", help="auto / default / int8 / int8_float16 / float16 ... (기본: config stt.compute_type)"),
+    batch_size: Optional[int] = typer.Option(None, "--batch-size", help="VAD 음성 구간 배치 추론 크기, 0 = 순차 (기본: config stt.batch_size)"),
+    draft_model: Optional[str] = typer.Option(None, "--draft-model", help="작은 모델로 먼저 변환하고 신뢰도 낮은 구간만 --model로 재변환 (예: base, 기본: config stt.draft_model)"),
+    word_timestamps: Optional[bool] = typer.Option(None, "--word-timestamps/--no-word-timestamps", help="단어 단위 타임스탬프로 교정된 자막의 시간을 실제 발화에 맞춤 (기본: config stt.word_timestamps)"),
+    tune: bool = typer.Option(False, "--tune", help="첫 영상의 앞 30초로 STT 설정을 측정해 이 PC의 최적 설정으로 저장"),
+    language: Optional[str] = typer.Option(None, "--language", help="언어 코드 (기본: config stt.language)"),
+    api_key: Optional[str] = typer.Option(None, "--api-key", envvar="GEMINI_API_KEY", help="Gemini API Key"),
+    no_llm: bool = typer.Option(False, "--no-llm", help="LLM 교정 없이 STT 결과만 저장"),
+    glossary_only: bool = typer.Option(False, "--glossary-only", help="API 호출 없이 용어집(glossary.json) 치환만 적용"),
+    chunked: bool = typer.Option(False, "--chunked", help="파일 내부를 청크로 나누어 병렬 변환"),
+    extract_workers: int = typer.Option(2, help="동시 오디오 추출 수"),
+    stt_workers: int = typer.Option(1, help="동시 STT 파일 수"),
+    llm_workers: int = typer.Option(1, help="동시 LLM 교정 파일 수"),
+    llm_concurrency: int = typer.Option(4, help="파일당 LLM 동시 요청 수"),
+    stream_llm: bool = typer.Option(True, "--stream-llm/--no-stream-llm", help="STT 진행 중 완성된 배치부터 LLM 교정 시작 (청크 모드 제외)"),
+    no_resume: bool = typer.Option(False, "--no-resume", help="중단된 작업의 체크포인트를 사용하지 않음"),
+    config_path: Optional[Path] = typer.Option(None, "--config", help="사용자 설정 파일 (config.yaml 덮어쓰기)"),
+):
+    """영상에서 오디오 추출 → STT → LLM 교정 → 자막 저장을 파일 단위 파이프라인으로 실행합니다."""
+    config = load_config(str(config_path) if config_path else None)
+    logging_config = config.get("logging", {})
+    configure_logger(log_dir=logging_config.get("dir", "logs"), log_level=logging_config.get("level", "INFO"))
+    add_nvidia_dll_path()
+
+    processing = config.get("processing", {})
+    stt_config = config.get("stt", {})
+    llm_config = config.get("llm", {})
+
+    formats = [name.lower() for name in (formats or config.get("output", {}).get("formats", ["srt"]))]
+    unknown_formats = [name for name in formats if name not in FORMATS]
+    if unknown_formats:
+        typer.echo(f"지원하지 않는 자막 형식: {', '.join(unknown_formats)} (지원: {', '.join(sorted(FORMATS))})", err=True)
+        raise typer.Exit(code=1)
+
+    video_files = collect_video_files(inputs, recursive=recursive)
+    if not video_files and not watch:
+        typer.echo("처리할 영상 파일이 없습니다.", err=True)
+        raise typer.Exit(code=1)
+    watch_folders = [path for path in inputs if path.is_dir()]
+    if watch and not watch_folders:
+        typer.echo("--watch에는 감시할 폴더가 필요합니다. (입력이 파일뿐입니다)", err=True)
+        raise typer.Exit(code=1)
+
+    llm_engine = None
+    correction_cache = None
+    if not no_llm:
+        if not api_key and not glossary_only:
+            typer.echo("Gemini API Key가 필요합니다. (--api-key 또는 GEMINI_API_KEY, 교정 생략은 --no-llm)", err=True)
+            raise typer.Exit(code=1)
+        correction_cache = CorrectionCache()
+        llm_engine = LLMEngine(
+            api_key=api_key,
+            prompt_path=str(get_resource_path(llm_config.get("prompt_path", "src/prompts/correction.txt"))),
+            glossary_path=str(get_resource_path(llm_config.get("glossary_path", "src/prompts/glossary.json"))),
+            cache=correction_cache
+        )
+
+    chunk_workers = processing.get("max_workers", 2)
+    audio_processor = AudioProcessor(temp_dir=processing.get("temp_dir", "temp"))
+    model_size = model_size or stt_config.get("model", "large-v3")
+    device = device or stt_config.get("device", "auto")
+    if tune and video_files:
+        typer.echo(f"STT 설정 튜닝 중: {Path(video_files[0]).name} ...")
+        profile = autotune(
+            model_size,
+            audio_processor.read_clip(video_files[0], CLIP_SECONDS),
+            device=device,
+            model_path=stt_config.get("model_path", "models"),
+            language=language or stt_config.get("language", "ko")
+        )
+        typer.echo(f"튜닝 결과: {profile}")
+    if word_timestamps is None:
+        word_timestamps = stt_config.get("word_timestamps", False)
+    stt_engine = STTEngine(
+        model_size=model_size,
+        device=device,
+        model_path=stt_config.get("model_path", "models"),
+        num_workers=stt_workers * (chunk_workers if chunked else 1),
+        compute_type=compute_type or ("auto" if tune else stt_config.get("compute_type", "default")),
+        batch_size=stt_config.get("batch_size", 0) if batch_size is None else batch_size,
+        word_timestamps=word_timestamps
+    )
+    draft_model = draft_model or stt_config.get("draft_model")
+    draft_engine = None
+    if draft_model and not chunked:
+        draft_engine = STTEngine(
+            model_size=draft_model,
+            device=device,
+            model_path=stt_config.get("model_path", "models"),
+            num_workers=stt_workers,
+            compute_type=compute_type or stt_config.get("compute_type", "default"),
+            word_timestamps=word_timestamps
+        )
+
+    def on_progress(job: FileJob):
+        typer.echo(f"[{job.stage}] {Path(job.video_path).name}")
+
+    pipeline = BatchPipeline(
+        audio_processor,
+        stt_engine,
+        output_dir=str(output_dir or config.get("output", {}).get("dir", "output")),
+        llm_engine=llm_engine,
+        extract_workers=extract_workers,
+        stt_workers=stt_workers,
+        llm_workers=llm_workers,
+        language=language or stt_config.get("language", "ko"),
+        chunked=chunked,
+        chunk_size=processing.get("chunk_size", 300),
+        overlap_size=processing.get("overlap_size", 5),
+        chunk_workers=chunk_workers,
+        llm_options={"concurrency": llm_concurrency, "glossary_only": glossary_only},
+        progress_callback=on_progress,
+        jobs_dir=None if no_resume else processing.get("jobs_dir", "jobs"),
+        stream_llm=stream_llm,
+        vad_cache=SpeechMapCache(processing.get("vad_cache_dir", "cache/vad")),
+        draft_engine=draft_engine,
+        refine_threshold=stt_config.get("refine_threshold", DEFAULT_REFINE_THRESHOLD),
+        output_formats=formats,
+        postprocessor=SegmentPostProcessor.from_config(config.get("postprocess", {})),
+        align_words=word_timestamps
+    )
+
+    try:
+        jobs = pipeline.run(video_files) if video_files else []
+        if watch:
+            watcher = FolderWatcher(watch_folders, recursive=recursive, known=video_files)
+            typer.echo(f"폴더 감시 중: {', '.join(map(str, watch_folders))} (Ctrl+C로 종료)")
+            try:
+                while True:
+                    time.sleep(interval)
+                    new_files = watcher.poll()
+                    if new_files:
+                        jobs.extend(pipeline.run(new_files))
+            except KeyboardInterrupt:
+                typer.echo("폴더 감시를 종료합니다.")
+    finally:
+        stt_engine.close()
+        if draft_engine:
+            draft_engine.close()
+        if correction_cache:
+            correction_cache.close()
+
+    failed = [job for job in jobs if not job.succeeded]
+    for job in jobs:
+        if job.succeeded:
+            typer.echo(f"✅ {job.video_path} -> {', '.join(job.output_paths.values())}")
+        else:
+            typer.echo(f"❌ {job.video_path}: {job.error}", err=True)
+    typer.echo(f"완료: {len(jobs) - len(failed)}/{len(jobs)}")
+
+    if failed:
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
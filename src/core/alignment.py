@@ -0,0 +1,107 @@
+import re
+import difflib
+import logging
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Word timings are stored per segment as parallel arrays (JSON-friendly lists):
+#   "words": ["안녕하세요", ...], "word_starts": [0.0, ...], "word_ends": [0.52, ...]
+WORD_KEYS = ("words", "word_starts", "word_ends")
+
+_TOKEN_RE = re.compile(r"\S+")
+
+
+def has_words(segment: Dict[str, Any]) -> bool:
+    """True if the segment carries usable word timings."""
+    words = segment.get("words")
+    return bool(words) and len(words) == len(segment.get("word_starts", ())) == len(segment.get("word_ends", ()))
+
+
+def strip_words(segment: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a segment without word timings."""
+    return {key: value for key, value in segment.items() if key not in WORD_KEYS}
+
+
+def token_spans(text: str) -> List[Tuple[int, int]]:
+    """(start, end) character offsets of the whitespace-separated tokens of `text`."""
+    return [match.span() for match in _TOKEN_RE.finditer(text)]
+
+
+def _char_times(words: List[str], starts: np.ndarray, ends: np.ndarray) -> Tuple[str, np.ndarray, np.ndarray]:
+    """Concatenate words (without whitespace) and give every character its word's start and end."""
+    lengths = np.array([len(word) for word in words])
+    return "".join(words), np.repeat(starts, lengths), np.repeat(ends, lengths)
+
+
+def retime_segment(segment: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Map a segment's (corrected) text back onto its word timings.
+
+    The corrected text is aligned character by character with the
+    recognized words (whitespace ignored). Characters without a match are
+    placed by interpolating between their matched neighbours, so rewritten
+    words still get a time between the words around them. The segment's
+    start/end become those of its first and last spoken character, and the
+    word arrays are replaced by the tokens of the corrected text.
+
+    Segments without word timings are returned unchanged.
+    """
+    if not has_words(segment):
+        return segment
+    words = [word.strip() for word in segment["words"]]
+    starts = np.asarray(segment["word_starts"], dtype=np.float64)
+    ends = np.asarray(segment["word_ends"], dtype=np.float64)
+    source, char_starts, char_ends = _char_times(words, starts, ends)
+
+    text = segment["text"]
+    spans = token_spans(text)
+    target = "".join(text[a:b] for a, b in spans)
+    if not source or not target:
+        return segment
+
+    if target == source:
+        target_to_source = np.arange(len(target), dtype=np.float64)
+    else:
+        # Anchor matched characters, interpolate the rest
+        anchors_target, anchors_source = [], []
+        matcher = difflib.SequenceMatcher(None, source, target, autojunk=False)
+        for source_start, target_start, size in matcher.get_matching_blocks():
+            anchors_target.extend(range(target_start, target_start + size))
+            anchors_source.extend(range(source_start, source_start + size))
+        if not anchors_target:
+            # Nothing in common: spread the text evenly over the spoken time
+            anchors_target, anchors_source = [0, len(target) - 1], [0, len(source) - 1]
+        target_to_source = np.interp(np.arange(len(target)), anchors_target, anchors_source)
+
+    source_index = np.clip(np.rint(target_to_source).astype(np.int64), 0, len(source) - 1)
+    token_lengths = np.array([b - a for a, b in spans])
+    token_first = np.concatenate(([0], np.cumsum(token_lengths)[:-1]))
+    token_last = token_first + token_lengths - 1
+    token_starts = char_starts[source_index[token_first]]
+    token_ends = np.maximum(char_ends[source_index[token_last]], token_starts)
+    # Interpolation can't make time run backwards
+    token_starts = np.maximum.accumulate(token_starts)
+    token_ends = np.maximum.accumulate(token_ends)
+
+    return dict(
+        segment,
+        start=round(float(token_starts[0]), 3),
+        end=round(float(token_ends[-1]), 3),
+        words=[text[a:b] for a, b in spans],
+        word_starts=np.round(token_starts, 3).tolist(),
+        word_ends=np.round(token_ends, 3).tolist(),
+    )
+
+
+def align_segments(segments: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Re-time every segment to its spoken words (see `retime_segment`).
+
+    Each segment is aligned on its own, so the cost grows linearly with the
+    length of the recording.
+    """
+    return [retime_segment(segment) for segment in segments]
+
@@ -0,0 +1,127 @@
+import os
+import re
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from src.utils.hashing import fingerprint_file, hash_text
+
+logger = logging.getLogger(__name__)
+
+
+class AudioCache:
+    """
+    Content-addressed cache of extracted audio files with LRU eviction.
+    
+    Entries are named `audio_{key}{suffix}` where the key is a hash of the
+    source file's sampled content fingerprint (see `fingerprint_file`) and
+    the extraction parameters, so the source is not read in full before
+    FFmpeg runs. The modification time
+    of an entry is refreshed on every hit and used as its LRU timestamp.
+    """
+    CACHE_VERSION = 1
+    ENTRY_PATTERN = re.compile(r"^audio_[0-9a-f]{64}\.[a-z0-9]+$")
+
+    def __init__(self, cache_dir: str, max_size_mb: float = 4096):
+        """
+        Initialize AudioCache.
+        
+        Args:
+            cache_dir: Directory holding the cached audio files.
+            max_size_mb: Total size cap of cached entries in megabytes.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def make_key(self, source_path: str, params: Dict[str, Any]) -> str:
+        """
+        Build the cache key for a source file and extraction parameters.
+        
+        Args:
+            source_path: Path to the source video file.
+            params: Extraction parameters that affect the output.
+            
+        Returns:
+            Hex cache key.
+        """
+        source_hash = fingerprint_file(source_path)
+        params_str = json.dumps(params, sort_keys=True)
+        return hash_text(str(self.CACHE_VERSION), source_hash, params_str)
+
+    def entry_path(self, key: str, suffix: str) -> Path:
+        """Final path of a cache entry."""
+        return self.cache_dir / f"audio_{key}{suffix}"
+
+    def partial_path(self, key: str, suffix: str) -> Path:
+        """Path an entry is written to before it is committed."""
+        return self.cache_dir / f"audio_{key}.partial{suffix}"
+
+    def get(self, key: str, suffix: str) -> Optional[str]:
+        """
+        Look up a cache entry and mark it as recently used.
+        
+        Returns:
+            Path to the cached file, or None on a miss.
+        """
+        path = self.entry_path(key, suffix)
+        with self._lock:
+            try:
+                if path.stat().st_size == 0:
+                    return None
+                os.utime(path)
+            except FileNotFoundError:
+                return None
+        logger.info(f"Audio cache hit: {path}")
+        return str(path)
+
+    def commit(self, key: str, suffix: str) -> str:
+        """
+        Atomically move a finished partial file into the cache and enforce the size cap.
+        
+        Returns:
+            Path to the committed entry.
+        """
+        partial = self.partial_path(key, suffix)
+        final = self.entry_path(key, suffix)
+        with self._lock:
+            os.replace(partial, final)
+            self._evict(keep=final)
+        return str(final)
+
+    def discard(self, key: str, suffix: str):
+        """Remove a leftover partial file after a failed extraction."""
+        try:
+            self.partial_path(key, suffix).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _evict(self, keep: Path):
+        """Delete least recently used entries until the cache fits in its size cap."""
+        entries = []
+        total = 0
+        for path in self.cache_dir.iterdir():
+            if not self.ENTRY_PATTERN.match(path.name):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort(key=lambda entry: entry[0])
+        for _, size, path in entries:
+            if total <= self.max_size_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                path.unlink()
+                total -= size
+                logger.info(f"Evicted cached audio: {path}")
+            except OSError as e:
+                logger.warning(f"Failed to evict cached audio {path}: {e}")
@@ -2,8 +2,12 @@ import os
 import sys
 import logging
 import ffmpeg
+import numpy as np
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
+
+from src.core.audio_cache import AudioCache
+from src.core.audio_stream import AudioStream
 
 # Basic logging configuration (will be replaced by logger.py later)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -15,16 +19,29 @@ class AudioProcessor:
     """
     SUPPORTED_FORMATS = {'.mp4', '.mkv', '.avi', '.mov', '.webm'}
 
-    def __init__(self, temp_dir: str = "temp"):
+    # Output formats. Parameters are part of the cache key.
+    # "wav" is 16 kHz mono PCM, which Whisper consumes without decoding or resampling again.
+    # "mp3" is a high quality variable bitrate export (qscale 2).
+    AUDIO_FORMATS = {
+        "wav": {"suffix": ".wav", "params": {"vn": None, "acodec": "pcm_s16le", "ac": 1, "ar": 16000}},
+        "mp3": {"suffix": ".mp3", "params": {"vn": None, "acodec": "libmp3lame", "qscale": 2}},
+    }
+
+    def __init__(self, temp_dir: str = "temp", cache_max_size_mb: float = 4096):
         """
         Initialize AudioProcessor.
         
         Args:
             temp_dir: Directory to store extracted audio files.
+            cache_max_size_mb: Size cap of the extracted audio cache in megabytes.
         """
         self.temp_dir = Path(temp_dir)
         self.ffmpeg_path = self._get_ffmpeg_path()
+        self.ffprobe_path = self._get_ffprobe_path()
         self._ensure_temp_dir()
+        self.cache = AudioCache(str(self.temp_dir), max_size_mb=cache_max_size_mb)
+        # FFprobe results keyed by (path, size, mtime), so validation and duration share one probe
+        self._probe_cache: Dict[Tuple[str, int, int], Dict[str, Any]] = {}
 
     def _get_ffmpeg_path(self) -> str:
         """
@@ -57,6 +74,15 @@ class AudioProcessor:
         logger.info(f"Using FFmpeg at: {ffmpeg_path_str}")
         return ffmpeg_path_str
 
+    def _get_ffprobe_path(self) -> str:
+        """
+        Detect FFprobe binary path, next to the FFmpeg binary in use.
+        """
+        if self.ffmpeg_path == "ffmpeg":
+            return "ffprobe"
+        ffmpeg_path = Path(self.ffmpeg_path)
+        return str(ffmpeg_path.with_name(ffmpeg_path.name.replace("ffmpeg", "ffprobe")))
+
     def _ensure_temp_dir(self):
         """Ensure the temporary directory exists."""
         if not self.temp_dir.exists():
@@ -65,7 +91,11 @@ class AudioProcessor:
 
     def validate_video_file(self, video_path: str) -> bool:
         """
-        Check if the file exists and has a supported extension.
+        Check if the file exists and is a media container with an audio stream.
+        
+        The container is probed with FFprobe, so files are accepted or rejected
+        by content rather than by extension. If FFprobe is not available, this
+        falls back to the extension check.
         
         Args:
             video_path: Path to the video file.
@@ -74,55 +104,167 @@ class AudioProcessor:
             True if valid, False otherwise.
         """
         path = Path(video_path)
-        if not path.exists():
+        if not path.is_file():
             logger.error(f"File not found: {video_path}")
             return False
         
-        if path.suffix.lower() not in self.SUPPORTED_FORMATS:
-            logger.error(f"Unsupported format: {path.suffix}. Supported: {self.SUPPORTED_FORMATS}")
+        try:
+            info = self.probe(video_path)
+        except FileNotFoundError:
+            logger.warning(f"FFprobe not found ({self.ffprobe_path}); validating {path.name} by extension only.")
+            if path.suffix.lower() not in self.SUPPORTED_FORMATS:
+                logger.error(f"Unsupported format: {path.suffix}. Supported: {self.SUPPORTED_FORMATS}")
+                return False
+            return True
+        except ffmpeg.Error as e:
+            error_msg = e.stderr.decode('utf8', errors='replace') if e.stderr else str(e)
+            logger.error(f"Not a readable media file: {video_path}: {error_msg}")
+            return False
+        
+        if not any(stream.get("codec_type") == "audio" for stream in info.get("streams", [])):
+            logger.error(f"No audio stream found in {video_path}")
             return False
             
         return True
 
-    def extract_audio(self, video_path: str) -> Optional[str]:
+    def probe(self, video_path: str) -> Dict[str, Any]:
+        """
+        Run FFprobe on a media file (memoized while the file is unchanged).
+        
+        Returns:
+            FFprobe output with "format" and "streams".
+            
+        Raises:
+            FileNotFoundError: If the FFprobe binary is missing.
+            ffmpeg.Error: If the file cannot be parsed as media.
+        """
+        path = Path(video_path).resolve()
+        stat = path.stat()
+        cache_key = (str(path), stat.st_size, stat.st_mtime_ns)
+        info = self._probe_cache.get(cache_key)
+        if info is None:
+            info = ffmpeg.probe(str(path), cmd=self.ffprobe_path)
+            self._probe_cache[cache_key] = info
+        return info
+
+    def extract_audio(self, video_path: str, audio_format: str = "wav") -> Optional[str]:
         """
         Extract audio from video file using FFmpeg.
         
+        Outputs are cached by source content and extraction parameters, so
+        extracting the same video again returns the cached file without
+        running FFmpeg.
+        
         Args:
             video_path: Path to the video file.
+            audio_format: "wav" (16 kHz mono PCM for STT) or "mp3" (export).
             
         Returns:
-            Path to the extracted audio file (mp3) or None if failed.
+            Path to the extracted audio file or None if failed.
         """
+        if audio_format not in self.AUDIO_FORMATS:
+            raise ValueError(f"Unsupported audio format: {audio_format}. Supported: {list(self.AUDIO_FORMATS)}")
         if not self.validate_video_file(video_path):
             raise ValueError(f"Invalid video file: {video_path}")
 
-        video_path_obj = Path(video_path)
-        # Use a consistent naming convention or hash to avoid collisions? 
-        # For now, simple filename based on source.
-        output_filename = f"{video_path_obj.stem}_audio.mp3"
-        output_path = self.temp_dir / output_filename
-        output_path_str = str(output_path)
+        suffix = self.AUDIO_FORMATS[audio_format]["suffix"]
+        params = self.AUDIO_FORMATS[audio_format]["params"]
+
+        # Content-addressed output name: same content + params -> same file
+        cache_key = self.cache.make_key(video_path, params)
+        cached_path = self.cache.get(cache_key, suffix)
+        if cached_path:
+            return cached_path
+
+        # Write to a partial file first so an interrupted run never looks like a cache hit
+        partial_path_str = str(self.cache.partial_path(cache_key, suffix))
 
         try:
-            logger.info(f"Extracting audio from {video_path} to {output_path_str}...")
+            logger.info(f"Extracting audio from {video_path} to {partial_path_str}...")
             
             # ffmpeg-python stream construction
             stream = ffmpeg.input(video_path)
-            # Extract audio, convert to mp3, qscale 2 (high quality variable bitrate)
-            stream = ffmpeg.output(stream, output_path_str, acodec='libmp3lame', qscale=2, loglevel="error")
+            # Extract audio only (-vn) with the parameters of the requested format
+            stream = ffmpeg.output(stream, partial_path_str, loglevel="error", **params)
             
             # Run ffmpeg command
             # cmd parameter specifies the path to the ffmpeg executable
             ffmpeg.run(stream, cmd=self.ffmpeg_path, overwrite_output=True)
             
+            output_path_str = self.cache.commit(cache_key, suffix)
             logger.info(f"Audio extraction successful: {output_path_str}")
             return output_path_str
             
         except ffmpeg.Error as e:
+            self.cache.discard(cache_key, suffix)
             error_msg = e.stderr.decode('utf8') if e.stderr else str(e)
             logger.error(f"FFmpeg error: {error_msg}")
             raise RuntimeError(f"Failed to extract audio: {error_msg}") from e
         except Exception as e:
+            self.cache.discard(cache_key, suffix)
             logger.error(f"Unexpected error during audio extraction: {e}")
             raise
+
+    def probe_duration(self, video_path: str) -> Optional[float]:
+        """
+        Get the media duration in seconds using FFprobe.
+        
+        Returns:
+            Duration in seconds, or None if it cannot be determined.
+        """
+        try:
+            info = self.probe(video_path)
+            return float(info["format"]["duration"])
+        except Exception as e:
+            logger.warning(f"Could not probe duration of {video_path}: {e}")
+            return None
+
+    def open_audio_stream(self, video_path: str, sample_rate: int = 16000, buffer_seconds: float = 120,
+                          max_seconds: Optional[float] = None) -> AudioStream:
+        """
+        Start FFmpeg decoding mono float32 PCM to stdout, without a temp file.
+        
+        Args:
+            video_path: Path to the video file.
+            sample_rate: Output sample rate.
+            buffer_seconds: Capacity of the ring buffer between FFmpeg and the consumer.
+            max_seconds: Stop decoding after this many seconds (FFmpeg `-t`); None decodes everything.
+            
+        Returns:
+            An `AudioStream`; close it (or use it as a context manager) when done.
+        """
+        if not self.validate_video_file(video_path):
+            raise ValueError(f"Invalid video file: {video_path}")
+
+        duration = self.probe_duration(video_path)
+
+        try:
+            logger.info(f"Streaming audio from {video_path}...")
+            stream = ffmpeg.input(video_path)
+            limit = {} if max_seconds is None else {"t": max_seconds}
+            stream = ffmpeg.output(stream, "pipe:", format="f32le", acodec="pcm_f32le", ac=1, ar=sample_rate,
+                                   vn=None, loglevel="error", **limit)
+            process = ffmpeg.run_async(stream, cmd=self.ffmpeg_path, pipe_stdout=True, pipe_stderr=True)
+        except Exception as e:
+            logger.error(f"Failed to start FFmpeg stream: {e}")
+            raise RuntimeError(f"Failed to stream audio: {e}") from e
+
+        return AudioStream(process.stdout, process=process, sample_rate=sample_rate,
+                           buffer_seconds=buffer_seconds, duration=duration)
+
+    def read_clip(self, video_path: str, seconds: float, sample_rate: int = 16000) -> np.ndarray:
+        """
+        Decode only the first `seconds` of a video's audio into memory.
+        
+        Args:
+            video_path: Path to the video file.
+            seconds: Length of the clip.
+            sample_rate: Output sample rate.
+            
+        Returns:
+            Mono float32 samples (shorter than `seconds` if the video is).
+        """
+        with self.open_audio_stream(video_path, sample_rate=sample_rate, buffer_seconds=seconds + 1,
+                                    max_seconds=seconds) as audio_stream:
+            _, clip = next(audio_stream.windows(seconds, 0), (0.0, np.zeros(0, dtype=np.float32)))
+        return clip
@@ -0,0 +1,210 @@
+import logging
+import threading
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class PCMRingBuffer:
+    """
+    Bounded single-producer/single-consumer ring buffer of float32 samples.
+
+    The producer blocks while the buffer is full, so a fast decoder cannot run
+    ahead of transcription by more than the buffer capacity.
+    """
+    def __init__(self, capacity_samples: int):
+        """
+        Initialize PCMRingBuffer.
+
+        Args:
+            capacity_samples: Maximum number of buffered samples.
+        """
+        if capacity_samples <= 0:
+            raise ValueError(f"capacity_samples must be positive, got {capacity_samples}")
+        self._buffer = np.zeros(capacity_samples, dtype=np.float32)
+        self._capacity = capacity_samples
+        self._read_pos = 0   # absolute sample counters
+        self._write_pos = 0
+        self._eof = False
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._cond = threading.Condition()
+
+    def write(self, samples: np.ndarray) -> bool:
+        """
+        Append samples, blocking while the buffer is full.
+
+        Returns:
+            False if the consumer closed the buffer (the producer should stop).
+        """
+        offset = 0
+        while offset < len(samples):
+            with self._cond:
+                while self._write_pos - self._read_pos >= self._capacity and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return False
+                free = self._capacity - (self._write_pos - self._read_pos)
+                count = min(free, len(samples) - offset)
+                start = self._write_pos % self._capacity
+                first = min(count, self._capacity - start)
+                self._buffer[start:start + first] = samples[offset:offset + first]
+                self._buffer[:count - first] = samples[offset + first:offset + count]
+                self._write_pos += count
+                self._cond.notify_all()
+            offset += count
+        return True
+
+    def read(self, max_samples: int) -> np.ndarray:
+        """
+        Read up to `max_samples`, blocking until at least one sample is available.
+
+        Returns:
+            A copy of the samples read; an empty array once the producer finished.
+
+        Raises:
+            The producer's error, if it finished with one.
+        """
+        with self._cond:
+            while self._write_pos == self._read_pos and not self._eof and not self._closed:
+                self._cond.wait()
+            if self._error is not None:
+                raise self._error
+            count = min(max_samples, self._write_pos - self._read_pos)
+            start = self._read_pos % self._capacity
+            first = min(count, self._capacity - start)
+            out = np.concatenate((self._buffer[start:start + first], self._buffer[:count - first]))
+            self._read_pos += count
+            self._cond.notify_all()
+            return out
+
+    def finish(self, error: Optional[BaseException] = None):
+        """Mark the end of the stream (called by the producer)."""
+        with self._cond:
+            self._eof = True
+            self._error = error
+            self._cond.notify_all()
+
+    def close(self):
+        """Stop the stream early (called by the consumer); unblocks the producer."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class AudioStream:
+    """
+    Decoded audio streamed from an FFmpeg process (f32le, mono) through a ring buffer.
+    """
+    READ_BLOCK_BYTES = 64 * 1024
+
+    def __init__(self, source: BinaryIO, process=None, sample_rate: int = 16000,
+                 buffer_seconds: float = 120, duration: Optional[float] = None):
+        """
+        Initialize AudioStream and start the reader thread.
+
+        Args:
+            source: Binary stream of little-endian float32 samples (FFmpeg stdout).
+            process: Optional subprocess producing `source`; checked and killed on close.
+            sample_rate: Sample rate of the stream.
+            buffer_seconds: Ring buffer capacity in seconds of audio.
+            duration: Total duration if known (from ffprobe), for progress reporting.
+        """
+        self.source = source
+        self.process = process
+        self.sample_rate = sample_rate
+        self.duration = duration
+        self.buffer = PCMRingBuffer(int(buffer_seconds * sample_rate))
+        self._stderr_chunks = []
+        self._threads = [threading.Thread(target=self._read_loop, daemon=True)]
+        if process is not None and getattr(process, "stderr", None) is not None:
+            self._threads.append(threading.Thread(target=self._drain_stderr, daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def _read_loop(self):
+        """Move samples from the source into the ring buffer."""
+        remainder = b""
+        error = None
+        try:
+            while True:
+                data = self.source.read(self.READ_BLOCK_BYTES)
+                if not data:
+                    break
+                data = remainder + data
+                usable = len(data) - len(data) % 4
+                remainder = data[usable:]
+                if usable and not self.buffer.write(np.frombuffer(data[:usable], dtype="<f4")):
+                    return
+
+            if self.process is not None:
+                returncode = self.process.wait()
+                if returncode != 0:
+                    for thread in self._threads[1:]:
+                        thread.join(timeout=1)
+                    stderr = b"".join(self._stderr_chunks).decode("utf8", errors="replace")
+                    error = RuntimeError(f"Failed to stream audio (exit code {returncode}): {stderr}")
+        except Exception as e:
+            error = e
+        finally:
+            if error is not None:
+                logger.error(f"Audio stream error: {error}")
+            self.buffer.finish(error)
+
+    def _drain_stderr(self):
+        """Keep FFmpeg's stderr pipe from filling up and blocking the process."""
+        for line in iter(self.process.stderr.readline, b""):
+            self._stderr_chunks.append(line)
+
+    def windows(self, chunk_size: float, overlap_size: float) -> Iterator[Tuple[float, np.ndarray]]:
+        """
+        Yield overlapping windows as soon as their samples have been decoded.
+
+        Window k starts at k * chunk_size and is chunk_size + overlap_size seconds
+        long (shorter at the end), matching `plan_chunks`.
+
+        Yields:
+            (start_time, samples) tuples.
+        """
+        window_samples = int((chunk_size + overlap_size) * self.sample_rate)
+        step_samples = int(chunk_size * self.sample_rate)
+        pending = np.zeros(0, dtype=np.float32)
+        start_sample = 0
+        finished = False
+
+        while not finished:
+            pieces = [pending]
+            filled = len(pending)
+            while filled < window_samples:
+                piece = self.buffer.read(window_samples - filled)
+                if len(piece) == 0:
+                    finished = True
+                    break
+                pieces.append(piece)
+                filled += len(piece)
+            window = np.concatenate(pieces)
+
+            # The last window only exists if it holds audio beyond the previous overlap
+            if len(window) == 0 or (start_sample > 0 and finished and len(window) <= window_samples - step_samples):
+                break
+
+            yield start_sample / self.sample_rate, window
+            pending = window[step_samples:]
+            start_sample += step_samples
+
+    def close(self):
+        """Stop decoding and release the FFmpeg process."""
+        self.buffer.close()
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
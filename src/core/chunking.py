@@ -0,0 +1,85 @@
+import logging
+from typing import List, Dict, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def plan_chunks(duration: float, chunk_size: float, overlap_size: float) -> List[Tuple[float, float]]:
+    """
+    Split an audio timeline into overlapping windows.
+
+    Window k covers [k * chunk_size, (k + 1) * chunk_size + overlap_size],
+    clamped to the audio duration. A trailing window that would only contain
+    the previous window's overlap is not emitted.
+
+    Args:
+        duration: Total audio duration in seconds.
+        chunk_size: Length of each chunk in seconds (without overlap).
+        overlap_size: Extra seconds each chunk extends into the next one.
+
+    Returns:
+        List of (start, end) tuples in seconds.
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+    if overlap_size < 0:
+        raise ValueError(f"overlap_size must not be negative, got {overlap_size}")
+
+    windows = []
+    start = 0.0
+    while start < duration and (start == 0 or start + overlap_size < duration):
+        end = min(start + chunk_size + overlap_size, duration)
+        windows.append((start, end))
+        start += chunk_size
+    return windows
+
+
+def _normalize_text(text: str) -> str:
+    return "".join(text.split()).lower()
+
+
+def stitch_segments(chunk_results: List[Tuple[float, float, List[Dict[str, Any]]]], overlap_size: float) -> List[Dict[str, Any]]:
+    """
+    Merge per-chunk segments (already shifted to absolute time) into one list.
+
+    Each overlap region is cut at its midpoint: a segment belongs to the chunk
+    its own midpoint falls into, so speech transcribed twice in the overlap is
+    kept only once. Any remaining segment that overlaps the previous one in
+    time with the same text is dropped as well.
+
+    Args:
+        chunk_results: List of (window_start, window_end, segments) per chunk.
+        overlap_size: Overlap between consecutive windows in seconds.
+
+    Returns:
+        Sorted, de-duplicated list of segments.
+    """
+    ordered = sorted(chunk_results, key=lambda item: item[0])
+    merged: List[Dict[str, Any]] = []
+
+    for index, (window_start, window_end, segments) in enumerate(ordered):
+        # Cut points between this chunk and its neighbours
+        lower = window_start + overlap_size / 2 if index > 0 else float("-inf")
+        if index + 1 < len(ordered):
+            next_start = ordered[index + 1][0]
+            upper = next_start + overlap_size / 2
+        else:
+            upper = float("inf")
+
+        for segment in segments:
+            midpoint = (segment["start"] + segment["end"]) / 2
+            if lower <= midpoint < upper:
+                merged.append(segment)
+
+    merged.sort(key=lambda seg: (seg["start"], seg["end"]))
+
+    result: List[Dict[str, Any]] = []
+    for segment in merged:
+        if result:
+            previous = result[-1]
+            if segment["start"] < previous["end"] and _normalize_text(segment["text"]) == _normalize_text(previous["text"]):
+                logger.debug(f"Dropping duplicate overlap segment at {segment['start']:.2f}s: {segment['text']}")
+                continue
+        result.append(segment)
+
+    return result
@@ -0,0 +1,235 @@
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class AhoCorasick:
+    """
+    Multi-pattern string matcher (Aho-Corasick automaton).
+
+    Finds every occurrence of every pattern in one pass over the text, so
+    the cost does not grow with the number of glossary entries.
+    """
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = list(patterns)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Pattern indices ending in each state, including those reached through fail links
+        self._out: List[List[int]] = [[]]
+        for index, pattern in enumerate(self.patterns):
+            if pattern:
+                self._add(pattern, index)
+        self._build_links()
+
+    def _add(self, pattern: str, index: int):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = next_state
+        self._out[state].append(index)
+
+    def _build_links(self):
+        """Breadth-first construction of the failure links."""
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    def find_all(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """
+        Yield (start, end, pattern_index) of every match, in order of their end.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in out[state]:
+                yield position + 1 - len(self.patterns[index]), position + 1, index
+
+
+def _script(char: str) -> Optional[str]:
+    """Script class of a letter or digit ("hangul", "cjk" or "word"), None for anything else."""
+    if not (char.isalnum() or char == "_"):
+        return None
+    code = ord(char)
+    if 0xAC00 <= code <= 0xD7A3 or 0x1100 <= code <= 0x11FF or 0x3130 <= code <= 0x318F:
+        return "hangul"
+    if 0x3040 <= code <= 0x30FF or 0x3400 <= code <= 0x4DBF or 0x4E00 <= code <= 0x9FFF:
+        return "cjk"
+    return "word"
+
+
+def _joins(edge: str, neighbour: str) -> bool:
+    """True if `neighbour` continues the word that `edge` is part of (same script)."""
+    script = _script(edge)
+    return script is not None and _script(neighbour) == script
+
+
+class Glossary:
+    """
+    Deterministic glossary pass run before (or instead of) LLM correction.
+
+    The glossary file holds terms to keep exactly as written and known
+    mis-hearings with their correction::
+
+        {"preserve": ["YouTube", "API"], "replacements": {"레디": "준비"}}
+
+    (a flat {"wrong": "right"} object is read as replacements). All terms go
+    into one Aho-Corasick automaton. Matching ignores case; preserved terms
+    are written in their canonical form and mis-hearings are replaced, taking
+    the leftmost-longest match so a preserved term protects the text inside
+    it. Terms only match as whole words: a match that touches another letter
+    or digit of the same script is skipped, so "API" does not match inside
+    "RAPID" and "레디" is not replaced inside "그레디언트" (nor in "레디가",
+    which errs on the side of not editing). A Latin term followed by a
+    Korean particle ("YouTube에서") still matches.
+    """
+    def __init__(self, entries: Optional[Dict[str, Any]] = None):
+        self.entries = entries or {}
+        if "preserve" in self.entries or "replacements" in self.entries:
+            self.preserve = [term for term in self.entries.get("preserve", []) if term]
+            self.replacements = {wrong: right for wrong, right in self.entries.get("replacements", {}).items() if wrong}
+        else:
+            self.preserve = []
+            self.replacements = {wrong: right for wrong, right in self.entries.items() if wrong and isinstance(right, str)}
+
+        # Each pattern maps to (output text, entry kind, entry key); corrections also match their
+        # correct form, so `subset` finds entries whose mis-hearing was already replaced
+        self._targets: List[Tuple[str, str, str]] = []
+        patterns: List[str] = []
+        for term in self.preserve:
+            patterns.append(term.lower())
+            self._targets.append((term, "preserve", term))
+        for wrong, right in self.replacements.items():
+            patterns.append(wrong.lower())
+            self._targets.append((right, "replacements", wrong))
+            if right:
+                patterns.append(right.lower())
+                self._targets.append((right, "replacements", wrong))
+        self._matcher = AhoCorasick(patterns)
+
+    def __bool__(self) -> bool:
+        return bool(self.preserve or self.replacements)
+
+    def _matches(self, text: str) -> List[Tuple[int, int, int]]:
+        """Non-overlapping leftmost-longest matches that respect word boundaries."""
+        folded = text.lower()
+        if len(folded) != len(text):
+            # Rare characters change length when lower-cased; match case-sensitively then
+            folded = text
+        candidates = []
+        for start, end, index in self._matcher.find_all(folded):
+            pattern = self._matcher.patterns[index]
+            if start > 0 and _joins(pattern[0], text[start - 1]):
+                continue
+            if end < len(text) and _joins(pattern[-1], text[end]):
+                continue
+            candidates.append((start, end, index))
+        candidates.sort(key=lambda match: (match[0], match[0] - match[1]))
+        selected = []
+        position = 0
+        for start, end, index in candidates:
+            if start >= position:
+                selected.append((start, end, index))
+                position = end
+        return selected
+
+    def apply(self, text: str) -> str:
+        """Replace known mis-hearings and normalize preserved terms in `text`."""
+        if not self:
+            return text
+        parts = []
+        position = 0
+        for start, end, index in self._matches(text):
+            parts.append(text[position:start])
+            parts.append(self._targets[index][0])
+            position = end
+        if not parts:
+            return text
+        parts.append(text[position:])
+        return "".join(parts)
+
+    def subset(self, texts: Iterable[str]) -> Dict[str, Any]:
+        """
+        The glossary entries that occur in `texts`, in the glossary file's layout.
+
+        Only these are sent with a batch, so the prompt does not grow with the glossary.
+
+        Returns:
+            {"preserve": [...], "replacements": {...}} with the entries found, or {} if none.
+        """
+        if not self:
+            return {}
+        found = {"preserve": set(), "replacements": set()}
+        for text in texts:
+            for _, _, index in self._matches(text):
+                _, kind, key = self._targets[index]
+                found[kind].add(key)
+        subset: Dict[str, Any] = {}
+        if found["preserve"]:
+            subset["preserve"] = [term for term in self.preserve if term in found["preserve"]]
+        if found["replacements"]:
+            subset["replacements"] = {
+                wrong: right for wrong, right in self.replacements.items() if wrong in found["replacements"]
+            }
+        return subset
+
+
+_cache: Dict[str, Tuple[Optional[int], Glossary]] = {}
+_cache_lock = threading.Lock()
+
+
+def load_glossary(path: str) -> Glossary:
+    """
+    Load a glossary file, building its automaton only when the file changed.
+
+    Glossaries are cached per path and modification time, so engines and
+    batches share one automaton and edits to the file are picked up on
+    the next call.
+
+    Args:
+        path: Path to the glossary JSON file.
+
+    Returns:
+        The glossary (empty if the file is missing or invalid).
+    """
+    path = Path(path)
+    key = str(path.resolve())
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        mtime = None
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        if mtime is None:
+            logger.warning(f"Glossary file not found: {path}")
+            glossary = Glossary()
+        else:
+            try:
+                glossary = Glossary(json.loads(path.read_text(encoding="utf-8")))
+                logger.info(f"Glossary loaded: {len(glossary.preserve)} preserved terms, "
+                            f"{len(glossary.replacements)} replacements")
+            except (json.JSONDecodeError, AttributeError, OSError) as e:
+                logger.error(f"Failed to parse glossary: {e}")
+                glossary = Glossary()
+        _cache[key] = (mtime, glossary)
+        return glossary
@@ -0,0 +1,274 @@
+import time
+import uuid
+import logging
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = {DONE, FAILED, CANCELLED}
+
+
+class JobCancelled(Exception):
+    """Raised inside a job function when its job was cancelled."""
+
+
+class _Job:
+    __slots__ = ("job_id", "label", "state", "stage", "progress", "message", "result", "error",
+                 "preview", "created", "started", "finished", "cancel_event", "future")
+
+    def __init__(self, job_id: str, label: str):
+        self.job_id = job_id
+        self.label = label
+        self.state = QUEUED
+        self.stage: Optional[str] = None
+        self.progress = 0.0
+        self.message = ""
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.preview: Optional[str] = None
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.cancel_event = threading.Event()
+        self.future = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "label": self.label,
+            "state": self.state,
+            "stage": self.stage,
+            "progress": self.progress,
+            "message": self.message,
+            "result": self.result,
+            "error": self.error,
+            "preview": self.preview,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+        }
+
+
+class JobContext:
+    """
+    Handle given to a running job function to publish progress and honor cancellation.
+
+    Cancellation is cooperative: `update` and `stage` raise `JobCancelled`
+    once the job was cancelled, so long steps should report progress often.
+    """
+    def __init__(self, executor: "JobExecutor", job: _Job):
+        self._executor = executor
+        self._job = job
+
+    @property
+    def job_id(self) -> str:
+        return self._job.job_id
+
+    @property
+    def cancelled(self) -> bool:
+        return self._job.cancel_event.is_set()
+
+    def check_cancelled(self):
+        """Raise `JobCancelled` if the job was cancelled."""
+        if self.cancelled:
+            raise JobCancelled(self._job.job_id)
+
+    def update(self, progress: Optional[float] = None, message: Optional[str] = None):
+        """
+        Publish progress (0.0-1.0) and/or a status message.
+
+        Raises:
+            JobCancelled: If the job was cancelled.
+        """
+        with self._executor._lock:
+            if progress is not None:
+                self._job.progress = min(max(progress, 0.0), 1.0)
+            if message is not None:
+                self._job.message = message
+        self.check_cancelled()
+
+    def set_preview(self, preview: Optional[str]):
+        """Publish partial output (e.g. draft subtitles) shown while the job runs."""
+        with self._executor._lock:
+            self._job.preview = preview
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Run a block as stage `name`, holding one of that stage's slots.
+
+        Stages without a configured limit run unthrottled.
+        """
+        self.check_cancelled()
+        semaphore = self._executor._stage_semaphores.get(name)
+        with self._executor._lock:
+            self._job.stage = name if semaphore is None else f"{name} (waiting)"
+        if semaphore is not None:
+            # Wake up periodically so a job waiting for a slot can still be cancelled
+            while not semaphore.acquire(timeout=0.5):
+                self.check_cancelled()
+        try:
+            with self._executor._lock:
+                self._job.stage = name
+            yield
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+
+
+class JobExecutor:
+    """
+    Process-wide background executor with a job table.
+
+    Jobs run on worker threads, independent of the Streamlit script thread, so
+    a browser refresh or another tab does not stop them. The UI polls `get` /
+    `list_jobs` for snapshots. Per-stage semaphores (see `JobContext.stage`)
+    limit how many jobs use e.g. the GPU at once while others extract audio
+    or wait for the LLM.
+    """
+    def __init__(self, max_jobs: int = 4, stage_limits: Optional[Dict[str, int]] = None, keep_finished: int = 50):
+        """
+        Initialize JobExecutor.
+
+        Args:
+            max_jobs: Jobs running at once (the rest stay queued).
+            stage_limits: Maximum concurrent jobs per stage name, e.g. {"stt": 1}.
+            keep_finished: Finished jobs kept in the table for display.
+        """
+        self.max_jobs = max_jobs
+        self.stage_limits = dict(stage_limits or {})
+        self.keep_finished = keep_finished
+        self._stage_semaphores = {name: threading.Semaphore(max(1, limit)) for name, limit in self.stage_limits.items()}
+        self._jobs: Dict[str, _Job] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_jobs), thread_name_prefix="autosub-job")
+
+    def submit(self, fn: Callable[[JobContext], Any], label: str = "") -> str:
+        """
+        Queue a job.
+
+        Args:
+            fn: Function(ctx) doing the work; its return value becomes the job result.
+            label: Display name of the job.
+
+        Returns:
+            The job id.
+        """
+        job = _Job(uuid.uuid4().hex[:12], label)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._prune()
+        job.future = self._pool.submit(self._run, job, fn)
+        logger.info(f"Job {job.job_id} queued: {label}")
+        return job.job_id
+
+    def _run(self, job: _Job, fn: Callable[[JobContext], Any]):
+        with self._lock:
+            if job.cancel_event.is_set():
+                return
+            job.state = RUNNING
+            job.started = time.time()
+
+        ctx = JobContext(self, job)
+        try:
+            result = fn(ctx)
+        except JobCancelled:
+            state, result, error = CANCELLED, None, None
+            logger.info(f"Job {job.job_id} cancelled.")
+        except Exception as e:
+            state, result, error = FAILED, None, str(e)
+            logger.error(f"Job {job.job_id} failed: {e}", exc_info=True)
+        else:
+            state, error = DONE, None
+            logger.info(f"Job {job.job_id} finished.")
+
+        with self._lock:
+            job.state = state
+            job.result = result
+            job.error = error
+            job.finished = time.time()
+            if state == DONE:
+                job.progress = 1.0
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Snapshot of one job, or None if it is unknown (or was pruned)."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.snapshot() if job else None
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """Snapshots of all jobs in the table, oldest first."""
+        with self._lock:
+            return [job.snapshot() for job in sorted(self._jobs.values(), key=lambda job: job.created)]
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a job.
+
+        A queued job is cancelled immediately; a running job stops at its
+        next progress update or stage boundary.
+
+        Returns:
+            True if the job was still active.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.state in FINISHED_STATES:
+                return False
+            job.cancel_event.set()
+            if job.state == QUEUED:
+                job.state = CANCELLED
+                job.finished = time.time()
+        logger.info(f"Job {job_id} cancellation requested.")
+        return True
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Block until a job has finished and return its snapshot."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        job.future.exception(timeout=timeout)
+        return self.get(job_id)
+
+    def _prune(self):
+        """Drop the oldest finished jobs beyond `keep_finished` (lock held)."""
+        finished = sorted(
+            (job for job in self._jobs.values() if job.state in FINISHED_STATES),
+            key=lambda job: job.finished or job.created
+        )
+        for job in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job.job_id]
+
+    def shutdown(self, cancel_running: bool = True):
+        """Stop the worker threads, cancelling active jobs first if requested."""
+        if cancel_running:
+            for snapshot in self.list_jobs():
+                self.cancel(snapshot["job_id"])
+        self._pool.shutdown(wait=True)
+
+
+_default_executor: Optional[JobExecutor] = None
+_default_executor_lock = threading.Lock()
+
+
+def get_job_executor(max_jobs: int = 4, stage_limits: Optional[Dict[str, int]] = None) -> JobExecutor:
+    """
+    Get the process-wide job executor (shared across Streamlit reruns and sessions).
+
+    The arguments only apply when the executor is first created.
+    """
+    global _default_executor
+    with _default_executor_lock:
+        if _default_executor is None:
+            _default_executor = JobExecutor(max_jobs=max_jobs, stage_limits=stage_limits)
+        return _default_executor
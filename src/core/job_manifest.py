@@ -0,0 +1,199 @@
+import os
+import json
+import time
+import shutil
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.core.segment_store import SegmentStore, as_segment_store
+from src.utils.hashing import fingerprint_file, hash_text
+
+logger = logging.getLogger(__name__)
+
+
+class JobManifest:
+    """
+    On-disk checkpoint of one subtitle job, so an interrupted job can resume.
+
+    A job is identified by the source's sampled content fingerprint (see
+    `fingerprint_file`) and the STT settings, so opening a job never reads
+    the whole video before FFmpeg starts.
+    Its directory (under `jobs/`, which survives the `temp/` cleanup) holds:
+
+    - manifest.json: source, settings, audio path and completed stages
+    - stt_segments.jsonl: segments appended as the sequential transcriber yields them
+    - stt_chunks.jsonl: finished chunks of chunked transcription
+    - stt_result.json: the final STT segments once transcription completed
+      (columnar `SegmentStore` JSON)
+    - llm_<fingerprint>.jsonl: corrected texts of finished LLM batches
+    """
+    MANIFEST_FILE = "manifest.json"
+    STT_SEGMENTS_FILE = "stt_segments.jsonl"
+    STT_CHUNKS_FILE = "stt_chunks.jsonl"
+    STT_RESULT_FILE = "stt_result.json"
+
+    def __init__(self, job_dir: str, data: Dict[str, Any]):
+        self.job_dir = Path(job_dir)
+        self.data = data
+        self._lock = threading.RLock()
+
+    @classmethod
+    def open(cls, jobs_dir: str, source_path: str, settings: Dict[str, Any]) -> "JobManifest":
+        """
+        Load the manifest of an existing job for this source and settings, or create one.
+
+        Args:
+            jobs_dir: Root directory of job checkpoints.
+            source_path: Path to the source video.
+            settings: Settings that change the STT output (model, language, chunking...).
+
+        Returns:
+            The job manifest.
+        """
+        source_hash = fingerprint_file(source_path)
+        job_id = hash_text(source_hash, json.dumps(settings, sort_keys=True))[:32]
+        job_dir = Path(jobs_dir) / job_id
+        manifest_path = job_dir / cls.MANIFEST_FILE
+
+        if manifest_path.exists():
+            try:
+                data = json.loads(manifest_path.read_text(encoding="utf-8"))
+                logger.info(f"Resuming job {job_id} (stages done: {data.get('stages', {})})")
+                manifest = cls(str(job_dir), data)
+                manifest.data["source_path"] = str(source_path)
+                manifest._save()
+                return manifest
+            except (json.JSONDecodeError, OSError) as e:
+                logger.warning(f"Corrupt job manifest {manifest_path}, starting over: {e}")
+                shutil.rmtree(job_dir, ignore_errors=True)
+
+        job_dir.mkdir(parents=True, exist_ok=True)
+        data = {
+            "job_id": job_id,
+            "source_path": str(source_path),
+            "source_hash": source_hash,
+            "settings": settings,
+            "audio_path": None,
+            "stages": {},
+            "created": time.time(),
+        }
+        manifest = cls(str(job_dir), data)
+        manifest._save()
+        return manifest
+
+    @property
+    def job_id(self) -> str:
+        return self.data["job_id"]
+
+    def _save(self):
+        """Atomically write manifest.json."""
+        self.data["updated"] = time.time()
+        path = self.job_dir / self.MANIFEST_FILE
+        tmp_path = path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(self.data, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def _append(self, filename: str, record: Any):
+        """Append one JSON line and flush it to disk."""
+        with self._lock:
+            with open(self.job_dir / filename, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _read_lines(self, filename: str) -> List[Any]:
+        """Read JSON lines, ignoring a line truncated by a crash."""
+        path = self.job_dir / filename
+        if not path.exists():
+            return []
+        records = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning(f"Ignoring truncated checkpoint line in {path}")
+                    break
+        return records
+
+    def is_stage_done(self, stage: str) -> bool:
+        return bool(self.data["stages"].get(stage))
+
+    def _mark_stage_done(self, stage: str):
+        with self._lock:
+            self.data["stages"][stage] = time.time()
+            self._save()
+
+    # Audio extraction
+
+    @property
+    def audio_path(self) -> Optional[str]:
+        """Extracted audio path, if it was recorded and still exists."""
+        path = self.data.get("audio_path")
+        return path if path and Path(path).exists() else None
+
+    def set_audio_path(self, audio_path: str):
+        with self._lock:
+            self.data["audio_path"] = audio_path
+            self._save()
+        self._mark_stage_done("extract")
+
+    # STT
+
+    def stt_segments(self) -> List[Dict[str, Any]]:
+        """Segments checkpointed so far by sequential transcription."""
+        return self._read_lines(self.STT_SEGMENTS_FILE)
+
+    def append_stt_segment(self, segment: Dict[str, Any]):
+        self._append(self.STT_SEGMENTS_FILE, segment)
+
+    def stt_chunks(self) -> Dict[float, List[Dict[str, Any]]]:
+        """Finished chunks of chunked transcription, keyed by window start."""
+        return {record["start"]: record["segments"] for record in self._read_lines(self.STT_CHUNKS_FILE)}
+
+    def save_stt_chunk(self, start: float, end: float, segments: List[Dict[str, Any]]):
+        self._append(self.STT_CHUNKS_FILE, {"start": start, "end": end, "segments": segments})
+
+    def stt_result(self) -> Optional[SegmentStore]:
+        """Final STT segments, if transcription completed."""
+        if not self.is_stage_done("stt"):
+            return None
+        data = json.loads((self.job_dir / self.STT_RESULT_FILE).read_text(encoding="utf-8"))
+        # Checkpoints written before the columnar format hold a list of segment dicts
+        return SegmentStore(data) if isinstance(data, list) else SegmentStore.from_json(data)
+
+    def complete_stt(self, segments: Iterable[Dict[str, Any]]):
+        path = self.job_dir / self.STT_RESULT_FILE
+        tmp_path = path.with_suffix(".json.tmp")
+        payload = as_segment_store(segments).to_json()
+        tmp_path.write_text(json.dumps(payload, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp_path, path)
+        self._mark_stage_done("stt")
+
+    # LLM correction
+
+    def _llm_file(self, fingerprint: str) -> str:
+        return f"llm_{fingerprint[:16]}.jsonl"
+
+    def llm_batches(self, fingerprint: str) -> Dict[Tuple[int, int], List[str]]:
+        """
+        Corrected batches saved under the given LLM settings fingerprint.
+
+        Batches saved with different LLM settings (model, prompt, batching) are not returned.
+        """
+        return {
+            (record["start"], record["stop"]): record["texts"]
+            for record in self._read_lines(self._llm_file(fingerprint))
+        }
+
+    def save_llm_batch(self, fingerprint: str, batch_range: range, texts: List[str]):
+        self._append(self._llm_file(fingerprint), {"start": batch_range.start, "stop": batch_range.stop, "texts": texts})
+
+    # Lifecycle
+
+    def discard(self):
+        """Delete the checkpoint once the job has finished successfully."""
+        shutil.rmtree(self.job_dir, ignore_errors=True)
+        logger.info(f"Job {self.job_id} finished, checkpoint removed.")
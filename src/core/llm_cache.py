@@ -0,0 +1,137 @@
+import json
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.utils.hashing import hash_text
+
+logger = logging.getLogger(__name__)
+
+
+class CorrectionCache:
+    """
+    Persistent SQLite cache of LLM-corrected batch texts.
+
+    Entries are keyed by a hash of the batch texts, model name, system prompt
+    and glossary, so only batches whose inputs are unchanged are reused.
+    When the stored payload exceeds the size cap, least recently used entries
+    are evicted.
+    """
+    SCHEMA_VERSION = 1
+
+    def __init__(self, db_path: str = "cache/llm_cache.sqlite3", max_size_mb: float = 64):
+        """
+        Initialize CorrectionCache.
+
+        Args:
+            db_path: Path to the SQLite database file.
+            max_size_mb: Size cap of the stored corrections in megabytes.
+        """
+        self.db_path = Path(db_path)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS corrections ("
+            " key TEXT PRIMARY KEY,"
+            " texts TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_corrections_last_access ON corrections(last_access)")
+        self._conn.commit()
+
+    def make_key(self, texts: List[str], model: str, system_prompt: str, glossary: Any) -> str:
+        """
+        Build the cache key for one batch.
+
+        Args:
+            texts: Input texts of the batch, in order.
+            model: Model name.
+            system_prompt: System prompt sent with the batch.
+            glossary: Glossary used for the batch.
+
+        Returns:
+            Hex cache key.
+        """
+        return hash_text(
+            str(self.SCHEMA_VERSION),
+            json.dumps(texts, ensure_ascii=False),
+            model,
+            system_prompt,
+            json.dumps(glossary, ensure_ascii=False, sort_keys=True),
+        )
+
+    def get(self, key: str) -> Optional[List[str]]:
+        """
+        Look up corrected texts for a batch key.
+
+        Returns:
+            The corrected texts, or None on a miss.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT texts FROM corrections WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE corrections SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, texts: List[str]):
+        """Store corrected texts for a batch key and enforce the size cap."""
+        payload = json.dumps(texts, ensure_ascii=False)
+        size = len(payload.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO corrections (key, texts, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, payload, size, time.time()),
+            )
+            self._evict(keep=key)
+            self._conn.commit()
+
+    def _evict(self, keep: str):
+        """Delete least recently used entries until the cache fits its size cap (lock held)."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM corrections").fetchone()[0]
+        if total <= self.max_size_bytes:
+            return
+
+        evicted = 0
+        rows = self._conn.execute("SELECT key, size FROM corrections ORDER BY last_access ASC").fetchall()
+        for key, size in rows:
+            if total <= self.max_size_bytes:
+                break
+            if key == keep:
+                continue
+            self._conn.execute("DELETE FROM corrections WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        logger.info(f"Evicted {evicted} cached corrections (size now {total} bytes)")
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current cache size."""
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM corrections").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "size_bytes": size}
+
+    def clear(self):
+        """Remove every entry and reset the counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM corrections")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -2,20 +2,102 @@ import os
 import json
 import logging
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from collections.abc import Sized
+from typing import Iterable, Iterator, List, Dict, Any, Optional, Tuple
 import google.generativeai as genai
 from google.generativeai.types import HarmCategory, HarmBlockThreshold
 
+from src.core.rate_limiter import RateLimiter, backoff_delay
+from src.core.llm_cache import CorrectionCache
+from src.core.glossary import Glossary, load_glossary
+from src.core.segment_store import SegmentStore
+
 # Basic logging configuration
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token estimate for rate limiting and batching.
+    
+    Uses ~4 UTF-8 bytes per token, which is conservative for Korean
+    (3 bytes per syllable) and close for English.
+    """
+    return max(1, (len(text.encode("utf-8")) + 3) // 4)
+
+
+# JSON framing per item in the compact payload: {"id":123,"text":""},
+ITEM_TOKEN_OVERHEAD = 8
+
+
+def iter_batches(segments: Iterable[Dict[str, Any]], max_segments: int,
+                 token_budget: Optional[int] = None) -> Iterator[Tuple[range, List[Dict[str, Any]]]]:
+    """
+    Pack consecutive segments into batches bounded by count and estimated tokens.
+    
+    A batch is closed when adding the next segment would exceed `token_budget`
+    input tokens or `max_segments` segments. A single segment larger than the
+    budget still forms its own batch. Works on any iterable, so a batch is
+    yielded as soon as it is full even while segments are still being produced.
+    
+    Args:
+        segments: Iterable of subtitle segments.
+        max_segments: Maximum number of segments per batch.
+        token_budget: Target input tokens per batch, or None to batch by count only.
+        
+    Yields:
+        (index range, segments) of each batch.
+    """
+    max_segments = max(1, max_segments)
+    batch: List[Dict[str, Any]] = []
+    start = 0
+    tokens = 0
+    for index, segment in enumerate(segments):
+        segment_tokens = estimate_tokens(segment["text"]) + ITEM_TOKEN_OVERHEAD
+        if batch and token_budget is not None and tokens + segment_tokens > token_budget:
+            yield range(start, index), batch
+            batch, start, tokens = [], index, 0
+        batch.append(segment)
+        tokens += segment_tokens
+        # Don't wait for the next segment to close a full batch
+        if len(batch) >= max_segments:
+            yield range(start, index + 1), batch
+            batch, start, tokens = [], index + 1, 0
+    if batch:
+        yield range(start, start + len(batch)), batch
+
+
+def make_batches(segments: List[Dict[str, Any]], max_segments: int, token_budget: Optional[int] = None) -> List[range]:
+    """
+    Index ranges of the batches `iter_batches` would build for `segments`.
+    
+    Args:
+        segments: List of subtitle segments.
+        max_segments: Maximum number of segments per batch.
+        token_budget: Target input tokens per batch, or None to batch by count only.
+        
+    Returns:
+        List of index ranges into `segments`.
+    """
+    return [batch_range for batch_range, _ in iter_batches(segments, max_segments, token_budget)]
+
+
 class LLMEngine:
     """
     LLM Engine using Google Gemini for subtitle correction.
     """
-    def __init__(self, api_key: Optional[str] = None, prompt_path: str = "src/prompts/correction.txt", glossary_path: str = "src/prompts/glossary.json"):
+    MAX_RETRIES = 3
+    MAX_SPLIT_DEPTH = 2
+    BACKOFF_BASE = 2.0   # seconds
+    BACKOFF_CAP = 30.0   # seconds
+
+    def __init__(self, api_key: Optional[str] = None, prompt_path: str = "src/prompts/correction.txt", glossary_path: str = "src/prompts/glossary.json",
+                 requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None,
+                 cache: Optional[CorrectionCache] = None):
         """
         Initialize LLM Engine.
         
@@ -23,6 +105,9 @@ class LLMEngine:
             api_key: Gemini API Key.
             prompt_path: Path to the system prompt file.
             glossary_path: Path to the glossary JSON file.
+            requests_per_minute: Request rate limit shared by all batches, or None.
+            tokens_per_minute: Estimated token rate limit shared by all batches, or None.
+            cache: Optional persistent cache of corrected batches.
         """
         self.api_key = api_key or os.getenv("GEMINI_API_KEY")
         if not self.api_key:
@@ -34,7 +119,8 @@ class LLMEngine:
         self.glossary_path = Path(glossary_path)
         
         self.base_system_prompt = self._load_prompt()
-        self.glossary = self._load_glossary()
+        self.rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.cache = cache
 
     def _load_prompt(self) -> str:
         """Load system prompt from file."""
@@ -43,114 +129,301 @@ class LLMEngine:
             return "You are a subtitle correction expert. Correct the following subtitles."
         return self.prompt_path.read_text(encoding="utf-8")
 
-    def _load_glossary(self) -> Dict[str, str]:
-        """Load glossary from JSON file."""
-        if not self.glossary_path.exists():
-            logger.warning(f"Glossary file not found: {self.glossary_path}")
-            return {}
-        try:
-            return json.loads(self.glossary_path.read_text(encoding="utf-8"))
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse glossary: {e}")
-            return {}
+    @property
+    def glossary_index(self) -> Glossary:
+        """The glossary matcher, rebuilt only when the glossary file changes."""
+        return load_glossary(str(self.glossary_path))
+
+    @property
+    def glossary(self) -> Dict[str, Any]:
+        """Glossary entries as loaded from the file."""
+        return self.glossary_index.entries
+
+    @staticmethod
+    def _apply_glossary(glossary: Glossary, segments: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Yield segments with the glossary substitutions applied (copied only if the text changes)."""
+        for segment in segments:
+            text = glossary.apply(segment["text"])
+            yield segment if text == segment["text"] else dict(segment, text=text)
 
-    def correct_subtitles(self, segments: List[Dict[str, Any]], batch_size: int = 30, model: str = "gemini-2.5-flash", progress_callback=None) -> List[Dict[str, Any]]:
+    def _system_prompt(self, glossary_subset: Dict[str, Any]) -> str:
+        """System prompt with only the glossary entries relevant to a batch."""
+        if not glossary_subset:
+            return self.base_system_prompt
+        glossary_str = json.dumps(glossary_subset, ensure_ascii=False, separators=(",", ":"))
+        return f"{self.base_system_prompt}\n\n## Glossary\n{glossary_str}"
+
+    def correct_subtitles(self, segments: Iterable[Dict[str, Any]], batch_size: int = 100, model: str = "gemini-2.5-flash", progress_callback=None,
+                          concurrency: int = 1, token_budget: Optional[int] = 1500,
+                          completed_batches: Optional[Dict[Tuple[int, int], List[str]]] = None,
+                          batch_callback=None, segment_callback=None, glossary_only: bool = False) -> SegmentStore:
         """
         Correct subtitles using Gemini.
         
+        Segments are packed into batches up to `token_budget` estimated input
+        tokens (and at most `batch_size` segments). Batches are sent by up to
+        `concurrency` threads, throttled by the engine's rate limiter. Output
+        order always follows the input order.
+        
+        `segments` may be a generator (e.g. `STTEngine.iter_transcribe`): each
+        batch is dispatched as soon as it fills, so correction overlaps with
+        transcription. Progress totals then count the segments received so far.
+        
+        The glossary is applied locally first: known mis-hearings are replaced
+        and preserved terms normalized (see `Glossary`). Each batch's prompt
+        then only lists the glossary entries occurring in that batch.
+        
         Args:
-            segments: List of subtitle segments.
-            batch_size: Number of segments to process in one API call.
+            segments: List or iterable of subtitle segments.
+            batch_size: Maximum number of segments in one API call.
             model: Gemini model to use.
             progress_callback: Optional function(current_count, total_count) to update progress.
+            concurrency: Number of batches in flight at once.
+            token_budget: Target estimated input tokens per API call, or None to batch by count only.
+            completed_batches: Corrected texts of batches finished by an earlier run, keyed by
+                (start, stop) segment index; these batches are not sent again.
+            batch_callback: Optional function(batch_range, texts) called when a batch is fully corrected.
+            segment_callback: Optional function(segment) called for each output segment, in
+                output order, as soon as all batches before it are done (e.g. `SRTWriter.write`).
+            glossary_only: Only apply the glossary, without any API call.
             
         Returns:
-            List of corrected segments.
+            Store of corrected segments.
         """
+        known_total = len(segments) if isinstance(segments, Sized) else None
+        glossary = self.glossary_index
+        segments = self._apply_glossary(glossary, segments)
+        
+        def passthrough() -> SegmentStore:
+            uncorrected = SegmentStore(segments)
+            if segment_callback:
+                for segment in uncorrected:
+                    segment_callback(segment)
+            return uncorrected
+        
+        if glossary_only:
+            logger.info("Glossary-only mode: skipping LLM correction.")
+            return passthrough()
         if not self.api_key:
             logger.error("Gemini API Key not initialized. Skipping correction.")
-            return segments
+            return passthrough()
 
-        corrected_segments = []
-        
-        # Prepare glossary string to append to prompt
-        glossary_str = json.dumps(self.glossary, ensure_ascii=False, indent=2)
-        system_prompt = f"{self.base_system_prompt}\n\n## Glossary\n{glossary_str}"
-        
-        total_batches = (len(segments) + batch_size - 1) // batch_size
-        
         # Initialize model
         # Using generation_config to ensure JSON output if possible (Gemini 1.5 supports response_mime_type="application/json")
         generation_config = {
             "temperature": 0.0,
             "response_mime_type": "application/json"
         }
+        # One model per distinct system prompt (batches differ only in their glossary entries)
+        gemini_models = {}
+        models_lock = threading.Lock()
+        
+        def get_model(system_prompt: str):
+            with models_lock:
+                if system_prompt not in gemini_models:
+                    gemini_models[system_prompt] = genai.GenerativeModel(
+                        model_name=model,
+                        generation_config=generation_config,
+                        system_instruction=system_prompt
+                    )
+                return gemini_models[system_prompt]
         
         try:
-            gemini_model = genai.GenerativeModel(
-                model_name=model,
-                generation_config=generation_config,
-                system_instruction=system_prompt
-            )
+            get_model(self.base_system_prompt)
         except Exception as e:
             logger.error(f"Failed to initialize Gemini model: {e}")
-            return segments
+            return passthrough()
+        
+        completed_batches = completed_batches or {}
         
-        for i in range(0, len(segments), batch_size):
-            batch = segments[i:i+batch_size]
-            logger.info(f"Processing batch {i//batch_size + 1}/{total_batches} ({len(batch)} segments)...")
+        def run_batch(index: int, batch_range: range, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            done_texts = completed_batches.get((batch_range.start, batch_range.stop))
+            if done_texts is not None and len(done_texts) == len(batch):
+                logger.info(f"Batch {index + 1} restored from checkpoint.")
+                return [dict(seg, text=text) for seg, text in zip(batch, done_texts)]
             
+            glossary_subset = glossary.subset(seg["text"] for seg in batch)
+            system_prompt = self._system_prompt(glossary_subset)
+            cache_key = None
+            if self.cache:
+                cache_key = self.cache.make_key([seg["text"] for seg in batch], model, system_prompt, glossary_subset)
+                cached_texts = self.cache.get(cache_key)
+                if cached_texts is not None and len(cached_texts) == len(batch):
+                    logger.info(f"Batch {index + 1} served from cache.")
+                    if batch_callback:
+                        batch_callback(batch_range, cached_texts)
+                    return [dict(seg, text=text) for seg, text in zip(batch, cached_texts)]
+            
+            logger.info(f"Processing batch {index + 1} ({len(batch)} segments)...")
             try:
-                corrected_batch = self._process_batch(batch, gemini_model)
-                corrected_segments.extend(corrected_batch)
+                ids = list(batch_range)
+                corrected_texts = self._correct_texts(dict(zip(ids, (seg["text"] for seg in batch))), get_model(system_prompt))
+                corrected_batch = self._merge_corrections(batch, ids, corrected_texts)
+                # Only fully corrected batches are cached/checkpointed, so partial ones are retried next run
+                if len(corrected_texts) == len(batch):
+                    texts = [seg["text"] for seg in corrected_batch]
+                    if cache_key:
+                        self.cache.put(cache_key, texts)
+                    if batch_callback:
+                        batch_callback(batch_range, texts)
+                return corrected_batch
             except Exception as e:
-                logger.error(f"Failed to process batch {i//batch_size + 1}: {e}")
-                # Fallback: use original segments if correction fails
-                corrected_segments.extend(batch)
+                logger.error(f"Failed to process batch {index + 1}: {e}")
+                # Fallback: use the (glossary-corrected) input segments if correction fails
+                return batch
+        
+        results: Dict[int, List[Dict[str, Any]]] = {}
+        in_flight = {}
+        received = 0
+        done_count = 0
+        emitted = 0
+        
+        def collect(futures):
+            # Progress and segments are reported from the calling thread only
+            nonlocal done_count, emitted
+            for future in futures:
+                batch_range = in_flight.pop(future)
+                results[batch_range.start] = future.result()
+                done_count += len(batch_range)
+                if progress_callback:
+                    progress_callback(done_count, known_total or received)
+            if segment_callback:
+                while emitted in results:
+                    batch = results[emitted]
+                    for segment in batch:
+                        segment_callback(segment)
+                    emitted += len(batch)
+        
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            for index, (batch_range, batch) in enumerate(iter_batches(segments, batch_size, token_budget)):
+                received = batch_range.stop
+                in_flight[executor.submit(run_batch, index, batch_range, batch)] = batch_range
+                collect([future for future in in_flight if future.done()])
+            collect(as_completed(list(in_flight)))
+        
+        if self.cache:
+            logger.info(f"Correction cache stats: {self.cache.stats()}")
+        
+        return SegmentStore(segment for start in sorted(results) for segment in results[start])
+
+    @staticmethod
+    def _merge_corrections(batch: List[Dict[str, Any]], ids: List[int], corrected_texts: Dict[int, str]) -> List[Dict[str, Any]]:
+        """Apply corrected texts by id, keeping original timestamps (and text where uncorrected)."""
+        return [
+            dict(original, text=corrected_texts[segment_id]) if segment_id in corrected_texts else original
+            for segment_id, original in zip(ids, batch)
+        ]
+
+    def _correct_texts(self, texts: Dict[int, str], model, split_depth: int = 0) -> Dict[int, str]:
+        """
+        Correct texts by id, re-requesting only ids that came back missing or invalid.
+        
+        Only `id` and `text` are sent, so timestamps never pass through the
+        model. Valid items of a partial response are kept; the remaining ids
+        are sent again. If ids are still unresolved after `MAX_RETRIES`
+        requests, they are split in halves and retried (up to `MAX_SPLIT_DEPTH`).
+        
+        Args:
+            texts: Dict of id -> original text.
+            model: Gemini model instance.
+            split_depth: Current split recursion depth.
+            
+        Returns:
+            Dict of id -> corrected text for the ids that were corrected.
             
-            if progress_callback:
-                progress_callback(min(i + batch_size, len(segments)), len(segments))
-                
-        return corrected_segments
-
-    def _process_batch(self, batch: List[Dict[str, Any]], model) -> List[Dict[str, Any]]:
-        """Process a single batch of segments."""
-        # Prepare input JSON
-        input_json = json.dumps(batch, ensure_ascii=False, indent=2)
-        
-        # Retry logic
-        max_retries = 3
+        Raises:
+            The last API error if no request of this call succeeded.
+        """
+        accepted: Dict[int, str] = {}
+        pending = list(texts)
+        last_error = None
+        succeeded = False
+        
+        max_retries = self.MAX_RETRIES
         for attempt in range(max_retries):
+            # Prepare compact input JSON
+            payload = [{"id": segment_id, "text": texts[segment_id]} for segment_id in pending]
+            input_json = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+            # Budget for the request plus a response of similar size
+            estimated_tokens = 2 * estimate_tokens(input_json)
+            
             try:
+                self.rate_limiter.acquire(estimated_tokens)
                 response = model.generate_content(input_json)
-                response_text = response.text
-                
-                # Parse response
-                corrected_data = self._parse_response(response_text)
-                
-                # Validate count
-                if len(corrected_data) != len(batch):
-                    logger.warning(f"Mismatch in corrected segments count. Expected {len(batch)}, got {len(corrected_data)}.")
-                    # If mismatch, revert to original for this batch to ensure timestamp integrity
-                    logger.error("Segment count mismatch. Reverting to original text for this batch.")
-                    return batch
-                
-                # Merge corrections (keep original timestamps to be safe)
-                result = []
-                for original, corrected in zip(batch, corrected_data):
-                    new_seg = original.copy()
-                    new_seg["text"] = corrected.get("text", original["text"])
-                    result.append(new_seg)
-                        
-                return result
-                
+                corrected_data = self._parse_response(response.text)
             except Exception as e:
+                last_error = e
                 logger.error(f"Error calling Gemini (Attempt {attempt+1}/{max_retries}): {e}")
-                if attempt == max_retries - 1:
-                    raise
-                time.sleep(2)
+                if attempt < max_retries - 1:
+                    # Exponential backoff with jitter so concurrent batches don't retry in lockstep
+                    time.sleep(backoff_delay(attempt, base=self.BACKOFF_BASE, cap=self.BACKOFF_CAP))
+                continue
+            
+            succeeded = True
+            accepted.update(self._map_corrections(pending, texts, corrected_data))
+            pending = [segment_id for segment_id in pending if segment_id not in accepted]
+            if not pending:
+                return accepted
+            logger.warning(f"{len(pending)}/{len(texts)} segments missing or invalid in response "
+                           f"(Attempt {attempt+1}/{max_retries}). Re-requesting only those.")
+        
+        if not succeeded:
+            # Splitting does not help when the API itself keeps failing
+            if split_depth == 0:
+                raise last_error
+            return accepted
+        
+        if len(pending) > 1 and split_depth < self.MAX_SPLIT_DEPTH:
+            middle = len(pending) // 2
+            for half in (pending[:middle], pending[middle:]):
+                try:
+                    accepted.update(self._correct_texts({i: texts[i] for i in half}, model, split_depth + 1))
+                except Exception as e:
+                    logger.error(f"Failed to correct split batch of {len(half)} segments: {e}")
+        
+        unresolved = len(texts) - len(accepted)
+        if unresolved and split_depth == 0:
+            logger.error(f"Keeping original text for {unresolved}/{len(texts)} segments of this batch.")
+        return accepted
+
+    @staticmethod
+    def _map_corrections(ids: List[int], originals: Dict[int, str], corrected_data: List[Any]) -> Dict[int, str]:
+        """
+        Map response items to the requested segment ids.
+        
+        Items are matched by their `id` field; unknown or duplicate ids and
+        items without a text are ignored, as are empty texts for non-empty
+        originals. A response without ids is accepted positionally only if it
+        has exactly one item per requested segment.
+        
+        Returns:
+            Dict of id -> corrected text for the valid items.
+        """
+        if not isinstance(corrected_data, list):
+            return {}
+        items = [item for item in corrected_data if isinstance(item, dict) and isinstance(item.get("text"), str)]
+        
+        if items and all("id" not in item for item in items):
+            if len(items) != len(ids):
+                return {}
+            pairs = zip(ids, (item["text"] for item in items))
+        else:
+            pairs = []
+            for item in items:
+                try:
+                    pairs.append((int(item.get("id")), item["text"]))
+                except (TypeError, ValueError):
+                    continue
         
-        return batch
+        requested = set(ids)
+        texts = {}
+        for segment_id, text in pairs:
+            if segment_id not in requested or segment_id in texts:
+                continue
+            if not text.strip() and originals[segment_id].strip():
+                continue
+            texts[segment_id] = text
+        return texts
 
     def _parse_response(self, response_text: str) -> List[Dict[str, Any]]:
         """Extract and parse JSON from response text."""
@@ -0,0 +1,150 @@
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _PoolEntry:
+    __slots__ = ("model", "refcount", "last_used", "load_lock")
+
+    def __init__(self):
+        self.model = None
+        self.refcount = 0
+        self.last_used = time.monotonic()
+        self.load_lock = threading.Lock()
+
+
+class WhisperModelPool:
+    """
+    Process-wide registry of loaded Whisper models.
+
+    Models are keyed by their load configuration (model size, device, compute
+    type, ...), shared between engines through reference counting, and unloaded
+    once nobody has used them for `idle_timeout` seconds.
+    """
+    def __init__(self, idle_timeout: float = 600):
+        """
+        Initialize WhisperModelPool.
+
+        Args:
+            idle_timeout: Seconds an unreferenced model stays loaded.
+        """
+        self.idle_timeout = idle_timeout
+        self._entries: Dict[Hashable, _PoolEntry] = {}
+        self._lock = threading.Lock()
+        self._janitor: Optional[threading.Thread] = None
+
+    def acquire(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Get the model for `key`, loading it with `loader` if it is not loaded yet.
+
+        Concurrent callers with the same key wait for a single load.
+        Every call must be paired with `release(key)`.
+
+        Args:
+            key: Hashable load configuration.
+            loader: Function that loads and returns the model.
+
+        Returns:
+            The shared model instance.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _PoolEntry()
+                self._entries[key] = entry
+            entry.refcount += 1
+            self._start_janitor()
+
+        try:
+            with entry.load_lock:
+                if entry.model is None:
+                    logger.info(f"Model pool miss, loading: {key}")
+                    entry.model = loader()
+                else:
+                    logger.info(f"Model pool hit: {key}")
+            return entry.model
+        except Exception:
+            with self._lock:
+                entry.refcount -= 1
+                if entry.refcount == 0 and entry.model is None:
+                    self._entries.pop(key, None)
+            raise
+
+    def release(self, key: Hashable):
+        """Drop one reference to the model for `key`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.refcount == 0:
+                return
+            entry.refcount -= 1
+            entry.last_used = time.monotonic()
+
+    def evict_idle(self, max_idle: Optional[float] = None) -> int:
+        """
+        Unload unreferenced models idle for longer than `max_idle` seconds.
+
+        Args:
+            max_idle: Idle threshold; defaults to the pool's idle timeout.
+
+        Returns:
+            Number of models unloaded.
+        """
+        max_idle = self.idle_timeout if max_idle is None else max_idle
+        now = time.monotonic()
+        with self._lock:
+            idle_keys = [
+                key for key, entry in self._entries.items()
+                if entry.refcount == 0 and entry.model is not None and now - entry.last_used >= max_idle
+            ]
+            for key in idle_keys:
+                del self._entries[key]
+        for key in idle_keys:
+            logger.info(f"Unloaded idle model: {key}")
+        return len(idle_keys)
+
+    def clear(self) -> int:
+        """Unload every model that is not currently in use."""
+        return self.evict_idle(max_idle=0)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Describe loaded models (key, refcount, idle seconds)."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {"key": key, "refcount": entry.refcount, "idle_seconds": 0.0 if entry.refcount else now - entry.last_used}
+                for key, entry in self._entries.items()
+                if entry.model is not None
+            ]
+
+    def _start_janitor(self):
+        """Start the background eviction thread (called with the lock held)."""
+        if self._janitor is not None and self._janitor.is_alive():
+            return
+        self._janitor = threading.Thread(target=self._janitor_loop, name="whisper-model-pool", daemon=True)
+        self._janitor.start()
+
+    def _janitor_loop(self):
+        interval = max(1.0, min(60.0, self.idle_timeout / 2))
+        while True:
+            time.sleep(interval)
+            self.evict_idle()
+            with self._lock:
+                if not self._entries:
+                    self._janitor = None
+                    return
+
+
+_default_pool: Optional[WhisperModelPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_model_pool() -> WhisperModelPool:
+    """Get the process-wide model pool (shared across Streamlit reruns and sessions)."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = WhisperModelPool()
+        return _default_pool
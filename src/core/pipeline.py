@@ -0,0 +1,542 @@
+import json
+import time
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from src.core.audio_processor import AudioProcessor
+from src.core.srt_generator import SRTGenerator
+from src.core.subtitle_export import export_subtitles
+from src.core.postprocess import SegmentPostProcessor
+from src.core.alignment import align_segments
+from src.core.segment_store import SegmentStore
+from src.core.job_manifest import JobManifest
+from src.core.vad import SpeechMapCache
+from src.core.two_pass import DEFAULT_REFINE_THRESHOLD, two_pass_transcribe
+from src.utils.hashing import hash_text
+
+logger = logging.getLogger(__name__)
+
+# correct_subtitles options that don't change the corrected texts
+_RUNTIME_LLM_OPTIONS = {"concurrency", "progress_callback", "segment_callback"}
+
+
+def stt_checkpoint_settings(model: str, language: str, chunked: bool = False, chunk_size: float = 300,
+                            overlap_size: float = 5, vad: bool = False, streaming: bool = False,
+                            draft_model: Optional[str] = None, refine_threshold: float = DEFAULT_REFINE_THRESHOLD,
+                            word_timestamps: bool = False) -> Dict[str, Any]:
+    """
+    Settings that identify a job's checkpoint (see `JobManifest.open`).
+
+    Everything that changes the STT output must be part of it, so a run
+    with other settings never resumes from a stale result. Used by both
+    `BatchPipeline` and the GUI.
+
+    Args:
+        model: Whisper model size.
+        language: Transcription language code.
+        chunked: Chunked transcription from an audio file.
+        chunk_size: Chunk length in seconds (chunked and streaming modes).
+        overlap_size: Chunk overlap in seconds (chunked and streaming modes).
+        vad: Chunked transcription of the speech map only.
+        streaming: Transcription of windows streamed from FFmpeg.
+        draft_model: Draft model of two-pass transcription, or None.
+        refine_threshold: Confidence below which draft segments are refined (two-pass only).
+        word_timestamps: Segments carry word timings.
+
+    Returns:
+        JSON-serializable settings dict.
+    """
+    settings = {"model": model, "language": language, "chunked": chunked}
+    if chunked:
+        settings.update(chunk_size=chunk_size, overlap_size=overlap_size, vad=vad)
+    if streaming:
+        settings.update(streaming=True, chunk_size=chunk_size, overlap_size=overlap_size)
+    if draft_model:
+        settings.update(draft_model=draft_model, refine_threshold=refine_threshold)
+    if word_timestamps:
+        settings.update(word_timestamps=True)
+    return settings
+
+
+def checkpointed_transcribe(stt_engine, manifest: JobManifest, audio_path: str, language: str = "ko",
+                            chunked: bool = False, chunk_size: float = 300, overlap_size: float = 5,
+                            max_workers: int = 2, progress_callback=None,
+                            vad_cache: Optional[SpeechMapCache] = None) -> List[Dict[str, Any]]:
+    """
+    Transcribe with checkpoints, resuming from whatever an earlier run left in the manifest.
+
+    Sequential transcription resumes after the last checkpointed segment;
+    chunked transcription skips finished chunks (and transcribes only the
+    speech if a `vad_cache` is given).
+
+    Returns:
+        List of segments.
+    """
+    if not chunked:
+        return list(iter_checkpointed_segments(stt_engine, manifest, audio_path, language, progress_callback))
+
+    segments = manifest.stt_result()
+    if segments is not None:
+        logger.info(f"Job {manifest.job_id}: reusing completed transcription.")
+        return segments
+
+    segments = stt_engine.transcribe_chunked(
+        audio_path,
+        language=language,
+        chunk_size=chunk_size,
+        overlap_size=overlap_size,
+        max_workers=max_workers,
+        progress_callback=progress_callback,
+        completed_chunks=manifest.stt_chunks(),
+        chunk_callback=manifest.save_stt_chunk,
+        vad_cache=vad_cache
+    )
+    manifest.complete_stt(segments)
+    return segments
+
+
+def iter_checkpointed_segments(stt_engine, manifest: JobManifest, audio_path: str, language: str = "ko",
+                               progress_callback=None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield segments of sequential transcription, checkpointing each one before it is yielded.
+
+    Segments from an earlier run are yielded first, then transcription
+    resumes after the last of them. The STT stage is marked complete once
+    the stream is exhausted.
+    """
+    segments = manifest.stt_result()
+    if segments is not None:
+        logger.info(f"Job {manifest.job_id}: reusing completed transcription.")
+        yield from segments
+        return
+
+    segments = manifest.stt_segments()
+    yield from segments
+    start_time = segments[-1]["end"] if segments else 0.0
+    for segment in stt_engine.iter_transcribe(audio_path, language=language, progress_callback=progress_callback,
+                                              start_time=start_time):
+        manifest.append_stt_segment(segment)
+        segments.append(segment)
+        yield segment
+    manifest.complete_stt(segments)
+
+
+def transcribe_and_correct(stt_engine, llm_engine, audio_path: str, manifest: Optional[JobManifest] = None,
+                           language: str = "ko", stt_progress_callback=None,
+                           **llm_options) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Run sequential transcription and LLM correction concurrently.
+
+    Segments are streamed from Whisper into `LLMEngine.correct_subtitles`,
+    which dispatches each batch as soon as it fills, so the wall-clock time
+    is close to the slower of the two stages instead of their sum.
+
+    Args:
+        stt_engine: STTEngine instance.
+        llm_engine: LLMEngine instance.
+        audio_path: Path to the extracted audio.
+        manifest: Optional job manifest to checkpoint and resume both stages.
+        language: Transcription language code.
+        stt_progress_callback: Optional function(current_time, total_duration) for STT progress.
+        **llm_options: Keyword arguments for `LLMEngine.correct_subtitles`.
+
+    Returns:
+        Tuple of (raw STT segments, corrected segments).
+    """
+    stt_segments = SegmentStore()
+
+    def segment_stream():
+        if manifest:
+            source = iter_checkpointed_segments(stt_engine, manifest, audio_path, language, stt_progress_callback)
+        else:
+            source = stt_engine.iter_transcribe(audio_path, language=language, progress_callback=stt_progress_callback)
+        for segment in source:
+            stt_segments.append(segment)
+            yield segment
+
+    if manifest:
+        corrected = checkpointed_correct(llm_engine, manifest, segment_stream(), **llm_options)
+    else:
+        corrected = llm_engine.correct_subtitles(segment_stream(), **llm_options)
+    return stt_segments, corrected
+
+
+def llm_fingerprint(llm_engine, options: Dict[str, Any]) -> str:
+    """Fingerprint of everything that changes the LLM output: prompt, glossary and batching options."""
+    relevant = {k: v for k, v in options.items() if k not in _RUNTIME_LLM_OPTIONS}
+    return hash_text(
+        json.dumps(relevant, sort_keys=True),
+        llm_engine.base_system_prompt,
+        json.dumps(llm_engine.glossary, ensure_ascii=False, sort_keys=True),
+    )
+
+
+def checkpointed_correct(llm_engine, manifest: JobManifest, segments: Iterable[Dict[str, Any]],
+                         **options) -> List[Dict[str, Any]]:
+    """
+    Run LLM correction, skipping batches already corrected by an earlier run of this job.
+
+    Args:
+        llm_engine: LLMEngine instance.
+        manifest: Job manifest.
+        segments: Segments (list or iterable) to correct.
+        **options: Keyword arguments for `LLMEngine.correct_subtitles`.
+
+    Returns:
+        List of corrected segments.
+    """
+    fingerprint = llm_fingerprint(llm_engine, options)
+    return llm_engine.correct_subtitles(
+        segments,
+        completed_batches=manifest.llm_batches(fingerprint),
+        batch_callback=lambda batch_range, texts: manifest.save_llm_batch(fingerprint, batch_range, texts),
+        **options
+    )
+
+
+def collect_video_files(inputs: List[Path], recursive: bool = False) -> List[str]:
+    """
+    Expand files and directories into a sorted, de-duplicated list of supported videos.
+
+    Args:
+        inputs: Video files and/or directories.
+        recursive: Also search subdirectories.
+
+    Returns:
+        List of video file paths.
+    """
+    found = []
+    for path in map(Path, inputs):
+        if path.is_dir():
+            candidates = path.rglob("*") if recursive else path.iterdir()
+            found.extend(
+                p for p in candidates
+                if p.is_file() and p.suffix.lower() in AudioProcessor.SUPPORTED_FORMATS
+            )
+        elif path.is_file():
+            found.append(path)
+        else:
+            logger.warning(f"Input not found: {path}")
+
+    unique = {}
+    for path in found:
+        unique.setdefault(str(path.resolve()), str(path))
+    return sorted(unique.values())
+
+
+class FolderWatcher:
+    """
+    Polls directories for new videos, reporting each one once it stops growing.
+
+    A file is ready when its size and mtime are unchanged between two polls,
+    so files still being copied in are not picked up half-written.
+    """
+    def __init__(self, folders: List[Path], recursive: bool = False, known: Optional[List[str]] = None):
+        """
+        Initialize FolderWatcher.
+
+        Args:
+            folders: Directories to watch.
+            recursive: Also watch subdirectories.
+            known: Files already handled, which are never reported.
+        """
+        self.folders = [Path(folder) for folder in folders]
+        self.recursive = recursive
+        self._reported = {str(Path(path).resolve()) for path in known or []}
+        self._pending: Dict[str, Tuple[int, int]] = {}
+
+    def poll(self) -> List[str]:
+        """
+        Scan the folders once.
+
+        Returns:
+            Files that became ready since the last poll.
+        """
+        ready = []
+        for path in collect_video_files(self.folders, recursive=self.recursive):
+            key = str(Path(path).resolve())
+            if key in self._reported:
+                continue
+            try:
+                stat = Path(path).stat()
+            except OSError:
+                continue
+            signature = (stat.st_size, stat.st_mtime_ns)
+            if self._pending.get(key) == signature:
+                del self._pending[key]
+                self._reported.add(key)
+                ready.append(path)
+            else:
+                self._pending[key] = signature
+        return ready
+
+
+class FileJob:
+    """
+    State and result of one video file moving through the pipeline.
+    """
+    def __init__(self, video_path: str):
+        self.video_path = video_path
+        self.audio_path: Optional[str] = None
+        self.segments: Optional[List[Dict[str, Any]]] = None
+        self.output_path: Optional[str] = None
+        self.output_paths: Dict[str, str] = {}
+        self.manifest: Optional[JobManifest] = None
+        self.error: Optional[BaseException] = None
+        self.stage: str = "queued"
+        self.timings: Dict[str, float] = {}
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None and self.output_path is not None
+
+
+class BatchPipeline:
+    """
+    Processes many videos with one worker pool per stage.
+
+    Extraction, transcription and LLM correction run in separate thread pools,
+    so FFmpeg can decode file N+1 while Whisper transcribes file N and Gemini
+    corrects file N-1. With `stream_llm`, correction of a file also overlaps
+    its own transcription (see `transcribe_and_correct`).
+    """
+    def __init__(self, audio_processor, stt_engine, output_dir: str, llm_engine=None,
+                 extract_workers: int = 2, stt_workers: int = 1, llm_workers: int = 1,
+                 language: str = "ko", chunked: bool = False, chunk_size: float = 300, overlap_size: float = 5,
+                 chunk_workers: int = 2, llm_options: Optional[Dict[str, Any]] = None,
+                 progress_callback: Optional[Callable[[FileJob], None]] = None, jobs_dir: Optional[str] = None,
+                 stream_llm: bool = False, vad_cache: Optional[SpeechMapCache] = None, draft_engine=None,
+                 refine_threshold: float = DEFAULT_REFINE_THRESHOLD, output_formats: Sequence[str] = ("srt",),
+                 postprocessor: Optional[SegmentPostProcessor] = None, align_words: bool = False):
+        """
+        Initialize BatchPipeline.
+
+        Args:
+            audio_processor: AudioProcessor used for extraction.
+            stt_engine: STTEngine shared by the STT workers (load it with num_workers >= stt_workers).
+            output_dir: Directory for the generated subtitle files.
+            llm_engine: Optional LLMEngine; correction is skipped if None.
+            extract_workers: Concurrent FFmpeg extractions.
+            stt_workers: Files transcribed concurrently.
+            llm_workers: Files corrected concurrently.
+            language: Transcription language code.
+            chunked: Use chunked transcription within each file.
+            chunk_size: Chunk length in seconds (chunked mode).
+            overlap_size: Chunk overlap in seconds (chunked mode).
+            chunk_workers: Chunks transcribed concurrently per file (chunked mode).
+            llm_options: Extra keyword arguments for `LLMEngine.correct_subtitles`.
+            progress_callback: Optional function(job) called whenever a job changes stage.
+            jobs_dir: Directory for job checkpoints; when set, interrupted files resume
+                where they stopped on the next run.
+            stream_llm: Correct segments while the file is still being transcribed
+                (sequential mode only; the STT worker stays busy until correction ends).
+            vad_cache: Speech map cache; in chunked mode only the speech is transcribed
+                (VAD runs on the samples the transcriber decodes, see `transcribe_chunked`).
+            draft_engine: STTEngine with a small model; in sequential mode it transcribes
+                first and `stt_engine` only re-transcribes low-confidence segments
+                (see `two_pass_transcribe`). Disables `stream_llm`.
+            refine_threshold: Confidence below which draft segments are refined.
+            output_formats: Subtitle formats written per file ("srt", "vtt", "ass", "json");
+                `FileJob.output_path` is the first one.
+            postprocessor: Normalizes segments (merge/split/reading speed) before they are written.
+            align_words: Re-time each (corrected) segment to its spoken words before writing
+                (see `alignment.align_segments`); `stt_engine` must return word timestamps.
+        """
+        self.audio_processor = audio_processor
+        self.stt_engine = stt_engine
+        self.llm_engine = llm_engine
+        self.output_dir = output_dir
+        self.worker_counts = {"extract": extract_workers, "stt": stt_workers, "llm": llm_workers}
+        self.language = language
+        self.chunked = chunked
+        self.chunk_size = chunk_size
+        self.overlap_size = overlap_size
+        self.chunk_workers = chunk_workers
+        self.llm_options = llm_options or {}
+        self.progress_callback = progress_callback
+        self.jobs_dir = jobs_dir
+        self.stream_llm = stream_llm
+        self.vad_cache = vad_cache
+        self.draft_engine = draft_engine
+        self.refine_threshold = refine_threshold
+        self.output_formats = list(output_formats) or ["srt"]
+        self.postprocessor = postprocessor
+        self.align_words = align_words
+        self._write_lock = threading.Lock()
+
+    def run(self, video_paths: List[str]) -> List[FileJob]:
+        """
+        Process all files and wait for them to finish.
+
+        A failing file does not stop the others; its error is stored on its job.
+
+        Returns:
+            One FileJob per input, in input order.
+        """
+        jobs = [FileJob(path) for path in video_paths]
+        pools = {
+            name: ThreadPoolExecutor(max_workers=max(1, count), thread_name_prefix=f"autosub-{name}")
+            for name, count in self.worker_counts.items()
+        }
+        stages = [("extract", pools["extract"], self._extract)]
+        if self.llm_engine is not None and self.stream_llm and not self.chunked and not self._use_two_pass:
+            stages.append(("transcribe", pools["stt"], self._transcribe_and_correct))
+        else:
+            stages.append(("transcribe", pools["stt"], self._transcribe))
+            if self.llm_engine is not None:
+                stages.append(("correct", pools["llm"], self._correct))
+        stages.append(("write", pools["llm"], self._write))
+
+        try:
+            finals = []
+            for job in jobs:
+                final = Future()
+                finals.append(final)
+                self._advance(job, stages, 0, final)
+            wait(finals)
+        finally:
+            for pool in pools.values():
+                pool.shutdown(wait=True)
+
+        succeeded = sum(job.succeeded for job in jobs)
+        logger.info(f"Batch finished: {succeeded}/{len(jobs)} files succeeded.")
+        return jobs
+
+    def _advance(self, job: FileJob, stages, index: int, final: Future):
+        """Submit the job's next stage to that stage's pool."""
+        if index == len(stages):
+            job.stage = "done"
+            self._notify(job)
+            final.set_result(job)
+            return
+
+        name, pool, fn = stages[index]
+        job.stage = name
+        self._notify(job)
+
+        def run_stage():
+            started = time.monotonic()
+            fn(job)
+            job.timings[name] = time.monotonic() - started
+
+        def on_done(future: Future):
+            error = future.exception()
+            if error is not None:
+                logger.error(f"{name} failed for {job.video_path}: {error}")
+                job.error = error
+                job.stage = "failed"
+                self._notify(job)
+                final.set_result(job)
+                return
+            self._advance(job, stages, index + 1, final)
+
+        pool.submit(run_stage).add_done_callback(on_done)
+
+    def _notify(self, job: FileJob):
+        if self.progress_callback:
+            try:
+                self.progress_callback(job)
+            except Exception as e:
+                logger.warning(f"Progress callback failed: {e}")
+
+    @property
+    def _use_vad(self) -> bool:
+        return self.vad_cache is not None and self.chunked
+
+    @property
+    def _use_two_pass(self) -> bool:
+        return self.draft_engine is not None and not self.chunked
+
+    def _stt_settings(self) -> Dict[str, Any]:
+        """Settings that identify a job's checkpoint."""
+        return stt_checkpoint_settings(
+            self.stt_engine.model_size,
+            self.language,
+            chunked=self.chunked,
+            chunk_size=self.chunk_size,
+            overlap_size=self.overlap_size,
+            vad=self._use_vad,
+            draft_model=self.draft_engine.model_size if self._use_two_pass else None,
+            refine_threshold=self.refine_threshold,
+            word_timestamps=self.align_words
+        )
+
+    def _extract(self, job: FileJob):
+        if self.jobs_dir:
+            job.manifest = JobManifest.open(self.jobs_dir, job.video_path, self._stt_settings())
+            if job.manifest.stt_result() is not None or job.manifest.audio_path:
+                job.audio_path = job.manifest.audio_path
+                return
+        job.audio_path = self.audio_processor.extract_audio(job.video_path)
+        if job.manifest:
+            job.manifest.set_audio_path(job.audio_path)
+
+    def _transcribe(self, job: FileJob):
+        if self._use_two_pass:
+            job.segments = job.manifest.stt_result() if job.manifest else None
+            if job.segments is None:
+                job.segments = two_pass_transcribe(
+                    self.draft_engine,
+                    lambda: self.stt_engine,
+                    job.audio_path,
+                    language=self.language,
+                    threshold=self.refine_threshold
+                )
+                if job.manifest:
+                    job.manifest.complete_stt(job.segments)
+        elif job.manifest:
+            job.segments = checkpointed_transcribe(
+                self.stt_engine,
+                job.manifest,
+                job.audio_path,
+                language=self.language,
+                chunked=self.chunked,
+                chunk_size=self.chunk_size,
+                overlap_size=self.overlap_size,
+                max_workers=self.chunk_workers,
+                vad_cache=self.vad_cache if self._use_vad else None
+            )
+        elif self.chunked:
+            job.segments = self.stt_engine.transcribe_chunked(
+                job.audio_path,
+                language=self.language,
+                chunk_size=self.chunk_size,
+                overlap_size=self.overlap_size,
+                max_workers=self.chunk_workers,
+                vad_cache=self.vad_cache if self._use_vad else None
+            )
+        else:
+            job.segments = self.stt_engine.transcribe(job.audio_path, language=self.language)
+
+    def _transcribe_and_correct(self, job: FileJob):
+        _, job.segments = transcribe_and_correct(
+            self.stt_engine,
+            self.llm_engine,
+            job.audio_path,
+            manifest=job.manifest,
+            language=self.language,
+            **self.llm_options
+        )
+
+    def _correct(self, job: FileJob):
+        if job.manifest:
+            job.segments = checkpointed_correct(self.llm_engine, job.manifest, job.segments, **self.llm_options)
+        else:
+            job.segments = self.llm_engine.correct_subtitles(job.segments, **self.llm_options)
+
+    def _write(self, job: FileJob):
+        if self.align_words:
+            job.segments = align_segments(job.segments)
+        if self.postprocessor:
+            job.segments = self.postprocessor.process(job.segments)
+        Path(self.output_dir).mkdir(parents=True, exist_ok=True)
+        # Serialize name picking + writing so same-named sources can't claim the same output file
+        with self._write_lock:
+            output_path = SRTGenerator.generate_output_filename(job.video_path, self.output_dir, self.output_formats)
+            job.output_paths = export_subtitles(job.segments, str(Path(output_path).with_suffix("")), self.output_formats)
+        job.output_path = output_path
+        if job.manifest:
+            job.manifest.discard()
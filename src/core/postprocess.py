@@ -0,0 +1,273 @@
+import re
+import math
+import bisect
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from src.core.alignment import WORD_KEYS, has_words, strip_words, token_spans
+
+logger = logging.getLogger(__name__)
+
+# Break after sentence/clause punctuation first, then at spaces
+_PUNCTUATION_RE = re.compile(r"[.?!,;:。？！，…]+")
+_SPACE_RE = re.compile(r" +")
+
+
+def _nearest_within(positions: List[int], target: float, low: int, high: int) -> Optional[int]:
+    """Position in sorted `positions` closest to `target`, considering only those in [low, high]."""
+    lo = bisect.bisect_left(positions, low)
+    hi = bisect.bisect_right(positions, high, lo)
+    index = bisect.bisect_left(positions, target, lo, hi)
+    nearby = positions[max(lo, index - 1):min(index + 1, hi)]
+    return min(nearby, key=lambda position: abs(position - target)) if nearby else None
+
+
+class SegmentPostProcessor:
+    """
+    Normalizes segments for display: merges flashes, splits long cues,
+    limits reading speed and keeps a gap between cues.
+
+    Times and text lengths are held in numpy columns, so every step is a
+    vectorized pass or a single linear scan; a 10k-segment file takes well
+    under a second. Fields other than start/end/text are kept from the first
+    segment of a merged group (confidence is length-weighted). Word timings
+    (see `alignment`) follow their words through merges and splits, and
+    split cues are timed by their words when those are available.
+    """
+    def __init__(self, max_chars: int = 42, max_duration: float = 7.0, min_duration: float = 1.0,
+                 max_cps: float = 17.0, min_gap: float = 0.08, merge_gap: float = 0.5):
+        """
+        Initialize SegmentPostProcessor.
+
+        Args:
+            max_chars: Maximum characters per cue; longer cues are split at punctuation
+                or spaces (mid-word only if a piece would exceed it otherwise).
+            max_duration: Maximum cue duration in seconds; longer cues are split.
+            min_duration: Cues shorter than this are merged into a neighbour (or extended).
+            max_cps: Maximum reading speed in characters per second; faster cues are
+                extended into the following silence where possible.
+            min_gap: Minimum gap between consecutive cues in seconds.
+            merge_gap: Maximum silence between two cues that may be merged.
+        """
+        self.max_chars = max_chars
+        self.max_duration = max_duration
+        self.min_duration = min_duration
+        self.max_cps = max_cps
+        self.min_gap = min_gap
+        self.merge_gap = merge_gap
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["SegmentPostProcessor"]:
+        """Build from the `postprocess` config section; None if it is disabled."""
+        if not config.get("enabled", True):
+            return None
+        options = {key: value for key, value in config.items() if key != "enabled"}
+        return cls(**options)
+
+    def process(self, segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Return normalized copies of `segments` (the input is not modified).
+        """
+        if not segments:
+            return []
+        order = np.argsort([segment["start"] for segment in segments], kind="stable")
+        segments = [segments[i] for i in order]
+        starts = np.array([segment["start"] for segment in segments], dtype=np.float64)
+        ends = np.maximum(np.array([segment["end"] for segment in segments], dtype=np.float64), starts)
+        ends = self._clamp_overlaps(starts, ends)
+
+        segments = self._merge_short(segments, starts, ends)
+        segments = self._split_long(segments)
+
+        starts = np.array([segment["start"] for segment in segments], dtype=np.float64)
+        ends = np.array([segment["end"] for segment in segments], dtype=np.float64)
+        lengths = np.array([len(segment["text"]) for segment in segments], dtype=np.float64)
+        ends = self._limit_reading_speed(starts, ends, lengths)
+        ends = self._clamp_overlaps(starts, ends)
+
+        result = []
+        for segment, start, end in zip(segments, starts.tolist(), ends.tolist()):
+            result.append(dict(segment, start=round(start, 3), end=round(end, 3)))
+        return result
+
+    def _clamp_overlaps(self, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """End every cue at least `min_gap` before the next one starts (never before its own start)."""
+        ends = ends.copy()
+        ends[:-1] = np.minimum(ends[:-1], starts[1:] - self.min_gap)
+        return np.maximum(ends, starts)
+
+    def _merge_short(self, segments: List[Dict[str, Any]], starts: np.ndarray, ends: np.ndarray) -> List[Dict[str, Any]]:
+        """Merge cues shorter than `min_duration` into their neighbours while the result stays within limits."""
+        lengths = np.array([len(segment["text"].strip()) for segment in segments])
+        short = (ends - starts) < self.min_duration
+        # Boundary i joins cue i and i + 1
+        joinable = np.zeros(len(segments), dtype=bool)
+        joinable[:-1] = (short[:-1] | short[1:]) & (starts[1:] - ends[:-1] <= self.merge_gap)
+        if not joinable.any():
+            return [dict(segment, start=start, end=end) for segment, start, end in zip(segments, starts.tolist(), ends.tolist())]
+
+        # One linear scan: extend the current group while the merged cue stays within limits
+        length_list, start_list, end_list = lengths.tolist(), starts.tolist(), ends.tolist()
+        joinable_list = joinable.tolist()
+        group_starts = [0]
+        group_chars = length_list[0]
+        for i in range(len(segments) - 1):
+            candidate_chars = group_chars + 1 + length_list[i + 1]
+            if (joinable_list[i] and candidate_chars <= self.max_chars
+                    and end_list[i + 1] - start_list[group_starts[-1]] <= self.max_duration):
+                group_chars = candidate_chars
+            else:
+                group_starts.append(i + 1)
+                group_chars = length_list[i + 1]
+
+        bounds = np.array(group_starts)
+        group_begin = np.minimum.reduceat(starts, bounds)
+        group_end = np.maximum.reduceat(ends, bounds)
+        merged = []
+        for index, (first, start, end) in enumerate(zip(group_starts, group_begin.tolist(), group_end.tolist())):
+            last = group_starts[index + 1] if index + 1 < len(group_starts) else len(segments)
+            segment = dict(segments[first], start=start, end=end)
+            if last - first > 1:
+                members = segments[first:last]
+                segment["text"] = " ".join(member["text"].strip() for member in members)
+                if all("confidence" in member for member in members):
+                    weights = [length + 1 for length in length_list[first:last]]
+                    segment["confidence"] = sum(member["confidence"] * weight for member, weight in zip(members, weights)) / sum(weights)
+                if all(has_words(member) for member in members):
+                    for key in WORD_KEYS:
+                        segment[key] = [value for member in members for value in member[key]]
+                else:
+                    segment = strip_words(segment)
+            merged.append(segment)
+        return merged
+
+    def _split_long(self, segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Split cues over `max_chars` or `max_duration`, timing the pieces by their words or share of characters."""
+        result = []
+        for segment in segments:
+            text = segment["text"].strip()
+            duration = segment["end"] - segment["start"]
+            pieces = max(math.ceil(len(text) / self.max_chars), math.ceil(duration / self.max_duration), 1)
+            if pieces == 1 or len(text) < 2:
+                result.append(segment)
+                continue
+            bounds = [0] + self._split_points(text, pieces) + [len(text)]
+            result.extend(self._split_by_words(segment, text, bounds) or self._split_by_chars(segment, text, bounds))
+        return result
+
+    @staticmethod
+    def _split_by_chars(segment: Dict[str, Any], text: str, bounds: List[int]) -> List[Dict[str, Any]]:
+        """Time the pieces of a cue proportionally to their number of characters."""
+        parts = [part for part in (text[a:b].strip() for a, b in zip(bounds, bounds[1:])) if part]
+        total = sum(len(part) for part in parts)
+        duration = segment["end"] - segment["start"]
+        base = strip_words(segment)
+        result = []
+        start = segment["start"]
+        consumed = 0
+        for part in parts:
+            consumed += len(part)
+            end = segment["start"] + duration * consumed / total
+            result.append(dict(base, start=start, end=end, text=part))
+            start = end
+        return result
+
+    @staticmethod
+    def _split_by_words(segment: Dict[str, Any], text: str, bounds: List[int]) -> List[Dict[str, Any]]:
+        """
+        Time the pieces of a cue by the words they contain.
+
+        Returns an empty list if the cue has no word timings matching its
+        text, or a piece would contain no word start.
+        """
+        if not has_words(segment):
+            return []
+        word_offsets = [a for a, _ in token_spans(text)]
+        if len(word_offsets) != len(segment["words"]):
+            return []
+        result = []
+        for a, b in zip(bounds, bounds[1:]):
+            part = text[a:b].strip()
+            if not part:
+                continue
+            first, last = bisect.bisect_left(word_offsets, a), bisect.bisect_left(word_offsets, b)
+            if first == last:
+                return []
+            piece = dict(segment, text=part, start=segment["word_starts"][first], end=segment["word_ends"][last - 1])
+            for key in WORD_KEYS:
+                piece[key] = segment[key][first:last]
+            result.append(piece)
+        return result
+
+    def _split_points(self, text: str, pieces: int) -> List[int]:
+        """
+        Character offsets at which to cut text into `pieces` parts of at most `max_chars`.
+
+        Each cut goes to the punctuation or space nearest its target among the
+        positions that keep both this piece and the rest within `max_chars`
+        per piece; if there is none, the text is cut mid-word.
+        """
+        punctuation = [match.end() for match in _PUNCTUATION_RE.finditer(text, 0, len(text) - 1)]
+        spaces = [match.end() for match in _SPACE_RE.finditer(text, 0, len(text) - 1)]
+        # A break after punctuation may be this much further from the target than a space
+        bonus = self.max_chars / 4
+        breaks = []
+        previous = 0
+        for k in range(1, pieces):
+            target = len(text) * k / pieces
+            low = max(previous + 1, len(text) - self.max_chars * (pieces - k))
+            high = previous + self.max_chars
+            best = None
+            for positions, penalty in ((punctuation, -bonus), (spaces, 0.0)):
+                position = _nearest_within(positions, target, low, high)
+                if position is not None and (best is None or abs(position - target) + penalty < best[1]):
+                    best = (position, abs(position - target) + penalty)
+            position = best[0] if best else min(high, max(low, round(target)))
+            if position >= len(text):
+                break
+            breaks.append(position)
+            previous = position
+        return breaks
+
+    def _limit_reading_speed(self, starts: np.ndarray, ends: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        """Extend cues that are too fast to read or too short into the following silence."""
+        required = np.maximum(lengths / self.max_cps, self.min_duration)
+        room = np.full(len(starts), np.inf)
+        room[:-1] = starts[1:] - self.min_gap
+        wanted = np.minimum(starts + required, starts + self.max_duration)
+        return np.maximum(ends, np.minimum(wanted, room))
+
+
+class PostProcessingBuffer:
+    """
+    Apply a `SegmentPostProcessor` to segments that arrive one by one.
+
+    Segments are processed in blocks of `block_size`. The last processed cue
+    of each block is held back and processed again with the next block, so
+    merging, gaps and overlaps are handled across block boundaries too.
+    """
+    def __init__(self, processor: SegmentPostProcessor, sink: Callable[[Dict[str, Any]], None], block_size: int = 64):
+        self.processor = processor
+        self.sink = sink
+        self.block_size = max(2, block_size)
+        self._pending: List[Dict[str, Any]] = []
+
+    def write(self, segment: Dict[str, Any]):
+        self._pending.append(segment)
+        if len(self._pending) >= self.block_size:
+            processed = self.processor.process(self._pending)
+            for segment in processed[:-1]:
+                self.sink(segment)
+            self._pending = processed[-1:]
+
+    def write_all(self, segments: Iterable[Dict[str, Any]]):
+        for segment in segments:
+            self.write(segment)
+
+    def close(self):
+        """Process and emit everything still buffered."""
+        for segment in self.processor.process(self._pending):
+            self.sink(segment)
+        self._pending = []
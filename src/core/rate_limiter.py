@@ -0,0 +1,101 @@
+import time
+import random
+import threading
+from typing import Callable, Optional
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `rate_per_minute`.
+
+    `acquire` reserves tokens immediately (the balance may go negative) and
+    sleeps until the reservation is covered, so concurrent callers are served
+    in the order they arrive.
+    """
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        """
+        Initialize TokenBucket.
+
+        Args:
+            rate_per_minute: Refill rate.
+            capacity: Maximum burst size (defaults to one minute of refill).
+            clock: Monotonic time source (injectable for tests).
+            sleep: Sleep function (injectable for tests).
+        """
+        if rate_per_minute <= 0:
+            raise ValueError(f"rate_per_minute must be positive, got {rate_per_minute}")
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else float(rate_per_minute)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """
+        Take `amount` tokens, blocking until they are available.
+
+        Requests larger than the capacity are clamped to it so they can still proceed.
+
+        Returns:
+            Seconds spent waiting.
+        """
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+
+class RateLimiter:
+    """
+    Combined requests-per-minute and tokens-per-minute limiter for API calls.
+    """
+    def __init__(self, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        """
+        Initialize RateLimiter.
+
+        Args:
+            requests_per_minute: Request limit, or None for no limit.
+            tokens_per_minute: Token limit, or None for no limit.
+        """
+        self.requests = TokenBucket(requests_per_minute, clock=clock, sleep=sleep) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute, clock=clock, sleep=sleep) if tokens_per_minute else None
+
+    def acquire(self, tokens: float = 0) -> float:
+        """
+        Wait until one request using `tokens` tokens is allowed.
+
+        Returns:
+            Seconds spent waiting.
+        """
+        waited = 0.0
+        if self.requests:
+            waited += self.requests.acquire(1)
+        if self.tokens and tokens:
+            waited += self.tokens.acquire(tokens)
+        return waited
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """
+    Exponential backoff with full jitter.
+
+    Args:
+        attempt: Zero-based retry attempt.
+        base: Delay scale of the first retry in seconds.
+        cap: Maximum delay in seconds.
+
+    Returns:
+        Delay in seconds, uniformly drawn from [0, min(cap, base * 2 ** attempt)].
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
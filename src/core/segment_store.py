@@ -0,0 +1,339 @@
+import sys
+import math
+import logging
+from array import array
+from collections.abc import Mapping, MutableMapping, Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+import msgpack
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+WORD_KEYS = ("words", "word_starts", "word_ends")
+_COLUMN_KEYS = ("start", "end", "text", "confidence")
+_KNOWN_KEYS = frozenset(_COLUMN_KEYS + WORD_KEYS)
+FORMAT_VERSION = 1
+
+
+class Segment(MutableMapping):
+    """
+    Dict-compatible view of one row of a `SegmentStore`.
+
+    Reads and writes go straight to the store's columns, so code written
+    for segment dicts (`segment["text"]`, `dict(segment, text=...)`,
+    `segment.get("confidence")`) works unchanged. `copy()` returns a plain dict.
+    """
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store: "SegmentStore", index: int):
+        self._store = store
+        self._index = index
+
+    def __getitem__(self, key: str) -> Any:
+        return self._store._get(self._index, key)
+
+    def __setitem__(self, key: str, value: Any):
+        self._store._set(self._index, key, value)
+
+    def __delitem__(self, key: str):
+        self._store._delete(self._index, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store._keys(self._index))
+
+    def __len__(self) -> int:
+        return len(self._store._keys(self._index))
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._store._keys(self._index)
+
+    def copy(self) -> Dict[str, Any]:
+        return dict(self)
+
+    def __repr__(self) -> str:
+        return f"Segment({dict(self)!r})"
+
+
+class SegmentStore(Sequence):
+    """
+    Compact, column-oriented list of segments.
+
+    start/end/confidence are float arrays, texts are ids into an interned
+    text table (repeated lines such as "네" are stored once) and word timings
+    are kept CSR-style: one flat array per field plus per-segment offsets.
+    A segment costs a few dozen bytes instead of a dict per segment and per
+    word. Indexing returns a `Segment` view, so the store can be passed
+    wherever a list of segment dicts is expected; slicing returns a new store.
+
+    Rows can be appended but not removed. Fields other than the columns
+    above are kept per row in a side table.
+    """
+    __hash__ = None
+
+    def __init__(self, segments: Optional[Iterable[Mapping]] = None):
+        self._start = array("d")
+        self._end = array("d")
+        self._confidence = array("d")
+        self._text_id = array("i")
+        self._texts: List[str] = []
+        self._text_lookup: Dict[str, int] = {}
+        self._word_offset = array("q", [0])
+        self._word_text_id = array("i")
+        self._word_start = array("d")
+        self._word_end = array("d")
+        # Rows whose words were replaced after they were appended (the flat arrays are append-only)
+        self._word_override: Dict[int, Dict[str, list]] = {}
+        self._extras: Dict[int, Dict[str, Any]] = {}
+        if segments is not None:
+            self.extend(segments)
+
+    # Building
+
+    def _intern(self, text: str) -> int:
+        text_id = self._text_lookup.get(text)
+        if text_id is None:
+            text_id = self._text_lookup[text] = len(self._texts)
+            self._texts.append(text)
+        return text_id
+
+    def append(self, segment: Mapping):
+        """Append a segment dict (or `Segment` view)."""
+        index = len(self._start)
+        self._start.append(float(segment["start"]))
+        self._end.append(float(segment["end"]))
+        confidence = segment.get("confidence")
+        self._confidence.append(math.nan if confidence is None else float(confidence))
+        self._text_id.append(self._intern(segment["text"]))
+
+        words = segment.get("words")
+        if words is not None:
+            self._word_text_id.extend(self._intern(word) for word in words)
+            self._word_start.extend(segment["word_starts"])
+            self._word_end.extend(segment["word_ends"])
+        self._word_offset.append(len(self._word_start))
+
+        extras = {key: value for key, value in segment.items() if key not in _KNOWN_KEYS}
+        if extras:
+            self._extras[index] = extras
+
+    def extend(self, segments: Iterable[Mapping]):
+        for segment in segments:
+            self.append(segment)
+
+    # Sequence protocol
+
+    def __len__(self) -> int:
+        return len(self._start)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Segment, "SegmentStore"]:
+        if isinstance(index, slice):
+            return SegmentStore(Segment(self, i) for i in range(*index.indices(len(self))))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("segment index out of range")
+        return Segment(self, index)
+
+    def __iter__(self) -> Iterator[Segment]:
+        for index in range(len(self)):
+            yield Segment(self, index)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, (str, bytes)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        return f"SegmentStore({len(self)} segments, {len(self._texts)} distinct texts)"
+
+    # Row access (used by `Segment`)
+
+    def _has_words(self, index: int) -> bool:
+        if index in self._word_override:
+            return bool(self._word_override[index]["words"])
+        return self._word_offset[index + 1] > self._word_offset[index]
+
+    def _keys(self, index: int) -> List[str]:
+        keys = ["start", "end", "text"]
+        if not math.isnan(self._confidence[index]):
+            keys.append("confidence")
+        if self._has_words(index):
+            keys.extend(WORD_KEYS)
+        keys.extend(self._extras.get(index, ()))
+        return keys
+
+    def _get(self, index: int, key: str) -> Any:
+        if key == "start":
+            return self._start[index]
+        if key == "end":
+            return self._end[index]
+        if key == "text":
+            return self._texts[self._text_id[index]]
+        if key == "confidence":
+            confidence = self._confidence[index]
+            if math.isnan(confidence):
+                raise KeyError(key)
+            return confidence
+        if key in WORD_KEYS:
+            if index in self._word_override:
+                if not self._word_override[index]["words"]:
+                    raise KeyError(key)
+                return self._word_override[index][key]
+            first, last = self._word_offset[index], self._word_offset[index + 1]
+            if first == last:
+                raise KeyError(key)
+            if key == "words":
+                return [self._texts[text_id] for text_id in self._word_text_id[first:last]]
+            column = self._word_start if key == "word_starts" else self._word_end
+            return column[first:last].tolist()
+        return self._extras.get(index, {})[key]
+
+    def _set(self, index: int, key: str, value: Any):
+        if key == "start":
+            self._start[index] = float(value)
+        elif key == "end":
+            self._end[index] = float(value)
+        elif key == "text":
+            self._text_id[index] = self._intern(value)
+        elif key == "confidence":
+            self._confidence[index] = math.nan if value is None else float(value)
+        elif key in WORD_KEYS:
+            if index not in self._word_override:
+                has_words = self._has_words(index)
+                self._word_override[index] = {
+                    name: self._get(index, name) if has_words else [] for name in WORD_KEYS
+                }
+            self._word_override[index][key] = list(value)
+        else:
+            self._extras.setdefault(index, {})[key] = value
+
+    def _delete(self, index: int, key: str):
+        if key in ("start", "end", "text"):
+            raise KeyError(f"{key} is required")
+        if key not in self._keys(index):
+            raise KeyError(key)
+        if key == "confidence":
+            self._confidence[index] = math.nan
+        elif key in WORD_KEYS:
+            # The three word fields only exist together
+            self._word_override[index] = {name: [] for name in WORD_KEYS}
+        else:
+            del self._extras[index][key]
+            if not self._extras[index]:
+                del self._extras[index]
+
+    # Columns
+
+    @property
+    def starts(self) -> np.ndarray:
+        return np.array(self._start, dtype=np.float64)
+
+    @property
+    def ends(self) -> np.ndarray:
+        return np.array(self._end, dtype=np.float64)
+
+    @property
+    def confidences(self) -> np.ndarray:
+        """Confidence column; NaN where a segment has none."""
+        return np.array(self._confidence, dtype=np.float64)
+
+    @property
+    def texts(self) -> List[str]:
+        return [self._texts[text_id] for text_id in self._text_id]
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Plain list of segment dicts."""
+        return [dict(segment) for segment in self]
+
+    # Serialization
+
+    def _compacted(self) -> "SegmentStore":
+        """Store without overridden words or unused texts (rebuilt only if needed)."""
+        if not self._word_override and len(self._texts) <= len(self._text_id) + len(self._word_text_id):
+            return self
+        return SegmentStore(self)
+
+    def _payload(self, encode_column) -> Dict[str, Any]:
+        store = self._compacted()
+        return {
+            "version": FORMAT_VERSION,
+            "texts": store._texts,
+            "text": encode_column(store._text_id),
+            "start": encode_column(store._start),
+            "end": encode_column(store._end),
+            "confidence": encode_column(store._confidence),
+            "word_offset": encode_column(store._word_offset),
+            "word_text": encode_column(store._word_text_id),
+            "word_start": encode_column(store._word_start),
+            "word_end": encode_column(store._word_end),
+            "extras": {str(index): extras for index, extras in store._extras.items()},
+        }
+
+    @classmethod
+    def _from_payload(cls, payload: Dict[str, Any], decode_column) -> "SegmentStore":
+        if payload.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported segment store version: {payload.get('version')}")
+        store = cls()
+        store._texts = list(payload["texts"])
+        store._text_lookup = {text: text_id for text_id, text in enumerate(store._texts)}
+        store._text_id = decode_column("i", payload["text"])
+        store._start = decode_column("d", payload["start"])
+        store._end = decode_column("d", payload["end"])
+        store._confidence = decode_column("d", payload["confidence"])
+        store._word_offset = decode_column("q", payload["word_offset"])
+        store._word_text_id = decode_column("i", payload["word_text"])
+        store._word_start = decode_column("d", payload["word_start"])
+        store._word_end = decode_column("d", payload["word_end"])
+        store._extras = {int(index): extras for index, extras in payload["extras"].items()}
+        if not len(store._start) == len(store._end) == len(store._text_id) == len(store._word_offset) - 1:
+            raise ValueError("Inconsistent segment store columns")
+        return store
+
+    def to_json(self) -> Dict[str, Any]:
+        """
+        Columnar JSON-serializable form (see `from_json`).
+
+        Each field is one list instead of a key per segment, which makes
+        the file smaller and `json.dumps`/`json.loads` several times faster
+        than for a list of dicts. Missing confidences are stored as null.
+        """
+        payload = self._payload(array.tolist)
+        payload["confidence"] = [None if value != value else value for value in payload["confidence"]]
+        return payload
+
+    @classmethod
+    def from_json(cls, payload: Dict[str, Any]) -> "SegmentStore":
+        def decode(typecode: str, values: list) -> array:
+            if typecode == "d":
+                return array("d", (math.nan if value is None else value for value in values))
+            return array(typecode, values)
+
+        return cls._from_payload(payload, decode)
+
+    def to_msgpack(self) -> bytes:
+        """
+        MessagePack form with each column packed as raw bytes.
+        """
+        payload = self._payload(lambda column: column.tobytes())
+        payload["byteorder"] = sys.byteorder
+        return msgpack.packb(payload, use_bin_type=True)
+
+    @classmethod
+    def from_msgpack(cls, data: bytes) -> "SegmentStore":
+        payload = msgpack.unpackb(data, raw=False, strict_map_key=False)
+        swap = payload.get("byteorder") != sys.byteorder
+
+        def decode(typecode: str, raw: bytes) -> array:
+            column = array(typecode)
+            column.frombytes(raw)
+            if swap:
+                column.byteswap()
+            return column
+
+        return cls._from_payload(payload, decode)
+
+
+def as_segment_store(segments: Iterable[Mapping]) -> SegmentStore:
+    """Return `segments` if it already is a `SegmentStore`, else pack it into one."""
+    return segments if isinstance(segments, SegmentStore) else SegmentStore(segments)
@@ -1,8 +1,9 @@
-import os
 import logging
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import Iterable, Dict, Any, Optional, Sequence
+
+from src.core.subtitle_export import SRTFormat, SubtitleWriter, format_timestamp
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +15,7 @@ class SRTGenerator:
     @staticmethod
     def format_timestamp(seconds: float) -> str:
         """
-        Convert seconds to SRT timestamp format (00:00:00,000).
+        Convert seconds to SRT timestamp format (00:00:00,000), rounded to the millisecond.
         
         Args:
             seconds: Time in seconds.
@@ -22,34 +23,28 @@ class SRTGenerator:
         Returns:
             Formatted timestamp string.
         """
-        millis = int((seconds - int(seconds)) * 1000)
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
-        return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+        return format_timestamp(seconds, "srt")
+
+    @staticmethod
+    def format_entry(index: int, segment: Dict[str, Any]) -> str:
+        """Format one numbered SRT entry, including its trailing blank line."""
+        return SRTFormat().entry(index, segment)
 
     @staticmethod
-    def generate_srt(segments: List[Dict[str, Any]], output_path: str):
+    def generate_srt(segments: Iterable[Dict[str, Any]], output_path: str):
         """
         Generate SRT file from segments.
         
+        The file is written through `SRTWriter`, so a failure never leaves a
+        truncated file at `output_path`.
+        
         Args:
-            segments: List of segments with 'start', 'end', 'text'.
+            segments: List or iterable of segments with 'start', 'end', 'text'.
             output_path: Path to save the SRT file.
         """
         try:
-            # Ensure output directory exists
-            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(output_path, "w", encoding="utf-8") as f:
-                for i, segment in enumerate(segments, start=1):
-                    start_time = SRTGenerator.format_timestamp(segment["start"])
-                    end_time = SRTGenerator.format_timestamp(segment["end"])
-                    text = segment["text"].strip()
-                    
-                    f.write(f"{i}\n")
-                    f.write(f"{start_time} --> {end_time}\n")
-                    f.write(f"{text}\n\n")
+            with SRTWriter(output_path) as writer:
+                writer.write_all(segments)
             
             logger.info(f"SRT file generated: {output_path}")
             
@@ -58,30 +53,67 @@ class SRTGenerator:
             raise
 
     @staticmethod
-    def generate_output_filename(source_path: str, output_dir: str) -> str:
+    def generate_output_filename(source_path: str, output_dir: str, extensions: Sequence[str] = ("srt",)) -> str:
         """
         Generate unique output filename.
-        Pattern: {source_name}_{timestamp}.srt
+        Pattern: {source_name}_{timestamp}.{extension}
         
         Args:
             source_path: Path to the source video file.
-            output_dir: Directory to save the SRT file.
+            output_dir: Directory to save the subtitle files.
+            extensions: Extensions that will be written next to each other; the name
+                is unique for all of them.
             
         Returns:
-            Full path to the output SRT file.
+            Full path to the output file with the first extension.
         """
         source_path_obj = Path(source_path)
         stem = source_path_obj.stem
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{stem}_{timestamp}.srt"
+        base_path = Path(output_dir) / f"{stem}_{timestamp}"
         
-        output_path = Path(output_dir) / filename
+        def taken(base: Path) -> bool:
+            # Files still being written (".partial") count as taken too
+            return any(
+                base.with_name(f"{base.name}.{ext}").exists() or
+                SubtitleWriter.partial_path_for(base.with_name(f"{base.name}.{ext}")).exists()
+                for ext in extensions
+            )
         
         # Ensure uniqueness (though timestamp usually suffices)
         counter = 1
-        while output_path.exists():
-            filename = f"{stem}_{timestamp}_{counter}.srt"
-            output_path = Path(output_dir) / filename
+        while taken(base_path):
+            base_path = Path(output_dir) / f"{stem}_{timestamp}_{counter}"
             counter += 1
             
-        return str(output_path)
+        return str(base_path.with_name(f"{base_path.name}.{extensions[0]}"))
+
+
+class SRTWriter(SubtitleWriter):
+    """
+    Incremental SRT writer with atomic finalize (see `SubtitleWriter`).
+    """
+    def __init__(self, output_path: str, **kwargs):
+        super().__init__(output_path, "srt", **kwargs)
+    
+    @classmethod
+    def read_partial(cls, output_path: str, max_entries: Optional[int] = None) -> str:
+        """
+        Read what has been flushed so far for an output path that is still being written.
+        
+        Args:
+            output_path: Final path of the SRT file.
+            max_entries: Only return the last this many complete entries.
+            
+        Returns:
+            SRT text, or "" if nothing is being written to that path.
+        """
+        try:
+            content = cls.partial_path_for(output_path).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return ""
+        # The last entry may be cut mid-write: keep complete entries only
+        entries = content.split("\n\n")[:-1]
+        if max_entries is not None:
+            entries = entries[-max_entries:]
+        return "".join(entry + "\n\n" for entry in entries)
@@ -1,10 +1,19 @@
 import os
 import logging
+import weakref
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 from pathlib import Path
-from typing import List, Dict, Any
-from faster_whisper import WhisperModel
+from typing import Iterator, List, Dict, Any, Optional
+from faster_whisper import BatchedInferencePipeline, WhisperModel, decode_audio
 from tqdm import tqdm
 
+from src.core.chunking import plan_chunks, stitch_segments
+from src.core.model_pool import WhisperModelPool, get_model_pool
+from src.core.segment_store import SegmentStore
+from src.core.stt_tuning import TuningStore, load_profile
+from src.core.subtitle_export import format_timestamp
+from src.core.vad import DEFAULT_VAD_PARAMETERS, SpeechTimeline, group_speech, speech_duration
+
 # Basic logging configuration
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -13,7 +22,12 @@ class STTEngine:
     """
     Speech-to-Text Engine using Faster-Whisper.
     """
-    def __init__(self, model_size: str = "large-v3", device: str = "auto", model_path: str = "models"):
+    SAMPLE_RATE = 16000
+
+    def __init__(self, model_size: str = "large-v3", device: str = "auto", model_path: str = "models", num_workers: int = 1,
+                 compute_type: str = "default", pool: Optional[WhisperModelPool] = None, cpu_threads: int = 0,
+                 beam_size: int = 5, tuning_store: Optional[TuningStore] = None, batch_size: int = 0,
+                 word_timestamps: bool = False):
         """
         Initialize STT Engine.
         
@@ -21,13 +35,66 @@ class STTEngine:
             model_size: Whisper model size (e.g., "base", "small", "large-v3").
             device: Device to use ("cpu", "cuda", "auto").
             model_path: Directory to store/load the model.
+            num_workers: Number of concurrent transcriptions the model accepts
+                (used by chunked transcription).
+            compute_type: CTranslate2 compute type ("default" lets faster-whisper choose,
+                "auto" uses the settings calibrated for this machine, see `stt_tuning`).
+            pool: Model pool to share loaded models through (defaults to the process-wide pool).
+            cpu_threads: CPU threads per worker (0 = CTranslate2 default).
+            beam_size: Beam size for decoding.
+            tuning_store: Where calibrated settings are read from with compute_type="auto".
+            batch_size: Decode up to this many VAD speech chunks together with faster-whisper's
+                batched pipeline (0 = sequential 30-second windows).
+            word_timestamps: Also return word timings; each segment then carries the
+                parallel lists "words", "word_starts" and "word_ends" (see `alignment`).
         """
         self.model_size = model_size
         self.model_path = Path(model_path)
         self.device = device
+        self.num_workers = max(1, int(num_workers))
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.beam_size = beam_size
+        self.batch_size = max(0, int(batch_size))
+        self.word_timestamps = word_timestamps
+        self.pool = pool or get_model_pool()
+        if compute_type == "auto":
+            self._apply_profile(load_profile(model_size, device, tuning_store))
         
         self._ensure_model_dir()
         self.model = self._load_model()
+        self.batched_pipeline = BatchedInferencePipeline(self.model) if self.batch_size else None
+        # Return the model to the pool when the engine is closed or garbage collected
+        self._release = weakref.finalize(self, self.pool.release, self._pool_key())
+
+    def _apply_profile(self, profile: Dict[str, Any]):
+        """
+        Use tuned (or default) settings for this machine.
+        
+        If the caller needs more concurrent transcriptions than the profile
+        was tuned for, threads are split between the extra workers so the
+        total thread count stays the same.
+        """
+        self.device = profile["device"]
+        self.compute_type = profile["compute_type"]
+        self.beam_size = profile["beam_size"]
+        total_threads = profile["cpu_threads"] * profile["num_workers"]
+        self.num_workers = max(self.num_workers, profile["num_workers"])
+        self.cpu_threads = max(1, total_threads // self.num_workers) if total_threads else 0
+        logger.info(f"STT settings: device={self.device}, compute_type={self.compute_type}, "
+                    f"cpu_threads={self.cpu_threads}, num_workers={self.num_workers}, beam_size={self.beam_size}")
+
+    def close(self):
+        """Release the model back to the pool. The engine must not be used afterwards."""
+        self._release()
+        self.model = None
+        self.batched_pipeline = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
     def _ensure_model_dir(self):
         """Ensure the model directory exists."""
@@ -35,7 +102,17 @@ class STTEngine:
             self.model_path.mkdir(parents=True, exist_ok=True)
             logger.info(f"Created model directory: {self.model_path}")
 
+    def _pool_key(self) -> tuple:
+        """Load configuration identifying a shareable model instance."""
+        return (self.model_size, self.device, self.compute_type, self.cpu_threads, self.num_workers, str(self.model_path.resolve()))
+
     def _load_model(self) -> WhisperModel:
+        """
+        Get the Whisper model from the pool, loading it on first use.
+        """
+        return self.pool.acquire(self._pool_key(), self._create_model)
+
+    def _create_model(self) -> WhisperModel:
         """
         Load the Whisper model. Downloads it if not present.
         """
@@ -47,7 +124,9 @@ class STTEngine:
             model = WhisperModel(
                 self.model_size,
                 device=self.device,
-                compute_type="default", 
+                compute_type=self.compute_type, 
+                cpu_threads=self.cpu_threads,
+                num_workers=self.num_workers,
                 download_root=str(self.model_path),
                 local_files_only=False
             )
@@ -57,7 +136,8 @@ class STTEngine:
             logger.error(f"Failed to load model: {e}")
             raise
 
-    def transcribe(self, audio_path: str, language: str = "ko", progress_callback=None) -> List[Dict[str, Any]]:
+    def transcribe(self, audio_path: str, language: str = "ko", progress_callback=None,
+                   segment_callback=None, start_time: float = 0.0) -> SegmentStore:
         """
         Transcribe audio file using the loaded model.
         
@@ -65,36 +145,58 @@ class STTEngine:
             audio_path: Path to the audio file.
             language: Language code (default "ko").
             progress_callback: Optional function(current_time, total_duration) to update progress.
+            segment_callback: Optional function(segment) called for each segment as soon as
+                it is produced (e.g. to checkpoint it).
+            start_time: Skip the audio before this time in seconds (resume point).
             
         Returns:
-            List of segments with start, end, text, and confidence.
+            Store of segments with start, end, text, and confidence.
+        """
+        result = SegmentStore()
+        for segment in self.iter_transcribe(audio_path, language, progress_callback, start_time):
+            result.append(segment)
+            if segment_callback:
+                segment_callback(segment)
+        return result
+
+    def iter_transcribe(self, audio_path: str, language: str = "ko", progress_callback=None,
+                        start_time: float = 0.0) -> Iterator[Dict[str, Any]]:
+        """
+        Transcribe audio file, yielding each segment as soon as the model produces it.
+        
+        faster-whisper decodes lazily, so consumers (e.g. LLM correction) can
+        start on early segments while later audio is still being transcribed.
+        
+        Args:
+            audio_path: Path to the audio file.
+            language: Language code (default "ko").
+            progress_callback: Optional function(current_time, total_duration) to update progress.
+            start_time: Skip the audio before this time in seconds (resume point).
+            
+        Yields:
+            Segments with start, end, text, and confidence.
         """
         if not os.path.exists(audio_path):
             raise FileNotFoundError(f"Audio file not found: {audio_path}")
 
-        logger.info(f"Starting transcription for {audio_path}...")
+        audio_input = audio_path
+        if start_time > 0:
+            logger.info(f"Resuming transcription for {audio_path} at {start_time:.1f}s...")
+            audio_input = decode_audio(audio_path, sampling_rate=self.SAMPLE_RATE)[int(start_time * self.SAMPLE_RATE):]
+        else:
+            logger.info(f"Starting transcription for {audio_path}...")
         
-        segments, info = self.model.transcribe(
-            audio_path,
-            language=language,
-            vad_filter=True,
-            vad_parameters=dict(min_silence_duration_ms=500)
-        )
+        segments, info = self._run_model(audio_input, language)
 
-        result = []
-        total_duration = info.duration
+        count = 0
+        total_duration = start_time + info.duration
         
-        with tqdm(total=total_duration, unit="s", desc="Transcribing") as pbar:
+        with tqdm(total=total_duration, initial=start_time, unit="s", desc="Transcribing") as pbar:
             for segment in segments:
-                segment_dict = {
-                    "start": segment.start,
-                    "end": segment.end,
-                    "text": segment.text.strip(),
-                    "confidence": segment.avg_logprob
-                }
-                result.append(segment_dict)
+                segment_dict = self._segment_to_dict(segment, offset=start_time)
+                count += 1
                 
-                current_pos = segment.end
+                current_pos = segment_dict["end"]
                 update_amount = current_pos - pbar.n
                 if update_amount > 0:
                     pbar.update(update_amount)
@@ -102,16 +204,279 @@ class STTEngine:
                 if progress_callback:
                     progress_callback(current_pos, total_duration)
                 
+                yield segment_dict
+                
+        logger.info(f"Transcription complete. {count} segments found.")
+
+    def transcribe_chunked(self, audio_path: str, language: str = "ko", chunk_size: float = 300, overlap_size: float = 5,
+                           max_workers: int = 2, progress_callback=None, completed_chunks: Optional[Dict[float, List[Dict[str, Any]]]] = None,
+                           chunk_callback=None, speech_map: Optional[List[Dict[str, float]]] = None,
+                           vad_cache=None) -> SegmentStore:
+        """
+        Transcribe audio in overlapping chunks processed by a worker pool.
+        
+        The audio is split into windows of `chunk_size` seconds that extend
+        `overlap_size` seconds into the next window. Segments are shifted back
+        to absolute time and de-duplicated in the overlap regions.
+        
+        With a `speech_map` (see `vad.SpeechMapCache`), only the speech is
+        transcribed: consecutive speech intervals are grouped into chunks of
+        up to `chunk_size` seconds of speech, cut at silences (so without
+        overlap), and the model runs without its own VAD pass.
+        
+        Args:
+            audio_path: Path to the audio file.
+            language: Language code (default "ko").
+            chunk_size: Chunk length in seconds.
+            overlap_size: Overlap between consecutive chunks in seconds.
+            max_workers: Number of chunks transcribed concurrently.
+            progress_callback: Optional function(current_time, total_duration) to update progress.
+            completed_chunks: Segments of chunks finished by an earlier run, keyed by window
+                start; these windows are not transcribed again.
+            chunk_callback: Optional function(start, end, segments) called when a chunk finishes.
+            speech_map: Speech intervals of the audio as [{"start": s, "end": s}] in seconds.
+            vad_cache: `vad.SpeechMapCache`; without a `speech_map`, the speech map is
+                looked up or computed from the samples decoded here, so the audio is
+                decoded only once.
+            
+        Returns:
+            Store of segments with start, end, text, and confidence.
+        """
+        if not os.path.exists(audio_path):
+            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+        if speech_map is not None and not speech_map:
+            logger.info(f"No speech detected in {audio_path}, skipping transcription.")
+            return SegmentStore()
+
+        audio = decode_audio(audio_path, sampling_rate=self.SAMPLE_RATE)
+        total_duration = len(audio) / self.SAMPLE_RATE
+        if speech_map is None and vad_cache is not None:
+            speech_map = vad_cache.load_or_compute(audio_path, audio=audio)
+            if not speech_map:
+                logger.info(f"No speech detected in {audio_path}, skipping transcription.")
+                return SegmentStore()
+        if speech_map is not None:
+            return self._transcribe_speech(audio, speech_map, language, chunk_size, max_workers,
+                                           progress_callback, completed_chunks, chunk_callback)
+
+        windows = plan_chunks(total_duration, chunk_size, overlap_size)
+
+        logger.info(f"Starting chunked transcription for {audio_path}: "
+                    f"{len(windows)} chunks of {chunk_size}s (+{overlap_size}s overlap), {max_workers} workers...")
+
+        completed_chunks = completed_chunks or {}
+        done_results = [(start, end, completed_chunks[start]) for start, end in windows if start in completed_chunks]
+        if done_results:
+            logger.info(f"Reusing {len(done_results)}/{len(windows)} chunks from an earlier run.")
+
+        window_iter = (
+            (start, audio[int(start * self.SAMPLE_RATE):int(end * self.SAMPLE_RATE)])
+            for start, end in windows
+            if start not in completed_chunks
+        )
+        return self._transcribe_windows(window_iter, language, chunk_size, overlap_size, max_workers,
+                                        total_duration, len(windows), progress_callback,
+                                        done_results=done_results, chunk_callback=chunk_callback)
+
+    def transcribe_clip(self, audio, start: float, end: float, language: str = "ko") -> List[Dict[str, Any]]:
+        """
+        Transcribe part of already decoded audio.
+
+        Args:
+            audio: 16 kHz samples of the whole recording.
+            start: Clip start in seconds (clamped to 0).
+            end: Clip end in seconds.
+            language: Language code (default "ko").
+
+        Returns:
+            Segments of the clip in absolute time.
+        """
+        start = max(0.0, start)
+        samples = audio[int(start * self.SAMPLE_RATE):int(end * self.SAMPLE_RATE)]
+        return self._transcribe_window(samples, start, language)
+
+    def _transcribe_speech(self, audio, speech_map: List[Dict[str, float]], language: str, chunk_size: float,
+                           max_workers: int, progress_callback=None, completed_chunks=None,
+                           chunk_callback=None) -> SegmentStore:
+        """
+        Transcribe only the speech intervals of decoded audio.
+        
+        Chunks are keyed by the start of their first interval, so checkpoints
+        of an earlier run with the same speech map can be reused.
+        """
+        timelines = {group[0]["start"]: SpeechTimeline(group) for group in group_speech(speech_map, chunk_size)}
+        speech_total = speech_duration(speech_map)
+
+        logger.info(f"Starting speech-only transcription: {speech_total:.0f}s of speech in "
+                    f"{len(audio) / self.SAMPLE_RATE:.0f}s of audio, {len(timelines)} chunks, {max_workers} workers...")
+
+        completed_chunks = completed_chunks or {}
+        done_results = [
+            (start, timeline.intervals[-1]["end"], completed_chunks[start])
+            for start, timeline in timelines.items()
+            if start in completed_chunks
+        ]
+        if done_results:
+            logger.info(f"Reusing {len(done_results)}/{len(timelines)} chunks from an earlier run.")
+
+        window_iter = (
+            (start, timeline.samples(audio, self.SAMPLE_RATE))
+            for start, timeline in timelines.items()
+            if start not in completed_chunks
+        )
+
+        def transcribe_fn(samples, start, language):
+            return self._transcribe_speech_window(samples, timelines[start], language)
+
+        return self._transcribe_windows(window_iter, language, chunk_size, 0, max_workers, speech_total,
+                                        len(timelines), progress_callback, done_results=done_results,
+                                        chunk_callback=chunk_callback, transcribe_fn=transcribe_fn)
+
+    def transcribe_stream(self, audio_stream, language: str = "ko", chunk_size: float = 300, overlap_size: float = 5,
+                          max_workers: int = 2, progress_callback=None) -> SegmentStore:
+        """
+        Transcribe audio while it is still being decoded.
+        
+        Windows are taken from an `AudioStream` as soon as FFmpeg has produced
+        them, so transcription of the beginning overlaps decoding of the rest
+        and no intermediate audio file is needed.
+        
+        Args:
+            audio_stream: An `AudioStream` (see `AudioProcessor.open_audio_stream`).
+            language: Language code (default "ko").
+            chunk_size: Window length in seconds.
+            overlap_size: Overlap between consecutive windows in seconds.
+            max_workers: Number of windows transcribed concurrently.
+            progress_callback: Optional function(current_time, total_duration) to update progress.
+                total_duration is 0 if the stream duration is unknown.
+            
+        Returns:
+            Store of segments with start, end, text, and confidence.
+        """
+        total_duration = audio_stream.duration or 0.0
+        total_windows = len(plan_chunks(total_duration, chunk_size, overlap_size)) if total_duration else None
+
+        logger.info(f"Starting streaming transcription: windows of {chunk_size}s (+{overlap_size}s overlap), "
+                    f"{max_workers} workers...")
+
+        return self._transcribe_windows(audio_stream.windows(chunk_size, overlap_size), language, chunk_size,
+                                        overlap_size, max_workers, total_duration, total_windows, progress_callback)
+
+    def _transcribe_windows(self, windows, language: str, chunk_size: float, overlap_size: float, max_workers: int,
+                            total_duration: float, total_windows: Optional[int], progress_callback=None,
+                            done_results: Optional[list] = None, chunk_callback=None,
+                            transcribe_fn=None) -> SegmentStore:
+        """
+        Transcribe (start, samples) windows on a worker pool and stitch the results.
+        
+        At most `max_workers` windows are in flight, which bounds memory when
+        windows come from a stream. `done_results` holds (start, end, segments)
+        of windows that need no transcription. `transcribe_fn(samples, start, language)`
+        replaces `_transcribe_window` for windows that are not a plain slice of the audio.
+        """
+        transcribe_fn = transcribe_fn or self._transcribe_window
+        if max_workers > self.num_workers:
+            logger.warning(f"max_workers={max_workers} exceeds model num_workers={self.num_workers}. "
+                           f"Chunks will queue inside the model.")
+
+        chunk_results = list(done_results or [])
+        processed = sum(min(chunk_size, end - start) for start, end, _ in chunk_results)
+        in_flight = {}
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor, \
+                tqdm(total=total_windows, initial=len(chunk_results), unit="chunk", desc="Transcribing") as pbar:
+
+            def collect(futures):
+                nonlocal processed
+                for future in futures:
+                    start, duration = in_flight.pop(future)
+                    segments = future.result()
+                    chunk_results.append((start, start + duration, segments))
+                    if chunk_callback:
+                        chunk_callback(start, start + duration, segments)
+                    
+                    processed += min(chunk_size, duration)
+                    pbar.update(1)
+                    if progress_callback:
+                        progress_callback(min(processed, total_duration) if total_duration else processed, total_duration)
+
+            for start, samples in windows:
+                if len(in_flight) >= max_workers:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+                future = executor.submit(transcribe_fn, samples, start, language)
+                in_flight[future] = (start, len(samples) / self.SAMPLE_RATE)
+
+            collect(list(as_completed(list(in_flight))))
+
+        result = SegmentStore(stitch_segments(chunk_results, overlap_size))
         logger.info(f"Transcription complete. {len(result)} segments found.")
         return result
 
+    def _transcribe_window(self, samples, start: float, language: str) -> List[Dict[str, Any]]:
+        """Transcribe one window of decoded audio and shift segments to absolute time."""
+        segments, _ = self._run_model(samples, language)
+        return [self._segment_to_dict(segment, offset=start) for segment in segments]
+
+    def _transcribe_speech_window(self, samples, timeline: SpeechTimeline, language: str) -> List[Dict[str, Any]]:
+        """Transcribe concatenated speech intervals and map segments back to the original timeline."""
+        segments, _ = self._run_model(samples, language, vad_filter=False)
+        result = []
+        for segment in segments:
+            segment_dict = self._segment_to_dict(segment)
+            segment_dict["start"] = timeline.to_original(segment.start)
+            segment_dict["end"] = timeline.to_original(segment.end, is_end=True)
+            if "words" in segment_dict:
+                segment_dict["word_starts"] = [timeline.to_original(t) for t in segment_dict["word_starts"]]
+                segment_dict["word_ends"] = [timeline.to_original(t, is_end=True) for t in segment_dict["word_ends"]]
+            result.append(segment_dict)
+        return result
+
+    def _run_model(self, audio, language: str, vad_filter: bool = True):
+        """
+        Run Whisper with VAD on a path or sample array.
+        
+        In batched mode, the VAD speech chunks are decoded `batch_size` at a
+        time instead of one 30-second window after another. Both paths yield
+        segments with the same fields. `vad_filter=False` skips VAD for audio
+        that already contains only speech; the batched pipeline keeps it
+        because it needs VAD to cut the audio into batchable pieces.
+        """
+        options = dict(
+            language=language,
+            beam_size=self.beam_size,
+            vad_filter=vad_filter or self.batched_pipeline is not None,
+            vad_parameters=dict(DEFAULT_VAD_PARAMETERS),
+            word_timestamps=self.word_timestamps
+        )
+        if self.batched_pipeline is not None:
+            return self.batched_pipeline.transcribe(audio, batch_size=self.batch_size, **options)
+        return self.model.transcribe(audio, **options)
+
+    def _segment_to_dict(self, segment, offset: float = 0.0) -> Dict[str, Any]:
+        """
+        Convert a faster-whisper segment to the pipeline's segment dict.
+        
+        Word timings are stored as three parallel lists rather than a dict
+        per word, which keeps hour-long transcripts (and their checkpoints) small.
+        """
+        segment_dict = {
+            "start": segment.start + offset,
+            "end": segment.end + offset,
+            "text": segment.text.strip(),
+            "confidence": segment.avg_logprob
+        }
+        if self.word_timestamps and segment.words:
+            words = [word for word in segment.words if word.word.strip()]
+            segment_dict["words"] = [word.word.strip() for word in words]
+            segment_dict["word_starts"] = [round(word.start + offset, 3) for word in words]
+            segment_dict["word_ends"] = [round(word.end + offset, 3) for word in words]
+        return segment_dict
+
     @staticmethod
     def format_timestamp(seconds: float) -> str:
         """
         Convert seconds to SRT timestamp format (00:00:00,000).
         """
-        millis = int((seconds - int(seconds)) * 1000)
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
-        return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+        return format_timestamp(seconds, "srt")
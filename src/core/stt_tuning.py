@@ -0,0 +1,222 @@
+import os
+import json
+import time
+import difflib
+import logging
+import platform
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import ctranslate2
+import numpy as np
+from faster_whisper import WhisperModel
+
+from src.utils.hashing import hash_text
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+CLIP_SECONDS = 30  # Length of the calibration clip
+DEFAULT_TUNING_PATH = "cache/stt_tuning.json"
+
+# Preferred compute types per device, most precise first (the first supported one is the accuracy reference)
+COMPUTE_TYPE_CANDIDATES = {
+    "cuda": ["float16", "int8_float16", "int8"],
+    "cpu": ["int8_float32", "int8"],
+}
+
+
+def resolve_device(device: str) -> str:
+    """Resolve "auto" to "cuda" when a CUDA device is visible, else "cpu"."""
+    if device != "auto":
+        return device
+    try:
+        return "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+    except Exception:
+        return "cpu"
+
+
+def machine_key() -> str:
+    """Identify this machine's hardware, so tuned settings are never reused on another box."""
+    try:
+        cuda_devices = ctranslate2.get_cuda_device_count()
+    except Exception:
+        cuda_devices = 0
+    return hash_text(platform.node(), platform.machine(), platform.processor(), str(os.cpu_count()), str(cuda_devices))[:16]
+
+
+def default_profile(device: str) -> Dict[str, Any]:
+    """
+    Untuned settings used until calibration ran on this machine.
+
+    int8 on CPU with one thread per core, int8_float16 on CUDA.
+    """
+    device = resolve_device(device)
+    if device == "cuda":
+        return {"device": "cuda", "compute_type": "int8_float16", "cpu_threads": 0, "num_workers": 1, "beam_size": 5}
+    return {"device": "cpu", "compute_type": "int8", "cpu_threads": os.cpu_count() or 4, "num_workers": 1, "beam_size": 5}
+
+
+def candidate_profiles(device: str, num_workers_options: Sequence[int] = (1, 2),
+                       beam_sizes: Sequence[int] = (5, 1)) -> List[Dict[str, Any]]:
+    """
+    Settings to time during calibration.
+
+    On CPU the cores are split between workers (cpu_threads * num_workers
+    stays at the core count). The first candidate is the most precise one
+    and serves as the accuracy reference.
+
+    Args:
+        device: "cpu", "cuda" or "auto".
+        num_workers_options: Concurrent transcriptions to try.
+        beam_sizes: Beam sizes to try, reference first.
+
+    Returns:
+        List of profiles.
+    """
+    device = resolve_device(device)
+    try:
+        supported = ctranslate2.get_supported_compute_types(device)
+    except Exception:
+        supported = set()
+    compute_types = [ct for ct in COMPUTE_TYPE_CANDIDATES.get(device, []) if ct in supported] or ["default"]
+    cores = os.cpu_count() or 4
+
+    profiles = []
+    for compute_type in compute_types:
+        for num_workers in num_workers_options:
+            cpu_threads = max(1, cores // num_workers) if device == "cpu" else 0
+            for beam_size in beam_sizes:
+                profiles.append({
+                    "device": device,
+                    "compute_type": compute_type,
+                    "cpu_threads": cpu_threads,
+                    "num_workers": num_workers,
+                    "beam_size": beam_size,
+                })
+    return profiles
+
+
+class TuningStore:
+    """
+    JSON file of the fastest calibrated STT settings, per machine, model size and device.
+    """
+    def __init__(self, path: str = DEFAULT_TUNING_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict[str, Any]:
+        if not self.path.exists():
+            return {}
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Ignoring unreadable tuning file {self.path}: {e}")
+            return {}
+
+    def get(self, model_size: str, device: str) -> Optional[Dict[str, Any]]:
+        """Tuned profile for this machine, or None if calibration never ran."""
+        device = resolve_device(device)
+        with self._lock:
+            return self._read().get(machine_key(), {}).get(model_size, {}).get(device)
+
+    def put(self, model_size: str, device: str, profile: Dict[str, Any]):
+        """Persist a tuned profile (atomic write)."""
+        device = resolve_device(device)
+        with self._lock:
+            data = self._read()
+            data.setdefault(machine_key(), {}).setdefault(model_size, {})[device] = profile
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".json.tmp")
+            tmp_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+            os.replace(tmp_path, self.path)
+
+
+def load_profile(model_size: str, device: str, store: Optional[TuningStore] = None) -> Dict[str, Any]:
+    """Tuned profile for this machine, falling back to `default_profile`."""
+    profile = (store or TuningStore()).get(model_size, device)
+    if profile:
+        return profile
+    return default_profile(device)
+
+
+def _time_profile(profile: Dict[str, Any], model_size: str, model_path: str, clip, language: str):
+    """Load a model with `profile` and return (audio seconds per wall second, reference text)."""
+    model = WhisperModel(
+        model_size,
+        device=profile["device"],
+        compute_type=profile["compute_type"],
+        cpu_threads=profile["cpu_threads"],
+        num_workers=profile["num_workers"],
+        download_root=model_path,
+    )
+
+    def run():
+        segments, _ = model.transcribe(clip, language=language, beam_size=profile["beam_size"])
+        return "".join(segment.text for segment in segments).strip()
+
+    run()  # Warm-up: first call includes one-time initialization
+    workers = profile["num_workers"]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        texts = list(executor.map(lambda _: run(), range(workers)))
+    elapsed = time.perf_counter() - started
+    del model
+    return workers * len(clip) / SAMPLE_RATE / elapsed, texts[0]
+
+
+def autotune(model_size: str, clip: np.ndarray, device: str = "auto", model_path: str = "models",
+             language: str = "ko", candidates: Optional[List[Dict[str, Any]]] = None,
+             min_similarity: float = 0.9, store: Optional[TuningStore] = None) -> Dict[str, Any]:
+    """
+    Time candidate settings on a short clip and persist the fastest one for this machine.
+
+    Candidates whose transcript differs too much from the reference (the
+    first, most precise candidate) are rejected, so a lower precision or
+    beam size is only chosen when it doesn't change the output.
+
+    Args:
+        model_size: Whisper model size.
+        clip: Calibration clip, 16 kHz mono samples (`CLIP_SECONDS` long, see
+            `AudioProcessor.read_clip`, which decodes only the clip).
+        device: "cpu", "cuda" or "auto".
+        model_path: Model download directory.
+        language: Language code of the clip.
+        candidates: Profiles to try (default: `candidate_profiles(device)`).
+        min_similarity: Minimum transcript similarity to the reference (0-1).
+        store: Where to persist the result.
+
+    Returns:
+        The chosen profile, including its measured throughput.
+    """
+    store = store or TuningStore()
+    candidates = candidates or candidate_profiles(device)
+    logger.info(f"Calibrating {len(candidates)} STT settings on {len(clip) / SAMPLE_RATE:.0f}s of audio...")
+
+    reference_text = None
+    best = None
+    for profile in candidates:
+        try:
+            throughput, text = _time_profile(profile, model_size, model_path, clip, language)
+        except Exception as e:
+            logger.warning(f"Skipping {profile}: {e}")
+            continue
+
+        if reference_text is None:
+            reference_text = text
+        similarity = difflib.SequenceMatcher(None, reference_text, text).ratio() if reference_text else 1.0
+        logger.info(f"{profile}: {throughput:.2f}x realtime, similarity {similarity:.2f}")
+        if similarity < min_similarity:
+            continue
+        if best is None or throughput > best["throughput"]:
+            best = dict(profile, throughput=round(throughput, 3))
+
+    if best is None:
+        raise RuntimeError("STT calibration failed for every candidate setting.")
+
+    best["tuned_at"] = time.time()
+    store.put(model_size, device, best)
+    logger.info(f"Tuned STT settings for {model_size} on {best['device']}: {best}")
+    return best
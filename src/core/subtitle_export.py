@@ -0,0 +1,330 @@
+import os
+import json
+import logging
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Iterable, Type, Union
+
+logger = logging.getLogger(__name__)
+
+
+def format_timestamp(seconds: float, style: str = "srt") -> str:
+    """
+    Format a time for a subtitle format, rounded to the format's precision.
+
+    Args:
+        seconds: Time in seconds.
+        style: "srt" (00:00:00,000), "vtt" (00:00:00.000) or "ass" (0:00:00.00).
+
+    Returns:
+        Formatted timestamp string.
+    """
+    if style == "ass":
+        total = int(round(max(seconds, 0.0) * 100))
+        hours, rest = divmod(total, 360000)
+        minutes, rest = divmod(rest, 6000)
+        secs, centis = divmod(rest, 100)
+        return f"{hours:d}:{minutes:02d}:{secs:02d}.{centis:02d}"
+
+    total = int(round(max(seconds, 0.0) * 1000))
+    hours, rest = divmod(total, 3600000)
+    minutes, rest = divmod(rest, 60000)
+    secs, millis = divmod(rest, 1000)
+    separator = "." if style == "vtt" else ","
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+class SubtitleFormat:
+    """
+    A subtitle file format: header, one entry per segment, footer.
+
+    Register new formats with `register_format`; `SubtitleWriter` and
+    `SubtitleExporter` look them up by `name`.
+    """
+    name = ""
+    extension = ""
+
+    def header(self) -> str:
+        return ""
+
+    def entry(self, index: int, segment: Dict[str, Any]) -> str:
+        """Format segment number `index` (1-based)."""
+        raise NotImplementedError
+
+    def footer(self) -> str:
+        return ""
+
+
+FORMATS: Dict[str, Type[SubtitleFormat]] = {}
+
+
+def register_format(cls: Type[SubtitleFormat]) -> Type[SubtitleFormat]:
+    """Class decorator adding a format to `FORMATS`."""
+    FORMATS[cls.name] = cls
+    return cls
+
+
+def get_format(name: str) -> SubtitleFormat:
+    """Instantiate a registered format by name (case-insensitive)."""
+    try:
+        return FORMATS[name.lower()]()
+    except KeyError:
+        raise ValueError(f"Unknown subtitle format: {name} (available: {', '.join(sorted(FORMATS))})") from None
+
+
+@register_format
+class SRTFormat(SubtitleFormat):
+    name = "srt"
+    extension = "srt"
+
+    def entry(self, index: int, segment: Dict[str, Any]) -> str:
+        start_time = format_timestamp(segment["start"], "srt")
+        end_time = format_timestamp(segment["end"], "srt")
+        return f"{index}\n{start_time} --> {end_time}\n{segment['text'].strip()}\n\n"
+
+
+@register_format
+class VTTFormat(SubtitleFormat):
+    name = "vtt"
+    extension = "vtt"
+
+    def header(self) -> str:
+        return "WEBVTT\n\n"
+
+    def entry(self, index: int, segment: Dict[str, Any]) -> str:
+        start_time = format_timestamp(segment["start"], "vtt")
+        end_time = format_timestamp(segment["end"], "vtt")
+        return f"{index}\n{start_time} --> {end_time}\n{segment['text'].strip()}\n\n"
+
+
+@register_format
+class ASSFormat(SubtitleFormat):
+    name = "ass"
+    extension = "ass"
+
+    def __init__(self, font: str = "Malgun Gothic", font_size: int = 48):
+        self.font = font
+        self.font_size = font_size
+
+    def header(self) -> str:
+        return (
+            "[Script Info]\n"
+            "ScriptType: v4.00+\n"
+            "PlayResX: 1920\n"
+            "PlayResY: 1080\n"
+            "WrapStyle: 0\n"
+            "\n"
+            "[V4+ Styles]\n"
+            "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, "
+            "Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, "
+            "Shadow, Alignment, MarginL, MarginR, MarginV, Encoding\n"
+            f"Style: Default,{self.font},{self.font_size},&H00FFFFFF,&H000000FF,&H00000000,&H80000000,"
+            "0,0,0,0,100,100,0,0,1,2,1,2,20,20,40,1\n"
+            "\n"
+            "[Events]\n"
+            "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n"
+        )
+
+    def entry(self, index: int, segment: Dict[str, Any]) -> str:
+        start_time = format_timestamp(segment["start"], "ass")
+        end_time = format_timestamp(segment["end"], "ass")
+        text = segment["text"].strip().replace("\n", "\\N")
+        return f"Dialogue: 0,{start_time},{end_time},Default,,0,0,0,,{text}\n"
+
+
+@register_format
+class JSONFormat(SubtitleFormat):
+    """JSON array of the full segment dicts (all fields, times in seconds)."""
+    name = "json"
+    extension = "json"
+
+    def header(self) -> str:
+        return "["
+
+    def entry(self, index: int, segment: Dict[str, Any]) -> str:
+        separator = "\n" if index == 1 else ",\n"
+        return separator + json.dumps(dict(segment, index=index), ensure_ascii=False)
+
+    def footer(self) -> str:
+        return "\n]\n"
+
+
+class SubtitleWriter:
+    """
+    Incremental subtitle file writer with atomic finalize.
+
+    Segments are written as they are produced to `<output_path>.partial`
+    through a write buffer, which is flushed every `flush_every` segments so
+    other readers can follow the output. `finalize` renames the partial file
+    to `output_path`, so the final path only ever holds a complete file. Used
+    as a context manager, the writer finalizes on success and removes the
+    partial file on error.
+    """
+    PARTIAL_SUFFIX = ".partial"
+
+    def __init__(self, output_path: str, subtitle_format: Union[str, SubtitleFormat] = "srt", flush_every: int = 20,
+                 buffer_size: int = 64 * 1024, tail_size: int = 20):
+        """
+        Initialize SubtitleWriter.
+
+        Args:
+            output_path: Final path of the subtitle file.
+            subtitle_format: Format name (see `FORMATS`) or instance.
+            flush_every: Flush the buffer to the partial file every this many segments.
+            buffer_size: Write buffer size in bytes.
+            tail_size: Number of last entries kept for `tail`.
+        """
+        self.output_path = Path(output_path)
+        self.partial_path = self.partial_path_for(output_path)
+        self.format = get_format(subtitle_format) if isinstance(subtitle_format, str) else subtitle_format
+        self.flush_every = max(1, flush_every)
+        self.count = 0
+        self._tail = deque(maxlen=tail_size)
+        self._lock = threading.Lock()
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.partial_path, "w", encoding="utf-8", buffering=buffer_size)
+        self._file.write(self.format.header())
+
+    @classmethod
+    def partial_path_for(cls, output_path: str) -> Path:
+        path = Path(output_path)
+        return path.with_name(path.name + cls.PARTIAL_SUFFIX)
+
+    def write(self, segment: Dict[str, Any]):
+        """Append one segment (numbered in the order written)."""
+        with self._lock:
+            self.count += 1
+            entry = self.format.entry(self.count, segment)
+            self._file.write(entry)
+            self._tail.append(entry)
+            if self.count % self.flush_every == 0:
+                self._file.flush()
+
+    def write_all(self, segments: Iterable[Dict[str, Any]]):
+        for segment in segments:
+            self.write(segment)
+
+    def flush(self):
+        with self._lock:
+            self._file.flush()
+
+    def tail(self) -> str:
+        """The last written entries, e.g. for a live preview."""
+        with self._lock:
+            return "".join(self._tail)
+
+    def finalize(self) -> str:
+        """
+        Write the footer, sync and atomically move the file to its final path.
+
+        Returns:
+            The final output path.
+        """
+        with self._lock:
+            self._file.write(self.format.footer())
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            os.replace(self.partial_path, self.output_path)
+        logger.info(f"Subtitle file finalized: {self.output_path} ({self.count} segments)")
+        return str(self.output_path)
+
+    def abort(self):
+        """Discard the partial file."""
+        with self._lock:
+            self._file.close()
+            self.partial_path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.finalize()
+        else:
+            self.abort()
+
+
+class SubtitleExporter:
+    """
+    Write one stream of segments to several subtitle formats in a single pass.
+
+    Each segment is read once and handed to one `SubtitleWriter` per format;
+    all files share the base path and differ only in their extension.
+    """
+    def __init__(self, base_path: str, formats: Iterable[str] = ("srt",), **writer_options):
+        """
+        Initialize SubtitleExporter.
+
+        Args:
+            base_path: Output path without extension.
+            formats: Format names; the first one is the primary output (used for `tail`).
+            **writer_options: Keyword arguments for each `SubtitleWriter`.
+        """
+        formats = list(dict.fromkeys(name.lower() for name in formats)) or ["srt"]
+        self.writers: Dict[str, SubtitleWriter] = {}
+        try:
+            for name in formats:
+                subtitle_format = get_format(name)
+                self.writers[name] = SubtitleWriter(f"{base_path}.{subtitle_format.extension}", subtitle_format,
+                                                    **writer_options)
+        except Exception:
+            self.abort()
+            raise
+
+    @property
+    def output_paths(self) -> Dict[str, str]:
+        return {name: str(writer.output_path) for name, writer in self.writers.items()}
+
+    def write(self, segment: Dict[str, Any]):
+        for writer in self.writers.values():
+            writer.write(segment)
+
+    def write_all(self, segments: Iterable[Dict[str, Any]]):
+        for segment in segments:
+            self.write(segment)
+
+    def tail(self) -> str:
+        """Tail of the primary format."""
+        return next(iter(self.writers.values())).tail()
+
+    def finalize(self) -> Dict[str, str]:
+        """
+        Finalize every file.
+
+        Returns:
+            Dict of format name -> output path.
+        """
+        return {name: writer.finalize() for name, writer in self.writers.items()}
+
+    def abort(self):
+        for writer in self.writers.values():
+            writer.abort()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.finalize()
+        else:
+            self.abort()
+
+
+def export_subtitles(segments: Iterable[Dict[str, Any]], base_path: str,
+                     formats: Iterable[str] = ("srt",)) -> Dict[str, str]:
+    """
+    Write segments to every requested format in one pass.
+
+    Args:
+        segments: List or iterable of segments with 'start', 'end', 'text'.
+        base_path: Output path without extension.
+        formats: Format names (see `FORMATS`).
+
+    Returns:
+        Dict of format name -> output path.
+    """
+    with SubtitleExporter(base_path, formats) as exporter:
+        exporter.write_all(segments)
+    return exporter.output_paths
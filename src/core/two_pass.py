@@ -0,0 +1,122 @@
+import logging
+from typing import Any, Callable, Dict, List, Tuple
+
+from faster_whisper import decode_audio
+
+from src.core.segment_store import SegmentStore
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+# Segments whose avg_logprob ("confidence") is below this are re-transcribed
+DEFAULT_REFINE_THRESHOLD = -0.7
+
+
+def low_confidence_spans(segments: List[Dict[str, Any]], threshold: float = DEFAULT_REFINE_THRESHOLD,
+                         max_gap: float = 1.0) -> List[Tuple[int, int]]:
+    """
+    Find runs of consecutive low-confidence segments.
+
+    Neighbouring low-confidence segments less than `max_gap` seconds apart
+    are refined together, so the large model sees whole sentences.
+
+    Args:
+        segments: Draft segments, sorted by time.
+        threshold: Segments with a confidence below this are low-confidence.
+        max_gap: Maximum silence between segments of one run, in seconds.
+
+    Returns:
+        (first, last) segment index pairs, `last` exclusive.
+    """
+    spans: List[Tuple[int, int]] = []
+    for index, segment in enumerate(segments):
+        if segment["confidence"] >= threshold:
+            continue
+        if spans and spans[-1][1] == index and segment["start"] - segments[index - 1]["end"] <= max_gap:
+            spans[-1] = (spans[-1][0], index + 1)
+        else:
+            spans.append((index, index + 1))
+    return spans
+
+
+def refine_segments(segments: List[Dict[str, Any]], refine_engine, audio, language: str = "ko",
+                    threshold: float = DEFAULT_REFINE_THRESHOLD, padding: float = 0.5,
+                    progress_callback=None) -> SegmentStore:
+    """
+    Re-transcribe the low-confidence runs of a draft with another (larger) model.
+
+    Each run is transcribed with `padding` seconds of context on both sides;
+    refined segments whose midpoint falls outside the run are dropped, so
+    the confident neighbours are kept as they are. A run the refine model
+    finds no speech in keeps its draft segments.
+
+    Args:
+        segments: Draft segments.
+        refine_engine: STTEngine used for the second pass.
+        audio: Decoded 16 kHz samples of the whole recording.
+        language: Language code.
+        threshold: Confidence below which segments are refined.
+        padding: Context added around each run in seconds.
+        progress_callback: Optional function(current, total) over refined runs.
+
+    Returns:
+        Store of the merged segments.
+    """
+    spans = low_confidence_spans(segments, threshold)
+    result = SegmentStore()
+    position = 0
+    for done, (first, last) in enumerate(spans, 1):
+        result.extend(segments[position:first])
+        start, end = segments[first]["start"], segments[last - 1]["end"]
+        refined = [
+            segment for segment in refine_engine.transcribe_clip(audio, start - padding, end + padding, language)
+            if start <= (segment["start"] + segment["end"]) / 2 <= end
+        ]
+        result.extend(refined or segments[first:last])
+        position = last
+        if progress_callback:
+            progress_callback(done, len(spans))
+    result.extend(segments[position:])
+    return result
+
+
+def two_pass_transcribe(draft_engine, load_refine_engine: Callable[[], Any], audio_path: str, language: str = "ko",
+                        threshold: float = DEFAULT_REFINE_THRESHOLD, draft_callback=None,
+                        draft_progress_callback=None, refine_progress_callback=None) -> SegmentStore:
+    """
+    Transcribe with a small draft model, then refine only its low-confidence segments.
+
+    Draft segments are passed to `draft_callback` as soon as they are
+    produced (e.g. for a live preview). The refine model is only requested
+    from `load_refine_engine` if the draft has low-confidence segments, so
+    easy audio never loads it.
+
+    Args:
+        draft_engine: STTEngine with a small model (e.g. "base").
+        load_refine_engine: Function returning the STTEngine for the second pass.
+        audio_path: Path to the audio file.
+        language: Language code.
+        threshold: Confidence below which draft segments are refined.
+        draft_callback: Optional function(segment) called for each draft segment.
+        draft_progress_callback: Optional function(current_time, total_duration) for the draft pass.
+        refine_progress_callback: Optional function(current, total) over refined runs.
+
+    Returns:
+        Store of segments with start, end, text, and confidence.
+    """
+    draft = SegmentStore()
+    for segment in draft_engine.iter_transcribe(audio_path, language=language, progress_callback=draft_progress_callback):
+        draft.append(segment)
+        if draft_callback:
+            draft_callback(segment)
+
+    spans = low_confidence_spans(draft, threshold)
+    refined_count = sum(last - first for first, last in spans)
+    logger.info(f"Draft pass done: {refined_count}/{len(draft)} segments below confidence {threshold} "
+                f"in {len(spans)} runs.")
+    if not spans:
+        return draft
+
+    audio = decode_audio(audio_path, sampling_rate=SAMPLE_RATE)
+    return refine_segments(draft, load_refine_engine(), audio, language, threshold,
+                           progress_callback=refine_progress_callback)
@@ -0,0 +1,165 @@
+import os
+import json
+import bisect
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from faster_whisper import decode_audio
+from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+from src.utils.hashing import hash_file, hash_text
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+# Same VAD settings the transcriber used inline
+DEFAULT_VAD_PARAMETERS = {"min_silence_duration_ms": 500}
+
+
+def detect_speech(audio: np.ndarray, sample_rate: int = SAMPLE_RATE, **vad_parameters) -> List[Dict[str, float]]:
+    """
+    Run Silero VAD over a whole recording.
+
+    Args:
+        audio: Mono float32 samples.
+        sample_rate: Sample rate of `audio`.
+        **vad_parameters: `VadOptions` fields (default: `DEFAULT_VAD_PARAMETERS`).
+
+    Returns:
+        Speech intervals as [{"start": s, "end": s}] in seconds.
+    """
+    options = VadOptions(**(vad_parameters or DEFAULT_VAD_PARAMETERS))
+    chunks = get_speech_timestamps(audio, options, sampling_rate=sample_rate)
+    return [{"start": chunk["start"] / sample_rate, "end": chunk["end"] / sample_rate} for chunk in chunks]
+
+
+def speech_duration(speech_map: List[Dict[str, float]]) -> float:
+    """Total speech time in seconds."""
+    return sum(interval["end"] - interval["start"] for interval in speech_map)
+
+
+def group_speech(speech_map: List[Dict[str, float]], max_duration: float) -> List[List[Dict[str, float]]]:
+    """
+    Group consecutive speech intervals into windows of at most `max_duration` seconds of speech.
+
+    Windows are cut at silences, so they need no overlap. An interval longer
+    than `max_duration` is split into pieces of that length.
+    """
+    groups: List[List[Dict[str, float]]] = []
+    current: List[Dict[str, float]] = []
+    current_duration = 0.0
+    for interval in speech_map:
+        start = interval["start"]
+        while interval["end"] - start > max_duration:
+            if current:
+                groups.append(current)
+                current, current_duration = [], 0.0
+            groups.append([{"start": start, "end": start + max_duration}])
+            start += max_duration
+        piece = {"start": start, "end": interval["end"]}
+        length = piece["end"] - piece["start"]
+        if current and current_duration + length > max_duration:
+            groups.append(current)
+            current, current_duration = [], 0.0
+        current.append(piece)
+        current_duration += length
+    if current:
+        groups.append(current)
+    return groups
+
+
+class SpeechTimeline:
+    """
+    Maps times in concatenated speech audio back to the original recording.
+    """
+    def __init__(self, intervals: List[Dict[str, float]]):
+        self.intervals = intervals
+        self.offsets = []
+        offset = 0.0
+        for interval in intervals:
+            self.offsets.append(offset)
+            offset += interval["end"] - interval["start"]
+        self.duration = offset
+
+    def samples(self, audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+        """Concatenate the speech intervals of `audio`."""
+        return np.concatenate([
+            audio[int(interval["start"] * sample_rate):int(interval["end"] * sample_rate)]
+            for interval in self.intervals
+        ])
+
+    def to_original(self, time: float, is_end: bool = False) -> float:
+        """Original recording time of `time` in the concatenated audio."""
+        index = max(bisect.bisect_right(self.offsets, time) - 1, 0)
+        # An end exactly on a boundary belongs to the interval before it
+        if is_end and index > 0 and time <= self.offsets[index]:
+            index -= 1
+        interval = self.intervals[index]
+        return round(min(interval["start"] + time - self.offsets[index], interval["end"]), 3)
+
+
+class SpeechMapCache:
+    """
+    On-disk cache of VAD speech maps keyed by audio content and VAD parameters.
+
+    The key does not include the Whisper model, so re-running a file with
+    another model size reuses its speech map.
+    """
+    def __init__(self, cache_dir: str = "cache/vad"):
+        self.cache_dir = Path(cache_dir)
+        self._lock = threading.Lock()
+
+    def make_key(self, audio_path: str, vad_parameters: Dict[str, Any]) -> str:
+        return hash_text(hash_file(audio_path), json.dumps(vad_parameters, sort_keys=True))
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"speech_{key}.json"
+
+    def get(self, key: str) -> Optional[List[Dict[str, float]]]:
+        path = self._entry_path(key)
+        if not path.exists():
+            return None
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Ignoring unreadable speech map {path}: {e}")
+            return None
+
+    def put(self, key: str, speech_map: List[Dict[str, float]]):
+        with self._lock:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self._entry_path(key)
+            tmp_path = path.with_suffix(".json.tmp")
+            tmp_path.write_text(json.dumps(speech_map), encoding="utf-8")
+            os.replace(tmp_path, path)
+
+    def load_or_compute(self, audio_path: str, audio: Optional[np.ndarray] = None,
+                        **vad_parameters) -> List[Dict[str, float]]:
+        """
+        Speech map of an audio file, computed once per audio content.
+
+        Args:
+            audio_path: Path to the audio file.
+            audio: Already decoded 16 kHz samples of the file, to avoid decoding twice.
+            **vad_parameters: `VadOptions` fields (default: `DEFAULT_VAD_PARAMETERS`).
+
+        Returns:
+            Speech intervals in seconds.
+        """
+        vad_parameters = vad_parameters or dict(DEFAULT_VAD_PARAMETERS)
+        key = self.make_key(audio_path, vad_parameters)
+        speech_map = self.get(key)
+        if speech_map is not None:
+            logger.info(f"Speech map cache hit for {audio_path} ({len(speech_map)} intervals)")
+            return speech_map
+
+        if audio is None:
+            audio = decode_audio(audio_path, sampling_rate=SAMPLE_RATE)
+        speech_map = detect_speech(audio, **vad_parameters)
+        total = len(audio) / SAMPLE_RATE
+        logger.info(f"VAD found {speech_duration(speech_map):.0f}s of speech in {total:.0f}s of {audio_path}")
+        self.put(key, speech_map)
+        return speech_map
@@ -1,6 +1,7 @@
 import streamlit as st
 import os
 import sys
+import shutil
 from pathlib import Path
 
 # Add project root to sys.path to allow imports from src
@@ -10,11 +11,25 @@ if str(project_root) not in sys.path:
     sys.path.append(str(project_root))
 
 from src.utils.resource_resolver import get_resource_path
+from src.utils.config import load_config
 from src.utils.gpu_setup import add_nvidia_dll_path
+from src.utils.hashing import hash_file, hash_stream, copy_stream_hashed
 from src.core.audio_processor import AudioProcessor
 from src.core.stt_engine import STTEngine
+from src.core.stt_tuning import CLIP_SECONDS, TuningStore, autotune
+from src.core.model_pool import get_model_pool
 from src.core.llm_engine import LLMEngine
+from src.core.llm_cache import CorrectionCache
+from src.core.job_manifest import JobManifest
+from src.core.job_executor import get_job_executor
+from src.core.vad import SpeechMapCache
+from src.core.two_pass import DEFAULT_REFINE_THRESHOLD, two_pass_transcribe
+from src.core.pipeline import (checkpointed_transcribe, checkpointed_correct, transcribe_and_correct, collect_video_files,
+                               stt_checkpoint_settings)
 from src.core.srt_generator import SRTGenerator
+from src.core.subtitle_export import FORMATS, SubtitleExporter
+from src.core.postprocess import PostProcessingBuffer, SegmentPostProcessor
+from src.core.alignment import retime_segment
 import logging
 
 from src.core.srt_generator import SRTGenerator
@@ -40,6 +55,346 @@ def save_api_key(key):
     except Exception as e:
         st.error(f"API Key 저장 실패: {e}")
 
+def stage_upload(uploaded_file, temp_path: Path) -> bool:
+    """
+    Stage an uploaded file on disk without holding a second copy in memory.
+    
+    Streamlit reruns the script on every widget change, so the staged file is
+    remembered per upload id and the copy is skipped when an identical file
+    (same content hash) is already at `temp_path`.
+    
+    Returns:
+        True if the file was written, False if the staged copy was reused.
+    """
+    staged = st.session_state.setdefault("staged_uploads", {})
+    if staged.get(uploaded_file.file_id) == str(temp_path) and temp_path.exists():
+        return False
+    
+    uploaded_file.seek(0)
+    if temp_path.exists() and temp_path.stat().st_size == uploaded_file.size:
+        if hash_stream(uploaded_file) == hash_file(str(temp_path)):
+            staged[uploaded_file.file_id] = str(temp_path)
+            return False
+        uploaded_file.seek(0)
+    
+    copy_stream_hashed(uploaded_file, str(temp_path))
+    staged[uploaded_file.file_id] = str(temp_path)
+    return True
+
+def get_executor():
+    """Shared background executor; jobs keep running across reruns, refreshes and tabs."""
+    jobs_config = load_config().get("jobs", {})
+    return get_job_executor(
+        max_jobs=jobs_config.get("max_concurrent", 4),
+        stage_limits=jobs_config.get("stage_limits", {"extract": 2, "stt": 1, "llm": 2})
+    )
+
+def run_subtitle_job(ctx, video_path: str, options: dict) -> dict:
+    """
+    Extraction -> STT -> LLM -> SRT for one video, run on a background worker.
+    
+    Must not call Streamlit APIs: progress goes through `ctx.update`, which
+    also stops the job when it is cancelled.
+    """
+    result = {}
+    use_chunking = options["use_chunking"]
+    use_streaming = options["use_streaming"]
+    chunk_size = options["chunk_size"]
+    overlap_size = options["overlap_size"]
+    workers = options["workers"]
+    use_two_pass = bool(options.get("draft_model")) and not (use_chunking or use_streaming)
+    word_timestamps = bool(options.get("word_timestamps"))
+    config = load_config()
+    processing_config = config.get("processing", {})
+    stt_config = config.get("stt", {})
+    language = stt_config.get("language", "ko")
+    refine_threshold = stt_config.get("refine_threshold", DEFAULT_REFINE_THRESHOLD)
+    
+    # Checkpoint of this file + STT settings; an interrupted or cancelled job resumes from here
+    stt_settings = stt_checkpoint_settings(
+        options["model_size"],
+        language,
+        chunked=use_chunking and not use_streaming,
+        chunk_size=chunk_size,
+        overlap_size=overlap_size,
+        vad=True,
+        streaming=use_streaming,
+        draft_model=options["draft_model"] if use_two_pass else None,
+        refine_threshold=refine_threshold,
+        word_timestamps=word_timestamps
+    )
+    manifest = JobManifest.open(processing_config.get("jobs_dir", "jobs"), video_path, stt_settings)
+    segments = manifest.stt_result()
+    result["resumed"] = segments is not None or manifest.audio_path is not None
+    
+    # 1. Audio Extraction (skipped in streaming mode: FFmpeg feeds STT directly)
+    audio_processor = AudioProcessor(temp_dir="temp")
+    audio_path = manifest.audio_path
+    if segments is None and not use_streaming and audio_path is None:
+        with ctx.stage("extract"):
+            ctx.update(0.0, "🔊 오디오 추출 중...")
+            audio_path = audio_processor.extract_audio(video_path)
+            manifest.set_audio_path(audio_path)
+    ctx.update(0.1)
+    
+    # 2. STT + 3. LLM Correction
+    correction_cache = None
+    exporter = None
+    try:
+        correction_cache = CorrectionCache()
+        llm_engine = LLMEngine(
+            api_key=options["api_key"],
+            requests_per_minute=options["llm_rpm"] or None,
+            tokens_per_minute=options["llm_tpm"] or None,
+            cache=correction_cache
+        )
+        # STT maps to 10-50%, LLM to 50-90%; in overlapped mode LLM progress scales with STT progress
+        progress_state = {"stt": 0.0, "llm": 0.0}
+        
+        def overall_progress():
+            return min(0.1 + progress_state["stt"] * 0.4 + progress_state["stt"] * progress_state["llm"] * 0.4, 0.9)
+        
+        def stt_progress(current, total):
+            if total > 0:
+                progress_state["stt"] = min(current / total, 1.0)
+                ctx.update(overall_progress(), f"📝 STT 변환 중... ({int(current)}s / {int(total)}s)")
+        
+        def llm_progress(current, total):
+            if total > 0:
+                progress_state["llm"] = current / total
+                ctx.update(overall_progress(), f"🤖 LLM 교정 중... ({current}/{total} 세그먼트)")
+        
+        # Corrected segments are written to every format as soon as they are final;
+        # the output files only appear once complete
+        formats = options.get("formats") or ["srt"]
+        output_path = SRTGenerator.generate_output_filename(video_path, options["output_dir"], formats)
+        exporter = SubtitleExporter(str(Path(output_path).with_suffix("")), formats)
+        
+        def write_segment(segment):
+            exporter.write(segment)
+            ctx.set_preview(exporter.tail())
+        
+        # Post-processing looks at neighbouring cues, so the stream is processed in small blocks
+        postprocessor = None
+        if options.get("postprocess"):
+            postprocessor = SegmentPostProcessor.from_config(dict(config.get("postprocess", {}), enabled=True))
+        postprocess_buffer = PostProcessingBuffer(postprocessor, write_segment) if postprocessor else None
+        on_processed = postprocess_buffer.write if postprocess_buffer else write_segment
+        
+        def on_corrected(segment):
+            # Corrected text may differ a lot from what was heard: re-time it to the spoken words
+            on_processed(retime_segment(segment) if word_timestamps else segment)
+        
+        corrected_segments = None
+        if segments is None:
+            with ctx.stage("stt"):
+                ctx.update(message="📝 STT 변환 중...")
+                parallel = use_chunking or use_streaming
+                engines = []
+                
+                def load_engine(model_size):
+                    engine = STTEngine(
+                        model_size=model_size,
+                        device=options["device"],
+                        num_workers=workers if parallel else 1,
+                        compute_type=options["compute_type"],
+                        batch_size=options["batch_size"],
+                        word_timestamps=word_timestamps
+                    )
+                    engines.append(engine)
+                    return engine
+                
+                # In two-pass mode the large model is only loaded if the draft needs refining
+                stt_engine = None if use_two_pass else load_engine(options["model_size"])
+                try:
+                    if use_two_pass:
+                        preview_lines = []
+                        
+                        def on_draft(segment):
+                            minutes, seconds = divmod(int(segment["start"]), 60)
+                            preview_lines.append(f"[{minutes:02d}:{seconds:02d}] {segment['text']}")
+                            ctx.set_preview("\n".join(preview_lines))
+                        
+                        def load_refine_engine():
+                            ctx.update(message="🔍 신뢰도 낮은 구간 재변환 중...")
+                            return load_engine(options["model_size"])
+                        
+                        def refine_progress(current, total):
+                            ctx.update(message=f"🔍 신뢰도 낮은 구간 재변환 중... ({current}/{total})")
+                        
+                        segments = two_pass_transcribe(
+                            load_engine(options["draft_model"]),
+                            load_refine_engine,
+                            audio_path,
+                            language=language,
+                            threshold=refine_threshold,
+                            draft_callback=on_draft,
+                            draft_progress_callback=stt_progress,
+                            refine_progress_callback=refine_progress
+                        )
+                        manifest.complete_stt(segments)
+                    elif use_streaming:
+                        with audio_processor.open_audio_stream(video_path) as audio_stream:
+                            segments = stt_engine.transcribe_stream(
+                                audio_stream,
+                                language=language,
+                                chunk_size=chunk_size,
+                                overlap_size=overlap_size,
+                                max_workers=workers,
+                                progress_callback=stt_progress
+                            )
+                        manifest.complete_stt(segments)
+                    elif use_chunking:
+                        # VAD runs once per audio content; a re-run with another model reuses the speech map
+                        ctx.update(message="🔇 음성 구간 분석 중...")
+                        segments = checkpointed_transcribe(
+                            stt_engine,
+                            manifest,
+                            audio_path,
+                            language=language,
+                            chunked=True,
+                            chunk_size=chunk_size,
+                            overlap_size=overlap_size,
+                            max_workers=workers,
+                            progress_callback=stt_progress,
+                            vad_cache=SpeechMapCache(processing_config.get("vad_cache_dir", "cache/vad"))
+                        )
+                    else:
+                        # Sequential STT yields segments lazily: correct them while transcription continues
+                        segments, corrected_segments = transcribe_and_correct(
+                            stt_engine,
+                            llm_engine,
+                            audio_path,
+                            manifest=manifest,
+                            language=language,
+                            stt_progress_callback=stt_progress,
+                            progress_callback=llm_progress,
+                            segment_callback=on_corrected,
+                            concurrency=options["llm_concurrency"],
+                            glossary_only=options.get("glossary_only", False)
+                        )
+                finally:
+                    # Hand the models back to the shared pool so the next job reuses them
+                    for engine in engines:
+                        engine.close()
+        progress_state["stt"] = 1.0
+        
+        if corrected_segments is None:
+            with ctx.stage("llm"):
+                ctx.update(overall_progress(), "🤖 LLM 교정 중...")
+                corrected_segments = checkpointed_correct(
+                    llm_engine,
+                    manifest,
+                    segments,
+                    progress_callback=llm_progress,
+                    segment_callback=on_corrected,
+                    concurrency=options["llm_concurrency"],
+                    glossary_only=options.get("glossary_only", False)
+                )
+        result["cache_hits"] = correction_cache.stats()["hits"]
+        if postprocess_buffer:
+            postprocess_buffer.close()
+    except BaseException:
+        if exporter:
+            exporter.abort()
+        raise
+    finally:
+        if correction_cache:
+            correction_cache.close()
+    ctx.update(0.9)
+    
+    # 4. SRT Generation
+    ctx.update(message="💾 SRT 파일 저장 중...")
+    result["output_paths"] = exporter.finalize()
+    
+    if options["export_mp3"]:
+        with ctx.stage("extract"):
+            ctx.update(message="🎵 MP3 내보내는 중...")
+            mp3_path = audio_processor.extract_audio(video_path, audio_format="mp3")
+            shutil.copyfile(mp3_path, Path(output_path).with_suffix(".mp3"))
+    manifest.discard()
+    
+    ctx.update(1.0, "✅ 완료!")
+    result["output_path"] = output_path
+    return result
+
+JOB_STATE_LABELS = {"queued": "⏳ 대기", "running": "▶️ 실행 중", "done": "✅ 완료", "failed": "❌ 실패", "cancelled": "⏹️ 취소됨"}
+
+def render_job_result(job: dict):
+    """Preview and download of a finished job's subtitle files."""
+    if "output_path" not in job["result"]:
+        st.json(job["result"])
+        return
+    output_path = job["result"]["output_path"]
+    if not Path(output_path).exists():
+        st.warning(f"출력 파일을 찾을 수 없습니다: {output_path}")
+        return
+    
+    if job["result"].get("resumed"):
+        st.caption("⏯️ 이전 작업 체크포인트에서 이어서 처리했습니다.")
+    if job["result"].get("cache_hits"):
+        st.caption(f"⚡ 교정 캐시 적중: {job['result']['cache_hits']}개 배치")
+    st.success(f"자막 생성 완료: {output_path}")
+    
+    # Show result
+    with open(output_path, "r", encoding="utf-8") as f:
+        srt_content = f.read()
+    
+    st.text_area("자막 내용", value=srt_content, height=300, key=f"preview_{job['job_id']}")
+    
+    output_paths = job["result"].get("output_paths") or {Path(output_path).suffix.lstrip("."): output_path}
+    columns = st.columns(len(output_paths) + 1)
+    for column, (format_name, path) in zip(columns, output_paths.items()):
+        with column:
+            with open(path, "rb") as f:
+                st.download_button(
+                    label=f"{format_name.upper()} 다운로드",
+                    data=f,
+                    file_name=Path(path).name,
+                    mime="application/json" if format_name == "json" else "text/plain",
+                    key=f"download_{format_name}_{job['job_id']}"
+                )
+    with columns[-1]:
+        if st.button("출력 폴더 열기", key=f"open_{job['job_id']}"):
+            if sys.platform == "win32":
+                os.startfile(str(Path(output_path).parent))
+            else:
+                st.info(f"출력 폴더: {Path(output_path).parent}")
+
+def _render_jobs():
+    """Job table, polled from the shared executor."""
+    executor = get_executor()
+    jobs = executor.list_jobs()
+    if not jobs:
+        return
+    
+    st.subheader("작업 목록")
+    for job in reversed(jobs):
+        state_label = JOB_STATE_LABELS.get(job["state"], job["state"])
+        with st.expander(f"{state_label} · {job['label']}", expanded=job["state"] in ("queued", "running")):
+            if job["state"] in ("queued", "running"):
+                st.progress(job["progress"])
+                st.text(job["message"] or (job["stage"] or "대기 중..."))
+                if job["preview"]:
+                    st.text_area("진행 중 미리보기", value=job["preview"], height=200, disabled=True, key=f"draft_{job['job_id']}")
+                if st.button("작업 취소", key=f"cancel_{job['job_id']}"):
+                    executor.cancel(job["job_id"])
+                    st.toast("취소를 요청했습니다. 현재 단계가 끝나면 중지됩니다.", icon="⏹️")
+            elif job["state"] == "done":
+                render_job_result(job)
+            elif job["state"] == "failed":
+                st.error(f"작업 중 오류 발생: {job['error']}")
+            else:
+                st.info("작업이 취소되었습니다. 다시 시작하면 체크포인트에서 이어서 진행합니다.")
+
+# Re-run only the job table every 2 seconds where supported; older Streamlit gets a refresh button
+if hasattr(st, "fragment"):
+    render_jobs = st.fragment(run_every=2)(_render_jobs)
+else:
+    def render_jobs():
+        _render_jobs()
+        st.button("작업 상태 새로고침")
+
 def main():
     # Setup GPU paths
     add_nvidia_dll_path()
@@ -75,7 +430,24 @@ def main():
         # Model Settings
         st.subheader("모델 설정")
         model_size = st.selectbox("Whisper 모델 크기", ["base", "small", "medium", "large-v3"], index=3)
+        draft_model = st.selectbox(
+            "초안 모델 (빠른 미리보기)",
+            ["사용 안 함", "base", "small"],
+            index=0,
+            help="작은 모델로 먼저 변환해 작업 목록에 바로 보여주고, 신뢰도가 낮은 구간만 위 모델로 다시 변환합니다. (청크/스트리밍 처리를 끈 경우)"
+        )
         device = st.selectbox("디바이스", ["auto", "cuda", "cpu"], index=0)
+        compute_type = st.selectbox(
+            "연산 정밀도",
+            ["auto", "default", "int8", "int8_float16", "float16"],
+            index=0,
+            help="auto: 이 PC에서 튜닝된 설정을 사용합니다. 튜닝 전에는 CPU int8 / GPU int8_float16."
+        )
+        tuned = TuningStore().get(model_size, device)
+        if tuned:
+            st.caption(f"튜닝됨: {tuned['compute_type']}, 스레드 {tuned['cpu_threads']}, 작업자 {tuned['num_workers']}, 빔 {tuned['beam_size']} ({tuned['throughput']:.1f}x 실시간)")
+        else:
+            st.caption("이 PC에서 튜닝된 설정이 없습니다. 영상을 선택한 뒤 'STT 설정 튜닝'을 실행하세요.")
         
         # Output Settings
         st.subheader("출력 설정")
@@ -83,114 +455,143 @@ def main():
         # For portable app, maybe relative to exe or in Documents.
         default_output = str(project_root / "output")
         output_dir = st.text_input("출력 경로", value=default_output)
+        output_formats = st.multiselect(
+            "자막 형식",
+            sorted(FORMATS),
+            default=[name for name in load_config().get("output", {}).get("formats", ["srt"]) if name in FORMATS] or ["srt"],
+            help="선택한 형식을 한 번에 생성합니다. 첫 번째 형식이 미리보기에 표시됩니다."
+        )
+        use_postprocess = st.checkbox(
+            "자막 정리 (병합/분할/읽기 속도)",
+            value=load_config().get("postprocess", {}).get("enabled", True),
+            help="짧은 자막 병합, 긴 자막 분할, 초당 글자 수 제한, 겹침 제거를 적용합니다. 기준값은 config.yaml의 postprocess 항목입니다."
+        )
+        use_word_timestamps = st.checkbox(
+            "단어 단위 시간 맞춤",
+            value=load_config().get("stt", {}).get("word_timestamps", False),
+            help="단어별 타임스탬프를 함께 추출해, LLM이 교정한 문장의 시간을 실제 발화 위치에 다시 맞춥니다. STT가 약간 느려집니다."
+        )
+        export_mp3 = st.checkbox("MP3 오디오 함께 저장", value=False, help="추출한 오디오를 MP3로 출력 경로에 저장합니다.")
         
         # Advanced Settings
         with st.expander("고급 설정"):
-            chunk_size = st.number_input("청크 크기 (초)", value=300, step=10)
+            use_chunking = st.checkbox("청크 분할 병렬 처리", value=True, help="긴 영상을 청크로 나누어 여러 작업자가 동시에 변환합니다.")
+            chunk_size = st.number_input("청크 크기 (초)", value=300, min_value=30, step=10)
+            overlap_size = st.number_input("청크 중첩 (초)", value=5, min_value=0, max_value=60, step=1)
             workers = st.number_input("작업자 수", value=4, min_value=1, max_value=16)
+            batch_size = st.number_input(
+                "배치 추론 크기 (0 = 사용 안 함)",
+                value=0, min_value=0, max_value=64, step=4,
+                help="VAD로 찾은 음성 구간을 묶어 한 번에 디코딩합니다. 코어가 많은 CPU나 GPU에서 긴 파일이 빨라집니다."
+            )
+            use_streaming = st.checkbox("스트리밍 처리 (임시 오디오 파일 없음)", value=False, help="오디오 디코딩과 동시에 STT 변환을 시작합니다.")
+            
+            glossary_only = st.checkbox(
+                "용어집 치환만 적용 (LLM 호출 없음)",
+                value=False,
+                help="glossary.json의 오인식 단어 치환과 고유명사 표기 통일만 적용합니다. API Key 없이 동작합니다."
+            )
+            llm_concurrency = st.number_input("LLM 동시 요청 수", value=4, min_value=1, max_value=16)
+            llm_rpm = st.number_input("LLM 분당 요청 제한 (0 = 제한 없음)", value=0, min_value=0, step=5)
+            llm_tpm = st.number_input("LLM 분당 토큰 제한 (0 = 제한 없음)", value=0, min_value=0, step=10000)
+            
+            model_pool = get_model_pool()
+            loaded_models = model_pool.stats()
+            st.caption(f"로드된 Whisper 모델: {len(loaded_models)}개")
+            if st.button("사용하지 않는 모델 해제"):
+                released = model_pool.clear()
+                st.toast(f"모델 {released}개 해제", icon="🧹")
 
     # Main Content
-    uploaded_file = st.file_uploader("영상 파일을 업로드하세요", type=["mp4", "mkv", "avi", "mov", "webm"])
-    
-    if uploaded_file:
-        # Validate size (4GB limit)
-        MAX_SIZE_MB = 4096
-        if uploaded_file.size > MAX_SIZE_MB * 1024 * 1024:
-            st.error(f"파일 크기가 너무 큽니다. (최대 {MAX_SIZE_MB}MB)")
-            return
-
-        # Save to temp
-        temp_dir = Path("temp")
-        temp_dir.mkdir(exist_ok=True)
-        temp_path = temp_dir / uploaded_file.name
-        
-        try:
-            with open(temp_path, "wb") as f:
-                f.write(uploaded_file.getbuffer())
-            st.toast(f"파일 준비 완료: {uploaded_file.name}", icon="✅")
-        except Exception as e:
-            st.error(f"파일 저장 중 오류 발생: {e}")
-            return
+    input_mode = st.radio(
+        "입력 방식",
+        ["파일 업로드", "로컬 경로"],
+        horizontal=True,
+        help="로컬 경로는 영상을 temp로 복사하지 않고 원본 위치(로컬 디스크/네트워크 공유)에서 FFmpeg가 바로 읽습니다."
+    )
+    video_path = None
+    
+    if input_mode == "파일 업로드":
+        uploaded_file = st.file_uploader("영상 파일을 업로드하세요", type=["mp4", "mkv", "avi", "mov", "webm"])
         
+        if uploaded_file:
+            # Validate size (4GB limit)
+            MAX_SIZE_MB = 4096
+            if uploaded_file.size > MAX_SIZE_MB * 1024 * 1024:
+                st.error(f"파일 크기가 너무 큽니다. (최대 {MAX_SIZE_MB}MB)")
+                return
+
+            # Save to temp
+            temp_dir = Path("temp")
+            temp_dir.mkdir(exist_ok=True)
+            temp_path = temp_dir / uploaded_file.name
+            
+            try:
+                if stage_upload(uploaded_file, temp_path):
+                    st.toast(f"파일 준비 완료: {uploaded_file.name}", icon="✅")
+            except Exception as e:
+                st.error(f"파일 저장 중 오류 발생: {e}")
+                return
+            video_path = temp_path
+    else:
+        local_path = st.text_input("영상 파일 또는 폴더 경로", placeholder=r"예: D:\videos\lecture.mp4 또는 \\nas\share\videos")
+        if local_path:
+            path = Path(local_path.strip().strip('"')).expanduser()
+            if path.is_dir():
+                # Re-listed on every rerun, so files added to the folder show up here
+                videos = collect_video_files([path])
+                if videos:
+                    video_path = Path(st.selectbox("영상 선택", videos, format_func=lambda p: Path(p).name))
+                else:
+                    st.warning("폴더에 지원되는 영상 파일이 없습니다.")
+            elif path.is_file():
+                video_path = path
+            else:
+                st.error(f"경로를 찾을 수 없습니다: {path}")
+    
+    if video_path:
         if st.button("자막 생성 시작", type="primary"):
-            if not api_key:
-                st.error("API Key가 필요합니다.")
+            if not api_key and not glossary_only:
+                st.error("API Key가 필요합니다. (또는 고급 설정에서 '용어집 치환만 적용' 선택)")
             else:
-                st.success("작업을 시작합니다...")
-                
-                progress_bar = st.progress(0)
-                status_text = st.empty()
-                
-                try:
-                    # 1. Audio Extraction
-                    status_text.text("🔊 오디오 추출 중...")
-                    audio_processor = AudioProcessor(temp_dir="temp")
-                    audio_path = audio_processor.extract_audio(str(temp_path))
-                    progress_bar.progress(10)
-                    
-                    # 2. STT
-                    status_text.text("📝 STT 변환 중...")
-                    stt_engine = STTEngine(model_size=model_size, device=device)
-                    
-                    def stt_progress(current, total):
-                        # Map 10-50%
-                        if total > 0:
-                            progress = 10 + int((current / total) * 40)
-                            progress_bar.progress(min(progress, 50))
-                            status_text.text(f"📝 STT 변환 중... ({int(current)}s / {int(total)}s)")
-                        
-                    segments = stt_engine.transcribe(audio_path, progress_callback=stt_progress)
-                    progress_bar.progress(50)
-                    
-                    # 3. LLM Correction
-                    status_text.text("🤖 LLM 교정 중...")
-                    llm_engine = LLMEngine(api_key=api_key)
-                    
-                    def llm_progress(current, total):
-                        # Map 50-90%
-                        if total > 0:
-                            progress = 50 + int((current / total) * 40)
-                            progress_bar.progress(min(progress, 90))
-                            status_text.text(f"🤖 LLM 교정 중... ({current}/{total} 세그먼트)")
-                        
-                    corrected_segments = llm_engine.correct_subtitles(segments, progress_callback=llm_progress)
-                    progress_bar.progress(90)
-                    
-                    # 4. SRT Generation
-                    status_text.text("💾 SRT 파일 생성 중...")
-                    output_path = SRTGenerator.generate_output_filename(str(temp_path), output_dir)
-                    SRTGenerator.generate_srt(corrected_segments, output_path)
-                    progress_bar.progress(100)
-                    
-                    status_text.text("✅ 완료!")
-                    st.success(f"자막 생성 완료: {output_path}")
-                    
-                    # Show result
-                    with open(output_path, "r", encoding="utf-8") as f:
-                        srt_content = f.read()
-                    
-                    st.subheader("결과 미리보기")
-                    st.text_area("자막 내용", value=srt_content, height=300)
-                    
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        with open(output_path, "rb") as f:
-                            st.download_button(
-                                label="SRT 다운로드",
-                                data=f,
-                                file_name=Path(output_path).name,
-                                mime="text/plain"
-                            )
-                    with col2:
-                        if st.button("출력 폴더 열기"):
-                            if sys.platform == "win32":
-                                os.startfile(str(Path(output_path).parent))
-                            else:
-                                st.info(f"출력 폴더: {Path(output_path).parent}")
-
-                except Exception as e:
-                    st.error(f"작업 중 오류 발생: {e}")
-                    logger.error(f"Processing error: {e}", exc_info=True)
+                options = {
+                    "api_key": api_key,
+                    "model_size": model_size,
+                    "device": device,
+                    "compute_type": compute_type,
+                    "batch_size": batch_size,
+                    "draft_model": None if draft_model == "사용 안 함" else draft_model,
+                    "output_dir": output_dir,
+                    "formats": output_formats,
+                    "postprocess": use_postprocess,
+                    "word_timestamps": use_word_timestamps,
+                    "export_mp3": export_mp3,
+                    "use_chunking": use_chunking,
+                    "chunk_size": chunk_size,
+                    "overlap_size": overlap_size,
+                    "workers": workers,
+                    "use_streaming": use_streaming,
+                    "llm_concurrency": llm_concurrency,
+                    "glossary_only": glossary_only,
+                    "llm_rpm": llm_rpm,
+                    "llm_tpm": llm_tpm,
+                }
+                job_path = str(video_path)
+                get_executor().submit(lambda ctx: run_subtitle_job(ctx, job_path, options), label=Path(job_path).name)
+                st.toast("작업을 대기열에 추가했습니다.", icon="📥")
+    
+        if st.button("STT 설정 튜닝", help="이 영상의 앞 30초로 연산 정밀도/스레드/작업자/빔 크기 조합을 측정해 가장 빠른 설정을 저장합니다."):
+            tune_path = str(video_path)
+            
+            def tune_job(ctx):
+                with ctx.stage("stt"):
+                    ctx.update(0.0, "⏱️ STT 설정 측정 중... (후보별로 모델을 불러오므로 몇 분 걸릴 수 있습니다)")
+                    clip = AudioProcessor(temp_dir="temp").read_clip(tune_path, CLIP_SECONDS)
+                    return autotune(model_size, clip, device=device)
+            
+            get_executor().submit(tune_job, label=f"STT 튜닝 · {model_size}")
+    
+    render_jobs()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,48 @@
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import yaml
+
+from src.utils.resource_resolver import get_resource_path
+
+logger = logging.getLogger(__name__)
+
+
+def _deep_merge(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+    """Recursively merge `override` into a copy of `base`."""
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _deep_merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def load_config(custom_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Load the default config.yaml, optionally overridden by a user config file.
+
+    Args:
+        custom_path: Path to a user config (e.g. custom_config.yaml) whose
+            values override the defaults.
+
+    Returns:
+        Config dictionary.
+    """
+    config: Dict[str, Any] = {}
+    default_path = get_resource_path("config.yaml")
+    if default_path.exists():
+        config = yaml.safe_load(default_path.read_text(encoding="utf-8")) or {}
+    else:
+        logger.warning(f"Default config not found: {default_path}")
+
+    if custom_path:
+        path = Path(custom_path)
+        if path.exists():
+            config = _deep_merge(config, yaml.safe_load(path.read_text(encoding="utf-8")) or {})
+        else:
+            logger.warning(f"Custom config not found: {path}")
+
+    return config
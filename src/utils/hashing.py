@@ -0,0 +1,155 @@
+import os
+import hashlib
+import threading
+from pathlib import Path
+from typing import BinaryIO, Dict, Tuple
+
+HASH_CHUNK_SIZE = 1024 * 1024  # 1 MB
+FINGERPRINT_SAMPLES = 4  # Evenly spaced chunks read by `fingerprint_file`
+
+# Memoized file digests keyed by (path, size, mtime) so unchanged files are hashed once per process
+_digest_cache: Dict[Tuple[str, int, int], str] = {}
+_fingerprint_cache: Dict[Tuple[str, int, int], str] = {}
+_digest_lock = threading.Lock()
+
+
+def new_hasher():
+    """Create the hash object used for content addressing."""
+    return hashlib.blake2b(digest_size=32)
+
+
+def hash_file(file_path: str, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """
+    Compute the content hash of a file, reading it in chunks.
+    
+    Args:
+        file_path: Path to the file.
+        chunk_size: Number of bytes read per iteration.
+        
+    Returns:
+        Hex digest of the file content.
+    """
+    path = Path(file_path).resolve()
+    stat = path.stat()
+    cache_key = (str(path), stat.st_size, stat.st_mtime_ns)
+
+    with _digest_lock:
+        cached = _digest_cache.get(cache_key)
+    if cached:
+        return cached
+
+    with open(path, "rb") as f:
+        digest = hash_stream(f, chunk_size)
+
+    with _digest_lock:
+        _digest_cache[cache_key] = digest
+    return digest
+
+
+def fingerprint_file(file_path: str, chunk_size: int = HASH_CHUNK_SIZE,
+                     samples: int = FINGERPRINT_SAMPLES) -> str:
+    """
+    Compute a cheap content fingerprint of a file from its size and a few sampled chunks.
+    
+    Only `samples` chunks (always including the head and the tail) are read,
+    so a multi-GB video on a network share costs a few MB of I/O instead of
+    a full extra read before FFmpeg starts. Small files are hashed in full.
+    Copies of the same file get the same fingerprint.
+    
+    Args:
+        file_path: Path to the file.
+        chunk_size: Number of bytes read per sample.
+        samples: Number of evenly spaced samples.
+        
+    Returns:
+        Hex fingerprint of the file.
+    """
+    path = Path(file_path).resolve()
+    stat = path.stat()
+    cache_key = (str(path), stat.st_size, stat.st_mtime_ns)
+
+    with _digest_lock:
+        cached = _fingerprint_cache.get(cache_key)
+    if cached:
+        return cached
+
+    size = stat.st_size
+    hasher = new_hasher()
+    hasher.update(size.to_bytes(8, "little"))
+    with open(path, "rb") as f:
+        if size <= chunk_size * samples:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                hasher.update(chunk)
+        else:
+            last = size - chunk_size
+            for index in range(samples):
+                f.seek(last * index // (samples - 1))
+                hasher.update(f.read(chunk_size))
+    fingerprint = hasher.hexdigest()
+
+    with _digest_lock:
+        _fingerprint_cache[cache_key] = fingerprint
+    return fingerprint
+
+
+def hash_stream(stream: BinaryIO, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """
+    Compute the content hash of a binary stream from its current position, in chunks.
+    
+    Args:
+        stream: Readable binary file-like object.
+        chunk_size: Number of bytes read per iteration.
+        
+    Returns:
+        Hex digest of the remaining content.
+    """
+    hasher = new_hasher()
+    for chunk in iter(lambda: stream.read(chunk_size), b""):
+        hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def copy_stream_hashed(stream: BinaryIO, dest_path: str, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """
+    Copy a binary stream to a file in chunks, hashing the content on the way.
+    
+    The data is written to a `.partial` file that replaces `dest_path` only
+    when complete, and the digest is memoized for `hash_file`, so the copy
+    is never re-read just to hash it.
+    
+    Args:
+        stream: Readable binary file-like object.
+        dest_path: Destination file path.
+        chunk_size: Number of bytes copied per iteration.
+        
+    Returns:
+        Hex digest of the copied content.
+    """
+    dest = Path(dest_path).resolve()
+    partial = dest.with_name(dest.name + ".partial")
+    hasher = new_hasher()
+    try:
+        with open(partial, "wb") as f:
+            for chunk in iter(lambda: stream.read(chunk_size), b""):
+                hasher.update(chunk)
+                f.write(chunk)
+        os.replace(partial, dest)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+
+    digest = hasher.hexdigest()
+    stat = dest.stat()
+    with _digest_lock:
+        _digest_cache[(str(dest), stat.st_size, stat.st_mtime_ns)] = digest
+    return digest
+
+
+def hash_text(*parts: str) -> str:
+    """Compute a hash over several strings (separated so boundaries matter)."""
+    hasher = new_hasher()
+    for part in parts:
+        data = part.encode("utf-8")
+        hasher.update(len(data).to_bytes(8, "little"))
+        hasher.update(data)
+    return hasher.hexdigest()
@@ -0,0 +1,41 @@
+import time
+from src.core.alignment import align_segments, retime_segment
+
+def seg(words, starts, ends, text=None):
+    return {
+        "start": starts[0] - 0.5, "end": ends[-1] + 0.5, "text": text or " ".join(words), "confidence": -0.2,
+        "words": words, "word_starts": starts, "word_ends": ends,
+    }
+
+def test_unchanged_text_is_trimmed_to_its_words():
+    segment = seg(["안녕하세요", "여러분"], [1.0, 1.8], [1.6, 2.4])
+    result = retime_segment(segment)
+    
+    assert (result["start"], result["end"]) == (1.0, 2.4)
+    assert result["word_starts"] == [1.0, 1.8] and result["word_ends"] == [1.6, 2.4]
+
+def test_corrected_text_maps_onto_spoken_words():
+    # Whisper heard filler words at both ends; the correction dropped them and fixed a spelling
+    segment = seg(["음", "오늘은", "날씨가", "조네요", "그"], [0.0, 1.0, 2.0, 3.0, 5.0], [0.5, 1.8, 2.8, 3.8, 5.4],
+                  text="오늘은 날씨가 좋네요.")
+    result = retime_segment(segment)
+    
+    assert (result["start"], result["end"]) == (1.0, 3.8)
+    assert result["words"] == ["오늘은", "날씨가", "좋네요."]
+    assert result["word_starts"] == [1.0, 2.0, 3.0]
+    
+    # Segments without word timings are passed through
+    plain = {"start": 0.0, "end": 1.0, "text": "텍스트"}
+    assert retime_segment(plain) is plain
+
+def test_alignment_scales_linearly():
+    segments = [
+        seg(["첫", "번째", "문장입니다", str(i)], [i * 4.0, i * 4.0 + 0.5, i * 4.0 + 1.0, i * 4.0 + 2.5],
+            [i * 4.0 + 0.4, i * 4.0 + 0.9, i * 4.0 + 2.4, i * 4.0 + 3.0], text=f"첫번째 문장이에요 {i}번")
+        for i in range(5000)
+    ]
+    began = time.perf_counter()
+    result = align_segments(segments)
+    
+    assert time.perf_counter() - began < 5.0
+    assert result[-1]["start"] == 4999 * 4.0
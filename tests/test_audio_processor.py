@@ -1,27 +1,64 @@
+import os
 import pytest
 from unittest.mock import patch, MagicMock
 from pathlib import Path
 from src.core.audio_processor import AudioProcessor
+from src.core.audio_cache import AudioCache
 
 @pytest.fixture
 def audio_processor(tmp_path):
     return AudioProcessor(temp_dir=str(tmp_path))
 
-def test_validate_video_file(audio_processor, tmp_path):
+AUDIO_PROBE = {"format": {"duration": "12.5"}, "streams": [{"codec_type": "video"}, {"codec_type": "audio"}]}
+
+@patch("src.core.audio_processor.ffmpeg.probe")
+def test_validate_video_file(mock_probe, audio_processor, tmp_path):
     # Create dummy video file
     video_file = tmp_path / "test.mp4"
     video_file.touch()
     
+    mock_probe.return_value = AUDIO_PROBE
     assert audio_processor.validate_video_file(str(video_file)) is True
     
-    # Test invalid extension
+    # Container is probed, so the extension doesn't matter
+    ts_file = tmp_path / "capture.ts"
+    ts_file.touch()
+    assert audio_processor.validate_video_file(str(ts_file)) is True
+    
+    # No audio stream
+    silent_file = tmp_path / "silent.mp4"
+    silent_file.touch()
+    mock_probe.return_value = {"format": {}, "streams": [{"codec_type": "video"}]}
+    assert audio_processor.validate_video_file(str(silent_file)) is False
+    
+    # Not a media file
+    import ffmpeg
     txt_file = tmp_path / "test.txt"
     txt_file.touch()
+    mock_probe.side_effect = ffmpeg.Error("ffprobe", b"", b"Invalid data found")
     assert audio_processor.validate_video_file(str(txt_file)) is False
     
     # Test non-existent file
     assert audio_processor.validate_video_file(str(tmp_path / "missing.mp4")) is False
 
+@patch("src.core.audio_processor.ffmpeg.probe", side_effect=FileNotFoundError("ffprobe"))
+def test_validate_video_file_without_ffprobe(mock_probe, audio_processor, tmp_path):
+    video_file = tmp_path / "test.mp4"
+    video_file.touch()
+    txt_file = tmp_path / "test.txt"
+    txt_file.touch()
+    
+    # Falls back to the extension check
+    assert audio_processor.validate_video_file(str(video_file)) is True
+    assert audio_processor.validate_video_file(str(txt_file)) is False
+
+def fake_ffmpeg_run(mock_ffmpeg):
+    """Make the mocked ffmpeg.run write the requested output file."""
+    def run(stream, **kwargs):
+        output_path = mock_ffmpeg.output.call_args.args[1]
+        Path(output_path).write_bytes(b"audio")
+    return run
+
 @patch("src.core.audio_processor.ffmpeg")
 def test_extract_audio(mock_ffmpeg, audio_processor, tmp_path):
     video_file = tmp_path / "test.mp4"
@@ -31,12 +68,97 @@ def test_extract_audio(mock_ffmpeg, audio_processor, tmp_path):
     mock_stream = MagicMock()
     mock_ffmpeg.input.return_value = mock_stream
     mock_stream.output.return_value = mock_stream
+    mock_ffmpeg.run.side_effect = fake_ffmpeg_run(mock_ffmpeg)
+    mock_ffmpeg.probe.return_value = AUDIO_PROBE
     
     output_path = audio_processor.extract_audio(str(video_file))
     
-    assert output_path.endswith(".mp3")
+    assert output_path.endswith(".wav")
     assert Path(output_path).parent == audio_processor.temp_dir
     
     # Verify ffmpeg calls
     mock_ffmpeg.input.assert_called_with(str(video_file))
     mock_ffmpeg.run.assert_called_once()
+    
+    # STT path: 16 kHz mono PCM, no video
+    output_kwargs = mock_ffmpeg.output.call_args.kwargs
+    assert output_kwargs["acodec"] == "pcm_s16le"
+    assert output_kwargs["ar"] == 16000
+    assert output_kwargs["ac"] == 1
+
+@patch("src.core.audio_processor.ffmpeg")
+def test_extract_audio_mp3_export(mock_ffmpeg, audio_processor, tmp_path):
+    video_file = tmp_path / "test.mp4"
+    video_file.touch()
+    mock_ffmpeg.run.side_effect = fake_ffmpeg_run(mock_ffmpeg)
+    mock_ffmpeg.probe.return_value = AUDIO_PROBE
+    
+    wav_path = audio_processor.extract_audio(str(video_file))
+    mp3_path = audio_processor.extract_audio(str(video_file), audio_format="mp3")
+    
+    assert mp3_path.endswith(".mp3")
+    assert mp3_path != wav_path
+    assert mock_ffmpeg.output.call_args.kwargs["acodec"] == "libmp3lame"
+    
+    with pytest.raises(ValueError):
+        audio_processor.extract_audio(str(video_file), audio_format="flac")
+
+@patch("src.core.audio_processor.ffmpeg")
+def test_extract_audio_uses_content_cache(mock_ffmpeg, audio_processor, tmp_path):
+    mock_ffmpeg.run.side_effect = fake_ffmpeg_run(mock_ffmpeg)
+    mock_ffmpeg.probe.return_value = AUDIO_PROBE
+    
+    first = tmp_path / "a" / "lecture.mp4"
+    second = tmp_path / "b" / "lecture.mp4"
+    copy = tmp_path / "copy.mp4"
+    for path, content in ((first, b"video-1"), (second, b"video-2"), (copy, b"video-1")):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+    
+    first_audio = audio_processor.extract_audio(str(first))
+    second_audio = audio_processor.extract_audio(str(second))
+    copy_audio = audio_processor.extract_audio(str(copy))
+    
+    # Same name, different content -> different outputs; same content -> cache hit
+    assert first_audio != second_audio
+    assert copy_audio == first_audio
+    assert mock_ffmpeg.run.call_count == 2
+    assert not list(Path(audio_processor.temp_dir).glob("*.partial*"))
+
+@patch("src.core.audio_processor.ffmpeg")
+def test_read_clip_decodes_only_the_clip(mock_ffmpeg, audio_processor, tmp_path):
+    import io
+    import numpy as np
+    video_file = tmp_path / "long.mp4"
+    video_file.touch()
+    mock_ffmpeg.probe.return_value = AUDIO_PROBE
+    # FFmpeg stops after `-t`, so the pipe holds just the clip
+    process = MagicMock(stdout=io.BytesIO(np.ones(2 * 16000, dtype="<f4").tobytes()), stderr=None)
+    process.wait.return_value = 0
+    process.poll.return_value = 0
+    mock_ffmpeg.run_async.return_value = process
+    
+    clip = audio_processor.read_clip(str(video_file), 2)
+    
+    assert len(clip) == 2 * 16000
+    assert mock_ffmpeg.output.call_args.kwargs["t"] == 2
+    mock_ffmpeg.run.assert_not_called()
+
+def test_audio_cache_evicts_least_recently_used(tmp_path):
+    cache = AudioCache(str(tmp_path), max_size_mb=10 / (1024 * 1024))  # 10 bytes
+    
+    keys = ["a" * 64, "b" * 64, "c" * 64]
+    for key in keys[:2]:
+        cache.partial_path(key, ".mp3").write_bytes(b"12345")
+        cache.commit(key, ".mp3")
+    
+    # Touch the oldest entry so the other one becomes least recently used
+    os.utime(cache.entry_path(keys[1], ".mp3"), (1, 1))
+    assert cache.get(keys[0], ".mp3") is not None
+    
+    cache.partial_path(keys[2], ".mp3").write_bytes(b"12345")
+    cache.commit(keys[2], ".mp3")
+    
+    assert cache.get(keys[0], ".mp3") is not None
+    assert cache.get(keys[1], ".mp3") is None
+    assert cache.get(keys[2], ".mp3") is not None
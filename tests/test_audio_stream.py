@@ -0,0 +1,50 @@
+import io
+import threading
+import pytest
+import numpy as np
+from src.core.audio_stream import PCMRingBuffer, AudioStream
+from src.core.chunking import plan_chunks
+
+def test_ring_buffer_wraps_and_applies_backpressure():
+    buffer = PCMRingBuffer(4)
+    data = np.arange(10, dtype=np.float32)
+    
+    writer = threading.Thread(target=lambda: (buffer.write(data), buffer.finish()))
+    writer.start()
+    
+    received = []
+    while True:
+        piece = buffer.read(3)
+        if len(piece) == 0:
+            break
+        assert len(piece) <= 3
+        received.append(piece)
+    writer.join(timeout=5)
+    
+    np.testing.assert_array_equal(np.concatenate(received), data)
+
+def test_ring_buffer_propagates_producer_error():
+    buffer = PCMRingBuffer(4)
+    buffer.finish(RuntimeError("ffmpeg failed"))
+    with pytest.raises(RuntimeError):
+        buffer.read(1)
+
+def test_ring_buffer_close_unblocks_writer():
+    buffer = PCMRingBuffer(2)
+    result = []
+    writer = threading.Thread(target=lambda: result.append(buffer.write(np.zeros(10, dtype=np.float32))))
+    writer.start()
+    buffer.close()
+    writer.join(timeout=5)
+    assert result == [False]
+
+@pytest.mark.parametrize("duration", [12, 11, 3])
+def test_stream_windows_match_plan(duration):
+    sample_rate = 10
+    samples = np.arange(duration * sample_rate, dtype="<f4")
+    stream = AudioStream(io.BytesIO(samples.tobytes()), sample_rate=sample_rate, buffer_seconds=2)
+    
+    windows = [(start, len(window) / sample_rate + start) for start, window in stream.windows(5, 1)]
+    stream.close()
+    
+    assert windows == plan_chunks(duration, 5, 1)
@@ -0,0 +1,167 @@
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock
+from src.core.pipeline import BatchPipeline, stt_checkpoint_settings
+from src.cli import collect_video_files
+
+def make_pipeline(tmp_path, **kwargs):
+    audio_processor = MagicMock()
+    audio_processor.extract_audio.side_effect = lambda path: path + ".wav"
+    
+    stt_engine = MagicMock()
+    stt_engine.transcribe.side_effect = lambda audio_path, language: [
+        {"start": 0.0, "end": 1.0, "text": Path(audio_path).stem, "confidence": -0.1}
+    ]
+    
+    llm_engine = MagicMock()
+    llm_engine.correct_subtitles.side_effect = lambda segments, **kwargs: [dict(seg, text=seg["text"].upper()) for seg in segments]
+    
+    pipeline = BatchPipeline(audio_processor, stt_engine, output_dir=str(tmp_path / "out"), llm_engine=llm_engine, **kwargs)
+    return pipeline, audio_processor, stt_engine, llm_engine
+
+def test_batch_pipeline_processes_all_files(tmp_path):
+    pipeline, _, _, llm_engine = make_pipeline(tmp_path, llm_options={"concurrency": 3})
+    
+    jobs = pipeline.run(["a.mp4", "b.mp4", "c.mp4"])
+    
+    assert [job.video_path for job in jobs] == ["a.mp4", "b.mp4", "c.mp4"]
+    assert all(job.succeeded for job in jobs)
+    assert set(jobs[0].timings) == {"extract", "transcribe", "correct", "write"}
+    assert "A.MP4" in Path(jobs[0].output_path).read_text(encoding="utf-8")
+    assert llm_engine.correct_subtitles.call_args.kwargs == {"concurrency": 3}
+
+def test_batch_pipeline_overlaps_stages(tmp_path):
+    pipeline, audio_processor, stt_engine, _ = make_pipeline(tmp_path)
+    second_extraction_started = threading.Event()
+    
+    def extract(path):
+        if path == "b.mp4":
+            second_extraction_started.set()
+        return path + ".wav"
+    
+    def transcribe(audio_path, language):
+        # File a is transcribed while file b is being extracted
+        if audio_path == "a.mp4.wav":
+            assert second_extraction_started.wait(timeout=5)
+        return [{"start": 0.0, "end": 1.0, "text": "x", "confidence": -0.1}]
+    
+    audio_processor.extract_audio.side_effect = extract
+    stt_engine.transcribe.side_effect = transcribe
+    
+    jobs = pipeline.run(["a.mp4", "b.mp4"])
+    assert all(job.succeeded for job in jobs)
+
+def test_batch_pipeline_isolates_failures(tmp_path):
+    pipeline, audio_processor, _, llm_engine = make_pipeline(tmp_path)
+    
+    def extract(path):
+        if path == "bad.mp4":
+            raise RuntimeError("bad file")
+        return path + ".wav"
+    
+    audio_processor.extract_audio.side_effect = extract
+    
+    jobs = pipeline.run(["bad.mp4", "good.mp4"])
+    
+    assert jobs[0].stage == "failed" and str(jobs[0].error) == "bad file"
+    assert jobs[1].succeeded
+    assert llm_engine.correct_subtitles.call_count == 1
+
+def test_collect_video_files(tmp_path):
+    (tmp_path / "sub").mkdir()
+    for name in ["a.mp4", "b.MKV", "notes.txt", "sub/c.webm"]:
+        (tmp_path / name).touch()
+    
+    assert [Path(p).name for p in collect_video_files([tmp_path])] == ["a.mp4", "b.MKV"]
+    assert [Path(p).name for p in collect_video_files([tmp_path, tmp_path / "a.mp4"], recursive=True)] == ["a.mp4", "b.MKV", "c.webm"]
+
+def test_batch_pipeline_streams_segments_into_llm(tmp_path):
+    pipeline, _, stt_engine, llm_engine = make_pipeline(tmp_path, stream_llm=True)
+    stt_engine.iter_transcribe.side_effect = lambda audio_path, **kwargs: iter(
+        [{"start": 0.0, "end": 1.0, "text": Path(audio_path).stem, "confidence": -0.1}]
+    )
+    
+    jobs = pipeline.run(["a.mp4"])
+    
+    assert jobs[0].succeeded
+    assert set(jobs[0].timings) == {"extract", "transcribe", "write"}
+    assert "A.MP4" in Path(jobs[0].output_path).read_text(encoding="utf-8")
+    stt_engine.transcribe.assert_not_called()
+
+def test_folder_watcher_reports_files_once_stable(tmp_path):
+    from src.core.pipeline import FolderWatcher
+    
+    (tmp_path / "old.mp4").write_bytes(b"old")
+    watcher = FolderWatcher([tmp_path], known=[str(tmp_path / "old.mp4")])
+    
+    new_file = tmp_path / "new.mp4"
+    new_file.write_bytes(b"part")
+    assert watcher.poll() == []
+    
+    # Still growing -> not ready yet
+    new_file.write_bytes(b"partial copy")
+    assert watcher.poll() == []
+    
+    assert watcher.poll() == [str(new_file)]
+    assert watcher.poll() == []
+
+def test_batch_pipeline_passes_vad_cache_to_chunked_stt(tmp_path):
+    vad_cache = MagicMock()
+    vad_cache.load_or_compute.side_effect = lambda audio_path, audio=None: [] if audio_path == "silent.mp4.wav" else [{"start": 2.0, "end": 4.0}]
+    pipeline, _, stt_engine, _ = make_pipeline(tmp_path, chunked=True, vad_cache=vad_cache)
+    stt_engine.transcribe_chunked.side_effect = lambda audio_path, vad_cache, **kwargs: [
+        {"start": interval["start"], "end": interval["end"], "text": "x", "confidence": -0.1}
+        for interval in vad_cache.load_or_compute(audio_path, audio="decoded")
+    ]
+    
+    jobs = pipeline.run(["talk.mp4", "silent.mp4"])
+    
+    assert all(job.succeeded for job in jobs)
+    # No separate VAD stage: the transcriber runs VAD on the samples it decodes
+    assert set(jobs[0].timings) == {"extract", "transcribe", "correct", "write"}
+    assert jobs[0].segments[0]["start"] == 2.0
+    assert jobs[1].segments == []
+
+def test_batch_pipeline_two_pass_uses_draft_engine(tmp_path):
+    draft_engine = MagicMock()
+    draft_engine.iter_transcribe.side_effect = lambda audio_path, **kwargs: iter([
+        {"start": 0.0, "end": 1.0, "text": "draft", "confidence": -0.1}
+    ])
+    pipeline, _, stt_engine, _ = make_pipeline(tmp_path, draft_engine=draft_engine, stream_llm=True)
+    
+    jobs = pipeline.run(["a.mp4"])
+    
+    assert jobs[0].succeeded
+    assert set(jobs[0].timings) == {"extract", "transcribe", "correct", "write"}
+    assert jobs[0].segments[0]["text"] == "DRAFT"
+    stt_engine.transcribe.assert_not_called()
+    stt_engine.transcribe_clip.assert_not_called()
+
+def test_batch_pipeline_writes_all_output_formats(tmp_path):
+    pipeline, _, _, _ = make_pipeline(tmp_path, output_formats=["srt", "vtt"])
+    
+    jobs = pipeline.run(["a.mp4"])
+    
+    assert jobs[0].output_path.endswith(".srt")
+    assert sorted(jobs[0].output_paths) == ["srt", "vtt"]
+    assert Path(jobs[0].output_paths["vtt"]).read_text(encoding="utf-8").startswith("WEBVTT")
+
+def test_checkpoint_settings_separate_modes():
+    sequential = stt_checkpoint_settings("large-v3", "ko")
+    
+    assert stt_checkpoint_settings("large-v3", "ko", streaming=True) != sequential
+    assert stt_checkpoint_settings("large-v3", "en") != sequential
+    assert (stt_checkpoint_settings("large-v3", "ko", draft_model="base", refine_threshold=-0.5)
+            != stt_checkpoint_settings("large-v3", "ko", draft_model="base", refine_threshold=-0.7))
+
+def test_watch_requires_a_folder(tmp_path, monkeypatch):
+    from typer.testing import CliRunner
+    from src.cli import app
+    
+    video = tmp_path / "a.mp4"
+    video.touch()
+    monkeypatch.chdir(tmp_path)
+    result = CliRunner().invoke(app, [str(video), "--watch", "--no-llm"])
+    
+    assert result.exit_code == 1
+    assert "폴더 감시 중" not in result.output
@@ -0,0 +1,35 @@
+import pytest
+from src.core.chunking import plan_chunks, stitch_segments
+
+def test_plan_chunks():
+    assert plan_chunks(12, 5, 1) == [(0.0, 6.0), (5.0, 11.0), (10.0, 12)]
+    assert plan_chunks(3, 5, 1) == [(0.0, 3)]
+    assert plan_chunks(0, 5, 1) == []
+
+    with pytest.raises(ValueError):
+        plan_chunks(10, 0, 1)
+
+def test_stitch_segments_drops_overlap_duplicates():
+    # Window 0: [0, 12], window 1: [10, 20] -> cut point at 11s
+    chunk_0 = [
+        {"start": 0.0, "end": 4.0, "text": "first"},
+        {"start": 9.5, "end": 11.8, "text": "shared"},
+    ]
+    chunk_1 = [
+        {"start": 10.0, "end": 11.8, "text": "hared"},
+        {"start": 12.0, "end": 15.0, "text": "second"},
+    ]
+    
+    # Order of completion must not matter
+    result = stitch_segments([(10.0, 20.0, chunk_1), (0.0, 12.0, chunk_0)], overlap_size=2)
+    
+    assert [seg["text"] for seg in result] == ["first", "shared", "second"]
+
+def test_stitch_segments_drops_same_text_overlap():
+    chunk_0 = [{"start": 10.0, "end": 11.9, "text": "Hello world"}]
+    chunk_1 = [{"start": 10.2, "end": 12.5, "text": "hello  world"}]
+    
+    result = stitch_segments([(0.0, 12.0, chunk_0), (10.0, 20.0, chunk_1)], overlap_size=2)
+    
+    assert len(result) == 1
+    assert result[0]["start"] == 10.0
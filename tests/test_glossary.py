@@ -0,0 +1,41 @@
+import os
+import json
+import random
+from src.core.glossary import AhoCorasick, Glossary, load_glossary
+
+GLOSSARY = {"preserve": ["YouTube", "API", "ChatGPT"], "replacements": {"레디": "준비", "쳇지피티": "ChatGPT"}}
+
+def test_automaton_finds_every_occurrence():
+    patterns = ["ab", "b", "abc", "bca", "c", "aa"]
+    matcher = AhoCorasick(patterns)
+    rng = random.Random(0)
+    for _ in range(100):
+        text = "".join(rng.choice("abc") for _ in range(40))
+        expected = sorted(
+            (i, i + len(p), k) for k, p in enumerate(patterns) for i in range(len(text)) if text.startswith(p, i)
+        )
+        assert sorted(matcher.find_all(text)) == expected
+
+def test_apply_and_subset():
+    glossary = Glossary(GLOSSARY)
+    
+    assert glossary.apply("레디 됐어요, youtube에서 쳇지피티 api 써요") == "준비 됐어요, YouTube에서 ChatGPT API 써요"
+    # Terms only match whole words, in any script
+    assert glossary.apply("rapid 모드") == "rapid 모드"
+    assert glossary.apply("그레디언트 계산 레디 완료") == "그레디언트 계산 준비 완료"
+    assert glossary.subset(["그레디언트 계산"]) == {}
+    assert glossary.subset(["준비 됐어요", "API 호출"]) == {"preserve": ["API"], "replacements": {"레디": "준비"}}
+    assert glossary.subset(["관련 없는 문장"]) == {}
+
+def test_load_glossary_is_cached_per_mtime(tmp_path):
+    path = tmp_path / "glossary.json"
+    path.write_text(json.dumps(GLOSSARY, ensure_ascii=False), encoding="utf-8")
+    
+    first = load_glossary(str(path))
+    assert load_glossary(str(path)) is first
+    
+    path.write_text(json.dumps({"레디": "준비"}, ensure_ascii=False), encoding="utf-8")
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 1_000_000))
+    second = load_glossary(str(path))
+    assert second is not first and second.replacements == {"레디": "준비"}
+    assert not load_glossary(str(tmp_path / "missing.json"))
@@ -0,0 +1,123 @@
+import threading
+import time
+import pytest
+from src.core.job_executor import JobExecutor
+
+@pytest.fixture
+def executor():
+    executor = JobExecutor(max_jobs=2, stage_limits={"stt": 1})
+    yield executor
+    executor.shutdown()
+
+def test_job_publishes_progress_and_result(executor):
+    release = threading.Event()
+
+    def work(ctx):
+        ctx.set_preview("[00:00] 초안")
+        ctx.update(0.5, "halfway")
+        release.wait(timeout=5)
+        return {"output_path": "out.srt"}
+
+    job_id = executor.submit(work, label="video.mp4")
+    for _ in range(100):
+        if executor.get(job_id)["message"] == "halfway":
+            break
+        time.sleep(0.01)
+
+    snapshot = executor.get(job_id)
+    assert snapshot["state"] == "running" and snapshot["progress"] == 0.5
+    assert snapshot["preview"] == "[00:00] 초안"
+
+    release.set()
+    snapshot = executor.wait(job_id, timeout=5)
+    assert snapshot["state"] == "done"
+    assert snapshot["progress"] == 1.0
+    assert snapshot["result"] == {"output_path": "out.srt"}
+    assert [job["label"] for job in executor.list_jobs()] == ["video.mp4"]
+
+def test_failed_job_records_error(executor):
+    def work(ctx):
+        raise RuntimeError("ffmpeg missing")
+
+    snapshot = executor.wait(executor.submit(work), timeout=5)
+    assert snapshot["state"] == "failed"
+    assert snapshot["error"] == "ffmpeg missing"
+
+def test_cancel_running_job_stops_at_next_update(executor):
+    started = threading.Event()
+    steps = []
+
+    def work(ctx):
+        started.set()
+        for step in range(500):
+            ctx.update(step / 500)
+            steps.append(step)
+            time.sleep(0.01)
+
+    job_id = executor.submit(work)
+    assert started.wait(timeout=5)
+    assert executor.cancel(job_id) is True
+
+    snapshot = executor.wait(job_id, timeout=5)
+    assert snapshot["state"] == "cancelled"
+    assert len(steps) < 500
+    assert executor.cancel(job_id) is False
+
+def test_cancel_queued_job():
+    executor = JobExecutor(max_jobs=1)
+    release = threading.Event()
+    ran = []
+
+    blocker = executor.submit(lambda ctx: release.wait(timeout=5))
+    queued = executor.submit(lambda ctx: ran.append(True))
+
+    assert executor.cancel(queued) is True
+    assert executor.get(queued)["state"] == "cancelled"
+
+    release.set()
+    executor.wait(blocker, timeout=5)
+    executor.shutdown()
+    assert ran == []
+
+def test_stage_limit_serializes_stage(executor):
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def work(ctx):
+        with ctx.stage("stt"):
+            with lock:
+                active.append(ctx.job_id)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(ctx.job_id)
+
+    job_ids = [executor.submit(work) for _ in range(3)]
+    for job_id in job_ids:
+        assert executor.wait(job_id, timeout=5)["state"] == "done"
+    assert max(peak) == 1
+
+def test_job_waiting_for_stage_can_be_cancelled(executor):
+    release = threading.Event()
+    holding = threading.Event()
+
+    def hold_stage(ctx):
+        with ctx.stage("stt"):
+            holding.set()
+            release.wait(timeout=5)
+
+    def wait_for_stage(ctx):
+        with ctx.stage("stt"):
+            pytest.fail("stage entered after cancellation")
+
+    holder = executor.submit(hold_stage)
+    assert holding.wait(timeout=5)
+    waiter = executor.submit(wait_for_stage)
+    time.sleep(0.05)
+    assert executor.get(waiter)["stage"] == "stt (waiting)"
+
+    executor.cancel(waiter)
+    assert executor.wait(waiter, timeout=5)["state"] == "cancelled"
+    release.set()
+    assert executor.wait(holder, timeout=5)["state"] == "done"
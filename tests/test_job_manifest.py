@@ -0,0 +1,169 @@
+import os
+import json
+import pytest
+import numpy as np
+from unittest.mock import patch, MagicMock
+from src.core.job_manifest import JobManifest
+from src.core.pipeline import checkpointed_transcribe, checkpointed_correct, llm_fingerprint
+from src.core.stt_engine import STTEngine
+from src.core.llm_engine import LLMEngine
+from src.core.model_pool import WhisperModelPool
+
+SETTINGS = {"model": "tiny", "language": "ko", "chunked": False}
+
+@pytest.fixture
+def video_file(tmp_path):
+    path = tmp_path / "video.mp4"
+    path.write_bytes(b"fake video content")
+    return path
+
+def make_segment(start, end, text):
+    segment = MagicMock()
+    segment.start = start
+    segment.end = end
+    segment.text = text
+    segment.avg_logprob = -0.3
+    return segment
+
+def test_manifest_reopens_same_job(tmp_path, video_file):
+    manifest = JobManifest.open(str(tmp_path / "jobs"), str(video_file), SETTINGS)
+    audio_file = tmp_path / "audio.wav"
+    audio_file.touch()
+    manifest.set_audio_path(str(audio_file))
+    manifest.append_stt_segment({"start": 0.0, "end": 1.0, "text": "a", "confidence": -0.1})
+
+    reopened = JobManifest.open(str(tmp_path / "jobs"), str(video_file), SETTINGS)
+    assert reopened.job_id == manifest.job_id
+    assert reopened.audio_path == str(audio_file)
+    assert [seg["text"] for seg in reopened.stt_segments()] == ["a"]
+
+    # Different settings -> different job
+    other = JobManifest.open(str(tmp_path / "jobs"), str(video_file), dict(SETTINGS, model="base"))
+    assert other.job_id != manifest.job_id
+    assert other.audio_path is None
+
+def test_manifest_does_not_read_whole_source(tmp_path):
+    video_file = tmp_path / "long.mp4"
+    video_file.write_bytes(b"\0" * (8 * 1024 * 1024))
+    with patch("src.utils.hashing.hash_stream", side_effect=AssertionError("full read")):
+        manifest = JobManifest.open(str(tmp_path / "jobs"), str(video_file), SETTINGS)
+
+    # A copy of the same video resumes the same job, an edited one does not
+    copy = tmp_path / "copy.mp4"
+    copy.write_bytes(video_file.read_bytes())
+    assert JobManifest.open(str(tmp_path / "jobs"), str(copy), SETTINGS).job_id == manifest.job_id
+    with open(video_file, "r+b") as f:
+        f.seek(-1, 2)
+        f.write(b"x")
+    os.utime(video_file, ns=(0, video_file.stat().st_mtime_ns + 1))
+    assert JobManifest.open(str(tmp_path / "jobs"), str(video_file), SETTINGS).job_id != manifest.job_id
+
+def test_truncated_checkpoint_line_is_ignored(tmp_path, video_file):
+    manifest = JobManifest.open(str(tmp_path / "jobs"), str(video_file), SETTINGS)
+    manifest.append_stt_segment({"start": 0.0, "end": 1.0, "text": "a", "confidence": -0.1})
+    with open(manifest.job_dir / JobManifest.STT_SEGMENTS_FILE, "a", encoding="utf-8") as f:
+        f.write('{"start": 1.0, "end"')
+
+    assert len(manifest.stt_segments()) == 1
+
+@patch("src.core.stt_engine.decode_audio")
+@patch("src.core.stt_engine.WhisperModel")
+def test_transcription_resumes_after_last_segment(MockModel, mock_decode, tmp_path, video_file):
+    audio_file = tmp_path / "audio.wav"
+    audio_file.touch()
+    mock_decode.return_value = np.zeros(10 * STTEngine.SAMPLE_RATE, dtype=np.float32)
+    MockModel.return_value.transcribe.return_value = ([make_segment(0.5, 2.0, " rest ")], MagicMock(duration=6.0))
+
+    manifest = JobManifest.open(str(tmp_path / "jobs"), str(video_file), SETTINGS)
+    manifest.append_stt_segment({"start": 0.0, "end": 4.0, "text": "done", "confidence": -0.1})
+
+    stt = STTEngine(model_size="tiny", device="cpu", model_path=str(tmp_path / "models"), pool=WhisperModelPool())
+    segments = checkpointed_transcribe(stt, manifest, str(audio_file))
+
+    # Only the audio after 4.0s was transcribed, and its times are shifted back
+    window = MockModel.return_value.transcribe.call_args.args[0]
+    assert len(window) == 6 * STTEngine.SAMPLE_RATE
+    assert [(seg["start"], seg["text"]) for seg in segments] == [(0.0, "done"), (4.5, "rest")]
+    assert manifest.stt_result() == segments
+
+    # A completed transcription is reused without touching the model
+    MockModel.return_value.transcribe.reset_mock()
+    assert checkpointed_transcribe(stt, manifest, str(audio_file)) == segments
+    MockModel.return_value.transcribe.assert_not_called()
+
+@patch("src.core.stt_engine.decode_audio")
+@patch("src.core.stt_engine.WhisperModel")
+def test_chunked_transcription_skips_finished_chunks(MockModel, mock_decode, tmp_path, video_file):
+    audio_file = tmp_path / "audio.wav"
+    audio_file.touch()
+    # 25 seconds of audio -> windows [0, 12], [10, 22], [20, 25]
+    mock_decode.return_value = np.zeros(25 * STTEngine.SAMPLE_RATE, dtype=np.float32)
+    MockModel.return_value.transcribe.side_effect = lambda window, **kwargs: ([make_segment(0.5, 3.0, " new ")], MagicMock())
+
+    manifest = JobManifest.open(str(tmp_path / "jobs"), str(video_file), dict(SETTINGS, chunked=True))
+    manifest.save_stt_chunk(0.0, 12.0, [{"start": 0.5, "end": 3.0, "text": "old", "confidence": -0.1}])
+
+    stt = STTEngine(model_size="tiny", device="cpu", model_path=str(tmp_path / "models"), pool=WhisperModelPool())
+    segments = checkpointed_transcribe(stt, manifest, str(audio_file), chunked=True, chunk_size=10, overlap_size=2)
+
+    assert MockModel.return_value.transcribe.call_count == 2
+    assert [seg["text"] for seg in segments] == ["old", "new", "new"]
+    assert sorted(manifest.stt_chunks()) == [0.0, 10.0, 20.0]
+
+def test_correction_resumes_unfinished_batches(tmp_path, video_file):
+    segments = [{"start": float(i), "end": i + 1.0, "text": f"text {i}", "confidence": -0.1} for i in range(10)]
+    manifest = JobManifest.open(str(tmp_path / "jobs"), str(video_file), SETTINGS)
+
+    def echo_upper(prompt):
+        response = MagicMock()
+        response.text = json.dumps([dict(item, text=item["text"].upper()) for item in json.loads(prompt)])
+        return response
+
+    with patch("src.core.llm_engine.genai") as mock_genai:
+        mock_model = mock_genai.GenerativeModel.return_value
+        mock_model.generate_content.side_effect = echo_upper
+        llm = LLMEngine(api_key="dummy_key")
+
+        # First run dies after the first batch was checkpointed
+        fingerprint = llm_fingerprint(llm, {"batch_size": 5})
+        manifest.save_llm_batch(fingerprint, range(0, 5), [f"TEXT {i}" for i in range(5)])
+        corrected = checkpointed_correct(llm, manifest, segments, batch_size=5, concurrency=2)
+
+        assert mock_model.generate_content.call_count == 1
+        assert [seg["text"] for seg in corrected] == [f"TEXT {i}" for i in range(10)]
+
+        # Different batching -> earlier batches are not reused
+        checkpointed_correct(llm, manifest, segments, batch_size=4)
+        assert mock_model.generate_content.call_count == 4
+
+    manifest.discard()
+    assert not manifest.job_dir.exists()
+
+def test_transcribe_and_correct_checkpoints_both_stages(tmp_path, video_file):
+    from src.core.pipeline import transcribe_and_correct
+    
+    stt_engine = MagicMock()
+    stt_engine.iter_transcribe.side_effect = lambda audio_path, **kwargs: iter(
+        [{"start": float(i), "end": i + 1.0, "text": f"text {i}", "confidence": -0.1} for i in range(3)]
+    )
+    llm_engine = MagicMock()
+    llm_engine.base_system_prompt = "prompt"
+    llm_engine.glossary = {}
+    llm_engine.correct_subtitles.side_effect = lambda segments, **kwargs: [dict(seg, text=seg["text"].upper()) for seg in segments]
+    manifest = JobManifest.open(str(tmp_path / "jobs"), str(video_file), SETTINGS)
+    
+    stt_segments, corrected = transcribe_and_correct(stt_engine, llm_engine, "audio.wav", manifest=manifest)
+    
+    assert [seg["text"] for seg in stt_segments] == ["text 0", "text 1", "text 2"]
+    assert [seg["text"] for seg in corrected] == ["TEXT 0", "TEXT 1", "TEXT 2"]
+    assert manifest.stt_result() == stt_segments
+
+def test_stt_result_reads_list_checkpoints(tmp_path, video_file):
+    manifest = JobManifest.open(str(tmp_path / "jobs"), str(video_file), SETTINGS)
+    segments = [{"start": 0.0, "end": 1.0, "text": "하나", "confidence": -0.2}]
+    manifest.complete_stt(segments)
+    assert isinstance(json.loads((manifest.job_dir / JobManifest.STT_RESULT_FILE).read_text(encoding="utf-8")), dict)
+    
+    # Checkpoints from before the columnar format
+    (manifest.job_dir / JobManifest.STT_RESULT_FILE).write_text(json.dumps(segments), encoding="utf-8")
+    assert manifest.stt_result() == segments
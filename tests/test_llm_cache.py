@@ -0,0 +1,48 @@
+import pytest
+from src.core.llm_cache import CorrectionCache
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = CorrectionCache(db_path=str(tmp_path / "cache.sqlite3"))
+    yield cache
+    cache.close()
+
+def test_key_depends_on_all_inputs(cache):
+    key = cache.make_key(["a", "b"], "model", "prompt", {"replacements": {"x": "y"}})
+    
+    assert key == cache.make_key(["a", "b"], "model", "prompt", {"replacements": {"x": "y"}})
+    assert key != cache.make_key(["a", "c"], "model", "prompt", {"replacements": {"x": "y"}})
+    assert key != cache.make_key(["a", "b"], "other", "prompt", {"replacements": {"x": "y"}})
+    assert key != cache.make_key(["a", "b"], "model", "prompt 2", {"replacements": {"x": "y"}})
+    assert key != cache.make_key(["a", "b"], "model", "prompt", {"replacements": {"x": "z"}})
+
+def test_get_put_and_counters(cache):
+    assert cache.get("k") is None
+    cache.put("k", ["안녕", "세상"])
+    assert cache.get("k") == ["안녕", "세상"]
+    
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+def test_persists_across_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    first = CorrectionCache(db_path=path)
+    first.put("k", ["text"])
+    first.close()
+    
+    second = CorrectionCache(db_path=path)
+    assert second.get("k") == ["text"]
+    second.close()
+
+def test_evicts_least_recently_used(tmp_path):
+    # Each entry below is 9 bytes (["xxxxx"]); cap fits two of them
+    cache = CorrectionCache(db_path=str(tmp_path / "cache.sqlite3"), max_size_mb=20 / (1024 * 1024))
+    cache.put("a", ["aaaaa"])
+    cache.put("b", ["bbbbb"])
+    cache.get("a")  # "b" is now least recently used
+    cache.put("c", ["ccccc"])
+    
+    assert cache.get("b") is None
+    assert cache.get("a") == ["aaaaa"]
+    assert cache.get("c") == ["ccccc"]
+    cache.close()
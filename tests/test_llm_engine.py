@@ -0,0 +1,207 @@
+import json
+import time
+import pytest
+from unittest.mock import patch, MagicMock
+from src.core.llm_engine import LLMEngine
+
+def make_segments(count):
+    return [{"start": float(i), "end": i + 1.0, "text": f"text {i}", "confidence": -0.1} for i in range(count)]
+
+@pytest.fixture
+def mock_genai():
+    with patch("src.core.llm_engine.genai") as mock_genai:
+        yield mock_genai
+
+@pytest.fixture(autouse=True)
+def no_backoff_sleep():
+    with patch("src.core.llm_engine.time.sleep"):
+        yield
+
+def echo_upper(prompt):
+    """Fake Gemini: return the input batch with upper-cased text, slower for early batches."""
+    batch = json.loads(prompt)
+    time.sleep(0.01 * (10 - batch[0]["id"] // 5 % 10))
+    response = MagicMock()
+    response.text = json.dumps([dict(item, text=item["text"].upper()) for item in batch])
+    return response
+
+def test_concurrent_correction_keeps_order(mock_genai):
+    mock_genai.GenerativeModel.return_value.generate_content.side_effect = echo_upper
+    segments = make_segments(23)
+    progress = MagicMock()
+    
+    emitted = []
+    
+    llm = LLMEngine(api_key="dummy_key")
+    corrected = llm.correct_subtitles(segments, batch_size=5, concurrency=4, progress_callback=progress,
+                                      segment_callback=emitted.append)
+    
+    assert [seg["text"] for seg in corrected] == [f"TEXT {i}" for i in range(23)]
+    assert [seg["start"] for seg in corrected] == [seg["start"] for seg in segments]
+    progress.assert_called_with(23, 23)
+    # Batches finish out of order, but segments are emitted in output order
+    assert emitted == corrected
+
+def test_failed_batch_falls_back_to_original(mock_genai):
+    def flaky(prompt):
+        batch = json.loads(prompt)
+        if batch[0]["id"] == 5:
+            raise RuntimeError("quota exceeded")
+        return echo_upper(prompt)
+    
+    mock_model = mock_genai.GenerativeModel.return_value
+    mock_model.generate_content.side_effect = flaky
+    segments = make_segments(10)
+    
+    llm = LLMEngine(api_key="dummy_key")
+    corrected = llm.correct_subtitles(segments, batch_size=5, concurrency=2)
+    
+    assert [seg["text"] for seg in corrected] == [f"TEXT {i}" for i in range(5)] + [f"text {i}" for i in range(5, 10)]
+    # 1 call for the good batch + MAX_RETRIES calls for the failing one
+    assert mock_model.generate_content.call_count == 1 + LLMEngine.MAX_RETRIES
+
+def test_cached_batches_skip_api_calls(mock_genai, tmp_path):
+    from src.core.llm_cache import CorrectionCache
+    
+    mock_model = mock_genai.GenerativeModel.return_value
+    mock_model.generate_content.side_effect = echo_upper
+    cache = CorrectionCache(db_path=str(tmp_path / "cache.sqlite3"))
+    segments = make_segments(10)
+    
+    llm = LLMEngine(api_key="dummy_key", cache=cache)
+    first = llm.correct_subtitles(segments, batch_size=5)
+    assert mock_model.generate_content.call_count == 2
+    
+    # Change one segment: only its batch goes to the API again
+    segments[7]["text"] = "changed"
+    second = llm.correct_subtitles(segments, batch_size=5)
+    
+    assert mock_model.generate_content.call_count == 3
+    assert [seg["text"] for seg in second[:5]] == [seg["text"] for seg in first[:5]]
+    assert second[7]["text"] == "CHANGED"
+    assert cache.stats()["hits"] == 1
+    cache.close()
+
+def test_make_batches_packs_by_token_budget():
+    from src.core.llm_engine import make_batches, estimate_tokens, ITEM_TOKEN_OVERHEAD
+    
+    short = {"text": "짧음"}
+    long = {"text": "아주 긴 독백 " * 50}
+    segments = [short] * 4 + [long] + [short] * 3
+    short_tokens = estimate_tokens(short["text"]) + ITEM_TOKEN_OVERHEAD
+    
+    batches = make_batches(segments, max_segments=100, token_budget=short_tokens * 3)
+    assert [list(batch) for batch in batches] == [[0, 1, 2], [3], [4], [5, 6, 7]]
+    
+    # Count cap still applies, and no budget means count-only batching
+    assert [len(batch) for batch in make_batches(segments, max_segments=3)] == [3, 3, 2]
+
+def test_sends_compact_payload_and_maps_by_id(mock_genai):
+    mock_model = mock_genai.GenerativeModel.return_value
+    
+    def reversed_response(prompt):
+        batch = json.loads(prompt)
+        assert set(batch[0]) == {"id", "text"}
+        response = MagicMock()
+        response.text = json.dumps([{"id": item["id"], "text": item["text"] + "!"} for item in reversed(batch)])
+        return response
+    
+    mock_model.generate_content.side_effect = reversed_response
+    segments = make_segments(4)
+    
+    corrected = LLMEngine(api_key="dummy_key").correct_subtitles(segments)
+    
+    assert [seg["text"] for seg in corrected] == ["text 0!", "text 1!", "text 2!", "text 3!"]
+    assert corrected[2]["start"] == 2.0 and corrected[2]["confidence"] == -0.1
+    assert mock_model.generate_content.call_count == 1
+
+def test_partial_response_rerequests_only_missing_ids(mock_genai):
+    mock_model = mock_genai.GenerativeModel.return_value
+    requests = []
+    
+    def drop_odd_ids_once(prompt):
+        batch = json.loads(prompt)
+        requests.append([item["id"] for item in batch])
+        items = [dict(item, text=item["text"].upper()) for item in batch]
+        if len(requests) == 1:
+            # Drop odd ids, add an unknown id and an empty text
+            items = [item for item in items if item["id"] % 2 == 0] + [{"id": 99, "text": "ghost"}]
+            items[0]["text"] = ""
+        response = MagicMock()
+        response.text = json.dumps(items)
+        return response
+    
+    mock_model.generate_content.side_effect = drop_odd_ids_once
+    segments = make_segments(6)
+    
+    corrected = LLMEngine(api_key="dummy_key").correct_subtitles(segments)
+    
+    assert requests == [[0, 1, 2, 3, 4, 5], [0, 1, 3, 5]]
+    assert [seg["text"] for seg in corrected] == [f"TEXT {i}" for i in range(6)]
+
+def test_unresolved_ids_are_split_then_kept_original(mock_genai, tmp_path):
+    from src.core.llm_cache import CorrectionCache
+    
+    mock_model = mock_genai.GenerativeModel.return_value
+    
+    def never_returns_id_2(prompt):
+        batch = json.loads(prompt)
+        response = MagicMock()
+        response.text = json.dumps([dict(item, text=item["text"].upper()) for item in batch if item["id"] != 2])
+        return response
+    
+    mock_model.generate_content.side_effect = never_returns_id_2
+    cache = CorrectionCache(db_path=str(tmp_path / "cache.sqlite3"))
+    segments = make_segments(4)
+    
+    corrected = LLMEngine(api_key="dummy_key", cache=cache).correct_subtitles(segments)
+    
+    assert [seg["text"] for seg in corrected] == ["TEXT 0", "TEXT 1", "text 2", "TEXT 3"]
+    # Partially corrected batches are not cached
+    assert cache.stats()["entries"] == 0
+    cache.close()
+
+def test_streamed_segments_are_corrected_before_input_ends(mock_genai):
+    import threading
+    mock_model = mock_genai.GenerativeModel.return_value
+    first_batch_sent = threading.Event()
+    
+    def respond(prompt):
+        first_batch_sent.set()
+        return echo_upper(prompt)
+    
+    mock_model.generate_content.side_effect = respond
+    
+    def segment_stream():
+        for i, segment in enumerate(make_segments(8)):
+            if i == 6:
+                # The first batch (0-4) must be in flight while STT is still producing
+                assert first_batch_sent.wait(timeout=5)
+            yield segment
+    
+    progress = MagicMock()
+    corrected = LLMEngine(api_key="dummy_key").correct_subtitles(segment_stream(), batch_size=5, concurrency=2, progress_callback=progress)
+    
+    assert [seg["text"] for seg in corrected] == [f"TEXT {i}" for i in range(8)]
+    progress.assert_called_with(8, 8)
+
+def test_glossary_is_applied_locally_and_subset_sent(mock_genai, tmp_path):
+    glossary_path = tmp_path / "glossary.json"
+    glossary_path.write_text(json.dumps({"preserve": ["API", "YouTube"], "replacements": {"레디": "준비"}},
+                                        ensure_ascii=False), encoding="utf-8")
+    mock_genai.GenerativeModel.return_value.generate_content.side_effect = echo_upper
+    segments = [{"start": 0.0, "end": 1.0, "text": "레디 됐어"}, {"start": 1.0, "end": 2.0, "text": "api 호출"}]
+    
+    llm = LLMEngine(api_key="dummy_key", glossary_path=str(glossary_path))
+    llm.correct_subtitles(segments, batch_size=1)
+    
+    prompts = [call.kwargs["system_instruction"] for call in mock_genai.GenerativeModel.call_args_list]
+    sent = [json.loads(call.args[0])[0]["text"] for call in mock_genai.GenerativeModel.return_value.generate_content.call_args_list]
+    assert sorted(sent) == ["API 호출", "준비 됐어"]
+    assert any('"레디":"준비"' in prompt and "YouTube" not in prompt for prompt in prompts)
+    
+    # Glossary-only mode makes no API call
+    mock_genai.GenerativeModel.reset_mock()
+    corrected = llm.correct_subtitles(segments, glossary_only=True)
+    assert [seg["text"] for seg in corrected] == ["준비 됐어", "API 호출"]
+    mock_genai.GenerativeModel.assert_not_called()
@@ -0,0 +1,45 @@
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock
+from src.core.model_pool import WhisperModelPool
+
+def test_acquire_loads_once_and_counts_references():
+    pool = WhisperModelPool(idle_timeout=60)
+    loader = MagicMock(side_effect=lambda: object())
+    
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(pool.acquire("key", loader))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    
+    assert loader.call_count == 1
+    assert len({id(model) for model in results}) == 1
+    assert pool.stats()[0]["refcount"] == 4
+
+def test_idle_models_are_evicted():
+    pool = WhisperModelPool(idle_timeout=60)
+    pool.acquire("key", object)
+    
+    # In use: never evicted
+    assert pool.evict_idle(max_idle=0) == 0
+    
+    pool.release("key")
+    assert pool.evict_idle() == 0  # not idle long enough
+    time.sleep(0.01)
+    assert pool.evict_idle(max_idle=0.005) == 1
+    assert pool.stats() == []
+
+def test_failed_load_is_not_cached():
+    pool = WhisperModelPool()
+    
+    def failing_loader():
+        raise RuntimeError("download failed")
+    
+    with pytest.raises(RuntimeError):
+        pool.acquire("key", failing_loader)
+    
+    assert pool.stats() == []
+    assert pool.acquire("key", lambda: "model") == "model"
@@ -50,7 +50,7 @@ def test_full_pipeline(temp_dir, dummy_video):
     
     assert audio_path is not None
     assert os.path.exists(audio_path)
-    assert audio_path.endswith(".mp3")
+    assert audio_path.endswith(".wav")
     
     # 2. STT
     # We mock STT to avoid loading large models during quick tests
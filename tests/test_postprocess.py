@@ -0,0 +1,74 @@
+import time
+from src.core.postprocess import PostProcessingBuffer, SegmentPostProcessor
+
+def seg(start, end, text, confidence=-0.2):
+    return {"start": start, "end": end, "text": text, "confidence": confidence}
+
+def test_short_segments_are_merged():
+    processor = SegmentPostProcessor(min_duration=1.0, merge_gap=0.5)
+    result = processor.process([seg(0.0, 0.4, "네", -0.1), seg(0.5, 2.0, "그렇습니다", -0.3), seg(5.0, 7.0, "다음 문장")])
+    
+    assert [s["text"] for s in result] == ["네 그렇습니다", "다음 문장"]
+    assert (result[0]["start"], result[0]["end"]) == (0.0, 2.0)
+    assert -0.3 < result[0]["confidence"] < -0.1
+
+def test_long_segment_is_split_at_punctuation_with_proportional_timing():
+    processor = SegmentPostProcessor(max_chars=30, max_duration=10.0)
+    text = "오늘은 날씨가 좋네요, 그래서 공원에 갑니다. 같이 가실래요?"
+    result = processor.process([seg(10.0, 16.0, text)])
+    
+    # The comma is a few characters further from the middle than a space, but preferred
+    assert [s["text"] for s in result] == ["오늘은 날씨가 좋네요,", "그래서 공원에 갑니다. 같이 가실래요?"]
+    assert result[0]["start"] == 10.0 and result[-1]["end"] == 16.0
+    # The second part has twice the characters, so it gets about twice the time
+    assert result[1]["end"] - result[1]["start"] > 1.8 * (result[0]["end"] - result[0]["start"])
+
+def test_split_never_exceeds_max_chars():
+    processor = SegmentPostProcessor(max_chars=20, max_duration=60.0)
+    # The comma's bonus would pull the first cut past the 20-character limit; the last text has no spaces
+    texts = ["가나다라 마바사 아자차카타파하가나다라마,바사 아자", "가나다라마바사아자차카타파하가나다라마바사아자차"]
+    result = processor.process([seg(i * 10.0, i * 10.0 + 5.0, text) for i, text in enumerate(texts)])
+    
+    assert all(len(s["text"]) <= 20 for s in result)
+    assert "".join(s["text"] for s in result).replace(" ", "") == "".join(texts).replace(" ", "")
+
+def test_reading_speed_gap_and_overlaps():
+    processor = SegmentPostProcessor(max_cps=10.0, min_gap=0.1, min_duration=0.5, merge_gap=0.0)
+    result = processor.process([
+        seg(0.0, 1.0, "스무 글자가 넘는 아주 빠른 자막입니다"),  # needs 2.1s at 10 cps
+        seg(2.0, 4.5, "겹치는 자막"),
+        seg(4.0, 6.0, "다음 자막"),
+    ])
+    
+    assert result[0]["end"] == 1.9  # extended, but stops min_gap before the next cue
+    assert result[1]["end"] == 3.9  # overlap clamped
+    assert result[2]["start"] == 4.0
+
+def test_streamed_blocks_match_whole_file():
+    processor = SegmentPostProcessor()
+    segments = [seg(i * 1.1, i * 1.1 + (0.4 if i % 3 else 1.0), f"자막 {i}") for i in range(200)]
+    
+    streamed = []
+    buffer = PostProcessingBuffer(processor, streamed.append, block_size=16)
+    buffer.write_all(segments)
+    buffer.close()
+    
+    assert [s["text"] for s in streamed] == [s["text"] for s in processor.process(segments)]
+
+def test_ten_thousand_segments_stay_fast():
+    segments = [seg(i * 2.0, i * 2.0 + 1.5, "가나다 라마바사 " * (1 + i % 8)) for i in range(10000)]
+    started = time.perf_counter()
+    result = SegmentPostProcessor().process(segments)
+    assert time.perf_counter() - started < 2.0
+    assert all(a["end"] <= b["start"] for a, b in zip(result, result[1:]))
+
+def test_split_uses_word_timings():
+    processor = SegmentPostProcessor(max_chars=20, max_duration=10.0)
+    segment = dict(seg(0.0, 6.0, "처음 말은 빨랐고, 나중 말은 아주 느렸습니다"),
+                   words=["처음", "말은", "빨랐고,", "나중", "말은", "아주", "느렸습니다"],
+                   word_starts=[0.0, 0.3, 0.6, 1.5, 2.5, 3.5, 4.5], word_ends=[0.2, 0.5, 1.0, 2.3, 3.3, 4.3, 6.0])
+    result = processor.process([segment])
+    
+    assert [s["text"] for s in result] == ["처음 말은 빨랐고,", "나중 말은 아주 느렸습니다"]
+    assert result[1]["start"] == 1.5
+    assert result[1]["words"] == ["나중", "말은", "아주", "느렸습니다"]
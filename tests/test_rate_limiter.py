@@ -0,0 +1,49 @@
+import pytest
+from src.core.rate_limiter import TokenBucket, RateLimiter, backoff_delay
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+    
+    def __call__(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+def test_token_bucket_allows_burst_then_throttles():
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock=clock, sleep=clock.sleep)  # 1 token per second
+    
+    for _ in range(60):
+        assert bucket.acquire() == 0
+    
+    assert bucket.acquire() == pytest.approx(1.0)
+    assert bucket.acquire() == pytest.approx(1.0)
+    
+    # Refill while idle
+    clock.now += 10
+    assert bucket.acquire(5) == 0
+
+def test_token_bucket_clamps_oversized_requests():
+    clock = FakeClock()
+    bucket = TokenBucket(100, clock=clock, sleep=clock.sleep)
+    assert bucket.acquire(1000) == 0
+    assert bucket.acquire(1) > 0
+
+def test_rate_limiter_combines_limits():
+    clock = FakeClock()
+    limiter = RateLimiter(requests_per_minute=100, tokens_per_minute=600, clock=clock, sleep=clock.sleep)
+    
+    assert limiter.acquire(600) == 0
+    # Token budget exhausted: 300 tokens at 10 tokens/s
+    assert limiter.acquire(300) == pytest.approx(30.0)
+    
+    assert RateLimiter().acquire(10 ** 9) == 0
+
+def test_backoff_delay_is_capped():
+    for attempt in range(10):
+        delay = backoff_delay(attempt, base=1.0, cap=5.0)
+        assert 0 <= delay <= min(5.0, 2 ** attempt)
@@ -0,0 +1,56 @@
+import sys
+import json
+from array import array
+import msgpack
+from src.core.segment_store import SegmentStore
+
+def make_segments():
+    return [
+        {"start": 0.0, "end": 1.0, "text": "네", "confidence": -0.1},
+        {"start": 1.5, "end": 3.0, "text": "안녕하세요 여러분", "confidence": -0.4,
+         "words": ["안녕하세요", "여러분"], "word_starts": [1.5, 2.2], "word_ends": [2.1, 3.0]},
+        {"start": 4.0, "end": 5.0, "text": "네", "speaker": "A"},
+    ]
+
+def test_store_behaves_like_a_list_of_dicts():
+    store = SegmentStore(make_segments())
+    
+    assert store == make_segments()
+    assert len(store) == 3 and store[-1]["speaker"] == "A"
+    assert "confidence" not in store[2] and store[2].get("confidence") is None
+    assert dict(store[1], text="수정")["words"] == ["안녕하세요", "여러분"]
+    # Repeated texts are stored once
+    assert repr(store).endswith("4 distinct texts)")
+    
+    store[0]["text"] = "예"
+    store[1]["words"] = ["안녕"]
+    store[1]["word_starts"], store[1]["word_ends"] = [1.5], [3.0]
+    assert store[0]["text"] == "예" and store[1]["words"] == ["안녕"]
+    assert isinstance(store[1].copy(), dict)
+    assert store[1:][0]["words"] == ["안녕"]
+
+def test_json_roundtrip_is_columnar():
+    store = SegmentStore(make_segments())
+    store[0]["text"] = "예"
+    payload = json.loads(json.dumps(store.to_json(), ensure_ascii=False))
+    
+    assert payload["start"] == [0.0, 1.5, 4.0]
+    assert payload["confidence"][2] is None
+    restored = SegmentStore.from_json(payload)
+    assert restored == [dict(make_segments()[0], text="예")] + make_segments()[1:]
+
+def test_msgpack_roundtrip():
+    store = SegmentStore(make_segments())
+    data = store.to_msgpack()
+    assert SegmentStore.from_msgpack(data) == make_segments()
+    
+    # Columns written on a machine with the other byte order are swapped back
+    payload = msgpack.unpackb(data, raw=False, strict_map_key=False)
+    for key, typecode in (("start", "d"), ("end", "d"), ("confidence", "d"), ("text", "i"), ("word_offset", "q"),
+                          ("word_text", "i"), ("word_start", "d"), ("word_end", "d")):
+        column = array(typecode)
+        column.frombytes(payload[key])
+        column.byteswap()
+        payload[key] = column.tobytes()
+    payload["byteorder"] = "big" if sys.byteorder == "little" else "little"
+    assert SegmentStore.from_msgpack(msgpack.packb(payload, use_bin_type=True)) == make_segments()
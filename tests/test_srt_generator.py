@@ -1,6 +1,6 @@
 import pytest
 import os
-from src.core.srt_generator import SRTGenerator
+from src.core.srt_generator import SRTGenerator, SRTWriter
 
 def test_format_timestamp():
     # Test cases: seconds -> 00:00:00,000
@@ -40,3 +40,32 @@ def test_generate_output_filename(tmp_path):
     filename = SRTGenerator.generate_output_filename(source, str(output_dir))
     assert "movie_" in filename
     assert filename.endswith(".srt")
+
+def test_srt_writer_finalizes_atomically(tmp_path):
+    output_file = tmp_path / "out" / "test.srt"
+    writer = SRTWriter(str(output_file), flush_every=2)
+    
+    writer.write({"start": 0.0, "end": 2.0, "text": "Hello"})
+    writer.write({"start": 2.5, "end": 4.0, "text": "World"})
+    writer.write({"start": 5.0, "end": 6.0, "text": "Pending"})
+    
+    # Only flushed, complete entries are visible; nothing exists at the final path yet
+    assert not output_file.exists()
+    partial = SRTWriter.read_partial(str(output_file))
+    assert partial.startswith("1\n00:00:00,000 --> 00:00:02,000\nHello\n\n")
+    assert "Pending" not in partial
+    assert "3\n00:00:05,000 --> 00:00:06,000\nPending" in writer.tail()
+    
+    assert writer.finalize() == str(output_file)
+    assert output_file.read_text(encoding="utf-8").count("-->") == 3
+    assert SRTWriter.read_partial(str(output_file)) == ""
+
+def test_srt_writer_failure_leaves_no_file(tmp_path):
+    output_file = tmp_path / "test.srt"
+    
+    with pytest.raises(KeyError):
+        with SRTWriter(str(output_file)) as writer:
+            writer.write({"start": 0.0, "end": 2.0, "text": "Hello"})
+            writer.write({"start": 2.0})
+    
+    assert list(tmp_path.iterdir()) == []
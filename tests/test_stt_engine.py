@@ -0,0 +1,152 @@
+import numpy as np
+from unittest.mock import patch, MagicMock
+from src.core.stt_engine import STTEngine
+from src.core.model_pool import WhisperModelPool
+
+def make_segment(start, end, text, avg_logprob=-0.3):
+    segment = MagicMock()
+    segment.start = start
+    segment.end = end
+    segment.text = text
+    segment.avg_logprob = avg_logprob
+    return segment
+
+@patch("src.core.stt_engine.decode_audio")
+@patch("src.core.stt_engine.WhisperModel")
+def test_transcribe_chunked(MockModel, mock_decode, tmp_path):
+    audio_file = tmp_path / "audio.wav"
+    audio_file.touch()
+    
+    # 25 seconds of audio -> windows [0, 12], [10, 22], [20, 25]
+    mock_decode.return_value = np.zeros(25 * STTEngine.SAMPLE_RATE, dtype=np.float32)
+    
+    def fake_transcribe(window, **kwargs):
+        duration = len(window) / STTEngine.SAMPLE_RATE
+        return [make_segment(0.5, min(duration, 3.0), f" chunk {duration:.0f} ")], MagicMock(duration=duration)
+    
+    MockModel.return_value.transcribe.side_effect = fake_transcribe
+    
+    stt = STTEngine(model_size="tiny", device="cpu", model_path=str(tmp_path / "models"), num_workers=2, pool=WhisperModelPool())
+    progress = MagicMock()
+    segments = stt.transcribe_chunked(str(audio_file), chunk_size=10, overlap_size=2, max_workers=2, progress_callback=progress)
+    
+    assert [seg["start"] for seg in segments] == [0.5, 10.5, 20.5]
+    assert segments[1]["text"] == "chunk 12"
+    assert MockModel.call_args.kwargs["num_workers"] == 2
+    progress.assert_called_with(25.0, 25.0)
+
+@patch("src.core.stt_engine.WhisperModel")
+def test_transcribe_stream(MockModel, tmp_path):
+    import io
+    from src.core.audio_stream import AudioStream
+    
+    samples = np.zeros(25 * STTEngine.SAMPLE_RATE, dtype="<f4")
+    stream = AudioStream(io.BytesIO(samples.tobytes()), buffer_seconds=5, duration=25.0)
+    
+    def fake_transcribe(window, **kwargs):
+        return [make_segment(0.5, 3.0, " text ")], MagicMock()
+    
+    MockModel.return_value.transcribe.side_effect = fake_transcribe
+    
+    stt = STTEngine(model_size="tiny", device="cpu", model_path=str(tmp_path / "models"), num_workers=2, pool=WhisperModelPool())
+    with stream:
+        segments = stt.transcribe_stream(stream, chunk_size=10, overlap_size=2, max_workers=2)
+    
+    assert [seg["start"] for seg in segments] == [0.5, 10.5, 20.5]
+
+@patch("src.core.stt_engine.WhisperModel")
+def test_engines_share_pooled_model(MockModel, tmp_path):
+    MockModel.side_effect = lambda *args, **kwargs: MagicMock()
+    pool = WhisperModelPool()
+    model_path = str(tmp_path / "models")
+    
+    first = STTEngine(model_size="tiny", device="cpu", model_path=model_path, pool=pool)
+    second = STTEngine(model_size="tiny", device="cpu", model_path=model_path, pool=pool)
+    other = STTEngine(model_size="base", device="cpu", model_path=model_path, pool=pool)
+    
+    assert first.model is second.model
+    assert other.model is not first.model
+    assert MockModel.call_count == 2
+    
+    first.close()
+    second.close()
+    assert {entry["key"][0]: entry["refcount"] for entry in pool.stats()} == {"tiny": 0, "base": 1}
+    
+    # Unreferenced models are unloaded, models in use are kept
+    assert pool.clear() == 1
+    assert [entry["key"][0] for entry in pool.stats()] == ["base"]
+
+@patch("src.core.stt_engine.BatchedInferencePipeline")
+@patch("src.core.stt_engine.WhisperModel")
+def test_batched_mode_keeps_segment_format(MockModel, MockBatched, tmp_path):
+    audio_file = tmp_path / "audio.wav"
+    audio_file.touch()
+    MockBatched.return_value.transcribe.return_value = (
+        [make_segment(0.0, 2.5, " 첫 문장 ", -0.2), make_segment(3.0, 5.0, " 둘째 문장 ", -0.4)],
+        MagicMock(duration=5.0)
+    )
+    
+    stt = STTEngine(model_size="tiny", device="cpu", model_path=str(tmp_path / "models"), batch_size=16, pool=WhisperModelPool())
+    segments = stt.transcribe(str(audio_file))
+    
+    assert segments == [
+        {"start": 0.0, "end": 2.5, "text": "첫 문장", "confidence": -0.2},
+        {"start": 3.0, "end": 5.0, "text": "둘째 문장", "confidence": -0.4},
+    ]
+    MockBatched.assert_called_once_with(MockModel.return_value)
+    assert MockBatched.return_value.transcribe.call_args.kwargs["batch_size"] == 16
+    MockModel.return_value.transcribe.assert_not_called()
+
+@patch("src.core.stt_engine.decode_audio")
+@patch("src.core.stt_engine.WhisperModel")
+def test_transcribe_chunked_speech_map(MockModel, mock_decode, tmp_path):
+    audio_file = tmp_path / "audio.wav"
+    audio_file.touch()
+    mock_decode.return_value = np.zeros(100 * STTEngine.SAMPLE_RATE, dtype=np.float32)
+    
+    # Speech 10-14s and 50-56s fit one 10s chunk; 80-90s gets its own
+    speech_map = [{"start": 10.0, "end": 14.0}, {"start": 50.0, "end": 56.0}, {"start": 80.0, "end": 90.0}]
+    
+    def fake_transcribe(window, **kwargs):
+        assert kwargs["vad_filter"] is False
+        duration = len(window) / STTEngine.SAMPLE_RATE
+        return [make_segment(1.0, 3.0, " first "), make_segment(3.5, duration, " second ")], MagicMock(duration=duration)
+    
+    MockModel.return_value.transcribe.side_effect = fake_transcribe
+    
+    stt = STTEngine(model_size="tiny", device="cpu", model_path=str(tmp_path / "models"), pool=WhisperModelPool())
+    chunk_callback = MagicMock()
+    segments = stt.transcribe_chunked(str(audio_file), chunk_size=10, max_workers=1,
+                                      speech_map=speech_map, chunk_callback=chunk_callback)
+    
+    assert [(seg["start"], seg["end"]) for seg in segments] == [(11.0, 13.0), (13.5, 56.0), (81.0, 83.0), (83.5, 90.0)]
+    assert MockModel.return_value.transcribe.call_count == 2
+    assert sorted(call.args[0] for call in chunk_callback.call_args_list) == [10.0, 80.0]
+    
+    # Silent file: nothing is decoded or transcribed
+    mock_decode.reset_mock()
+    assert stt.transcribe_chunked(str(audio_file), speech_map=[]) == []
+    mock_decode.assert_not_called()
+    
+    # VAD runs on the samples decoded for transcription, so the file is decoded once
+    vad_cache = MagicMock()
+    vad_cache.load_or_compute.return_value = speech_map
+    stt.transcribe_chunked(str(audio_file), chunk_size=10, max_workers=1, vad_cache=vad_cache)
+    mock_decode.assert_called_once()
+    assert vad_cache.load_or_compute.call_args.kwargs["audio"] is mock_decode.return_value
+
+@patch("src.core.stt_engine.WhisperModel")
+def test_word_timestamps_are_stored_as_parallel_lists(MockModel, tmp_path):
+    audio_file = tmp_path / "audio.wav"
+    audio_file.touch()
+    segment = make_segment(0.0, 2.0, " 안녕하세요 여러분")
+    segment.words = [MagicMock(word=" 안녕하세요", start=0.2, end=0.9), MagicMock(word=" 여러분", start=1.0, end=1.8)]
+    MockModel.return_value.transcribe.return_value = ([segment], MagicMock(duration=2.0))
+    
+    stt = STTEngine(model_size="tiny", device="cpu", model_path=str(tmp_path / "models"), pool=WhisperModelPool(),
+                    word_timestamps=True)
+    result = stt.transcribe(str(audio_file))
+    
+    assert MockModel.return_value.transcribe.call_args.kwargs["word_timestamps"] is True
+    assert result[0]["words"] == ["안녕하세요", "여러분"]
+    assert result[0]["word_starts"] == [0.2, 1.0] and result[0]["word_ends"] == [0.9, 1.8]
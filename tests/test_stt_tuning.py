@@ -0,0 +1,60 @@
+import numpy as np
+from unittest.mock import patch
+from src.core.stt_tuning import TuningStore, autotune, default_profile, load_profile
+from src.core.stt_engine import STTEngine
+from src.core.model_pool import WhisperModelPool
+
+def make_profile(compute_type, num_workers=1, beam_size=5):
+    return {"device": "cpu", "compute_type": compute_type, "cpu_threads": 4 // num_workers,
+            "num_workers": num_workers, "beam_size": beam_size}
+
+def test_autotune_persists_fastest_accurate_profile(tmp_path):
+    store = TuningStore(str(tmp_path / "tuning.json"))
+    candidates = [
+        make_profile("int8_float32"),
+        make_profile("int8", num_workers=2),
+        make_profile("int8", beam_size=1),
+    ]
+    # (throughput, transcript) per candidate; beam 1 is fastest but garbles the text
+    measurements = {
+        ("int8_float32", 1, 5): (1.0, "안녕하세요 오늘은 날씨가 좋습니다"),
+        ("int8", 2, 5): (2.5, "안녕하세요 오늘은 날씨가 좋습니다"),
+        ("int8", 1, 1): (4.0, "안녕 오늘 날씨"),
+    }
+
+    def fake_time(profile, model_size, model_path, clip, language):
+        assert len(clip) == 30 * 16000
+        return measurements[(profile["compute_type"], profile["num_workers"], profile["beam_size"])]
+
+    with patch("src.core.stt_tuning._time_profile", side_effect=fake_time):
+        best = autotune("tiny", np.zeros(30 * 16000, dtype=np.float32), device="cpu",
+                        candidates=candidates, store=store)
+
+    assert (best["compute_type"], best["num_workers"], best["throughput"]) == ("int8", 2, 2.5)
+    assert store.get("tiny", "cpu")["compute_type"] == "int8"
+    assert store.get("base", "cpu") is None
+
+def test_load_profile_falls_back_to_defaults(tmp_path):
+    store = TuningStore(str(tmp_path / "tuning.json"))
+    assert load_profile("tiny", "cpu", store) == default_profile("cpu")
+    assert default_profile("cpu")["compute_type"] == "int8"
+
+    store.put("tiny", "cpu", make_profile("int8_float32"))
+    assert load_profile("tiny", "cpu", store)["compute_type"] == "int8_float32"
+
+@patch("src.core.stt_engine.WhisperModel")
+def test_engine_loads_tuned_profile(MockModel, tmp_path):
+    store = TuningStore(str(tmp_path / "tuning.json"))
+    store.put("tiny", "cpu", make_profile("int8", num_workers=2, beam_size=3))
+
+    stt = STTEngine(model_size="tiny", device="cpu", model_path=str(tmp_path / "models"),
+                    compute_type="auto", tuning_store=store, pool=WhisperModelPool())
+    kwargs = MockModel.call_args.kwargs
+    assert (kwargs["compute_type"], kwargs["cpu_threads"], kwargs["num_workers"]) == ("int8", 2, 2)
+    assert stt.beam_size == 3
+
+    # More concurrent chunks than tuned for: threads are split to keep the total
+    STTEngine(model_size="tiny", device="cpu", model_path=str(tmp_path / "models"), num_workers=4,
+              compute_type="auto", tuning_store=store, pool=WhisperModelPool())
+    kwargs = MockModel.call_args.kwargs
+    assert (kwargs["cpu_threads"], kwargs["num_workers"]) == (1, 4)
@@ -0,0 +1,63 @@
+import json
+import pytest
+from src.core.subtitle_export import (
+    FORMATS, SubtitleFormat, SubtitleExporter, export_subtitles, format_timestamp, register_format
+)
+
+SEGMENTS = [
+    {"start": 0.0, "end": 2.0, "text": "안녕하세요", "confidence": -0.2},
+    {"start": 61.0015, "end": 3661.5, "text": " 첫 줄\n둘째 줄 ", "confidence": -0.4},
+]
+
+def test_format_timestamp_styles_round_to_precision():
+    assert format_timestamp(61.001) == "00:01:01,001"
+    assert format_timestamp(1.9999) == "00:00:02,000"
+    assert format_timestamp(3661.5, "vtt") == "01:01:01.500"
+    assert format_timestamp(3661.505, "ass") == "1:01:01.50"
+    assert format_timestamp(-0.1) == "00:00:00,000"
+
+def test_export_writes_every_format_in_one_pass(tmp_path):
+    def source():
+        # A generator can only be read once
+        yield from SEGMENTS
+    
+    paths = export_subtitles(source(), str(tmp_path / "movie"), ["srt", "vtt", "ass", "json"])
+    
+    assert sorted(paths) == ["ass", "json", "srt", "vtt"]
+    assert paths["vtt"].endswith("movie.vtt")
+    
+    srt = (tmp_path / "movie.srt").read_text(encoding="utf-8")
+    assert "2\n00:01:01,002 --> 01:01:01,500\n첫 줄\n둘째 줄\n\n" in srt
+    
+    vtt = (tmp_path / "movie.vtt").read_text(encoding="utf-8")
+    assert vtt.startswith("WEBVTT\n\n1\n00:00:00.000 --> 00:00:02.000\n")
+    
+    ass = (tmp_path / "movie.ass").read_text(encoding="utf-8")
+    assert "[Events]" in ass
+    assert "Dialogue: 0,0:01:01.00,1:01:01.50,Default,,0,0,0,,첫 줄\\N둘째 줄\n" in ass
+    
+    records = json.loads((tmp_path / "movie.json").read_text(encoding="utf-8"))
+    assert [record["confidence"] for record in records] == [-0.2, -0.4]
+    assert records[1]["index"] == 2
+    assert not list(tmp_path.glob("*.partial"))
+
+def test_custom_format_plugs_in(tmp_path):
+    @register_format
+    class TextFormat(SubtitleFormat):
+        name = "txt"
+        extension = "txt"
+        
+        def entry(self, index, segment):
+            return segment["text"].strip() + "\n"
+    
+    try:
+        with SubtitleExporter(str(tmp_path / "movie"), ["txt"]) as exporter:
+            exporter.write_all(SEGMENTS[:1])
+        assert (tmp_path / "movie.txt").read_text(encoding="utf-8") == "안녕하세요\n"
+    finally:
+        FORMATS.pop("txt")
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        SubtitleExporter(str(tmp_path / "movie"), ["srt", "sub"])
+    assert list(tmp_path.iterdir()) == []
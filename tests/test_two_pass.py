@@ -0,0 +1,47 @@
+import numpy as np
+from unittest.mock import patch, MagicMock
+from src.core.two_pass import low_confidence_spans, two_pass_transcribe
+
+def seg(start, end, text, confidence=-0.2):
+    return {"start": start, "end": end, "text": text, "confidence": confidence}
+
+DRAFT = [
+    seg(0.0, 2.0, "안녕하세요"),
+    seg(2.5, 4.0, "오늘은 날시가", -1.2),
+    seg(4.2, 6.0, "조씁니다", -0.9),
+    seg(6.5, 8.0, "감사합니다"),
+    seg(12.0, 14.0, "으음", -1.5),
+]
+
+def test_low_confidence_spans_groups_neighbours():
+    assert low_confidence_spans(DRAFT, threshold=-0.7) == [(1, 3), (4, 5)]
+    assert low_confidence_spans(DRAFT, threshold=-2.0) == []
+
+@patch("src.core.two_pass.decode_audio", return_value=np.zeros(15 * 16000, dtype=np.float32))
+def test_two_pass_refines_only_low_confidence_runs(mock_decode):
+    draft_engine = MagicMock()
+    draft_engine.iter_transcribe.return_value = iter(DRAFT)
+    refine_engine = MagicMock()
+    refine_engine.transcribe_clip.side_effect = lambda audio, start, end, language: {
+        # Padding context returns the confident neighbour too; it must not be duplicated
+        2.0: [seg(1.0, 2.0, "안녕하세요"), seg(2.5, 6.0, "오늘은 날씨가 좋습니다", -0.3)],
+        11.5: [],
+    }[start]
+    drafts = []
+    
+    segments = two_pass_transcribe(draft_engine, lambda: refine_engine, "audio.wav", threshold=-0.7,
+                                   draft_callback=drafts.append)
+    
+    assert drafts == DRAFT
+    assert [s["text"] for s in segments] == ["안녕하세요", "오늘은 날씨가 좋습니다", "감사합니다", "으음"]
+    assert refine_engine.transcribe_clip.call_count == 2
+
+def test_two_pass_skips_refine_model_on_confident_draft():
+    draft_engine = MagicMock()
+    draft_engine.iter_transcribe.return_value = iter([seg(0.0, 2.0, "안녕하세요")])
+    load_refine_engine = MagicMock()
+    
+    segments = two_pass_transcribe(draft_engine, load_refine_engine, "audio.wav")
+    
+    assert [s["text"] for s in segments] == ["안녕하세요"]
+    load_refine_engine.assert_not_called()
@@ -27,3 +27,50 @@ def test_resource_resolver_frozen(monkeypatch):
     
     path = get_resource_path("config.yaml")
     assert str(path) == str(Path('/tmp/MEI12345/config.yaml'))
+
+def test_copy_stream_hashed(tmp_path):
+    import io
+    from unittest.mock import patch
+    from src.utils.hashing import copy_stream_hashed, hash_file, hash_stream
+    
+    data = b"video bytes " * 1000
+    dest = tmp_path / "upload.mp4"
+    
+    digest = copy_stream_hashed(io.BytesIO(data), str(dest), chunk_size=4096)
+    
+    assert dest.read_bytes() == data
+    assert not (tmp_path / "upload.mp4.partial").exists()
+    assert digest == hash_stream(io.BytesIO(data))
+    # The digest is memoized, so the staged file isn't read again to hash it
+    with patch("builtins.open", side_effect=AssertionError("file re-read")):
+        assert hash_file(str(dest)) == digest
+
+def test_fingerprint_file_samples_large_files(tmp_path):
+    import io
+    from unittest.mock import patch
+    from src.utils.hashing import fingerprint_file
+    
+    data = bytes(range(256)) * 64  # 16 KB
+    original = tmp_path / "a.mp4"
+    copy = tmp_path / "b.mp4"
+    edited = tmp_path / "c.mp4"
+    original.write_bytes(data)
+    copy.write_bytes(data)
+    edited.write_bytes(data[:-1] + b"x")
+    
+    fingerprint = fingerprint_file(str(original), chunk_size=1024)
+    assert fingerprint_file(str(copy), chunk_size=1024) == fingerprint
+    assert fingerprint_file(str(edited), chunk_size=1024) != fingerprint
+    
+    # Only the sampled chunks are read, not the whole file
+    class TrackingReader(io.BytesIO):
+        bytes_read = 0
+        def read(self, size=-1):
+            chunk = super().read(size)
+            TrackingReader.bytes_read += len(chunk)
+            return chunk
+    other = tmp_path / "d.mp4"
+    other.write_bytes(data[::-1])
+    with patch("builtins.open", lambda *args, **kwargs: TrackingReader(data[::-1])):
+        fingerprint_file(str(other), chunk_size=1024)
+    assert TrackingReader.bytes_read == 4 * 1024
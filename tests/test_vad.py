@@ -0,0 +1,42 @@
+import numpy as np
+from unittest.mock import patch
+from src.core.vad import SpeechMapCache, SpeechTimeline, group_speech
+
+def test_group_speech_cuts_at_silences():
+    speech_map = [{"start": 0.0, "end": 4.0}, {"start": 10.0, "end": 15.0}, {"start": 20.0, "end": 45.0}]
+    groups = group_speech(speech_map, max_duration=10)
+    
+    assert groups == [
+        [{"start": 0.0, "end": 4.0}, {"start": 10.0, "end": 15.0}],
+        [{"start": 20.0, "end": 30.0}],
+        [{"start": 30.0, "end": 40.0}],
+        [{"start": 40.0, "end": 45.0}],
+    ]
+
+def test_speech_timeline_maps_back_to_original_time():
+    timeline = SpeechTimeline([{"start": 10.0, "end": 12.0}, {"start": 20.0, "end": 23.0}])
+    assert timeline.duration == 5.0
+    
+    audio = np.arange(30 * 10, dtype=np.float32)
+    assert len(timeline.samples(audio, sample_rate=10)) == 50
+    
+    assert timeline.to_original(1.0) == 11.0
+    assert timeline.to_original(2.0) == 20.0
+    assert timeline.to_original(2.0, is_end=True) == 12.0
+    assert timeline.to_original(4.5, is_end=True) == 22.5
+
+def test_speech_map_cache_is_reused(tmp_path):
+    audio_file = tmp_path / "audio.wav"
+    audio_file.write_bytes(b"audio")
+    cache = SpeechMapCache(str(tmp_path / "vad"))
+    speech_map = [{"start": 1.0, "end": 2.5}]
+    
+    with patch("src.core.vad.decode_audio", return_value=np.zeros(16000, dtype=np.float32)), \
+            patch("src.core.vad.detect_speech", return_value=speech_map) as mock_detect:
+        assert cache.load_or_compute(str(audio_file)) == speech_map
+        assert SpeechMapCache(str(tmp_path / "vad")).load_or_compute(str(audio_file)) == speech_map
+        assert mock_detect.call_count == 1
+        
+        # Other VAD settings are a different speech map
+        cache.load_or_compute(str(audio_file), min_silence_duration_ms=200)
+        assert mock_detect.call_count == 2